@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +11,150 @@ class Settings(BaseSettings):
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
     sarvam_base_url: str = "https://api.sarvam.ai"
 
+    # Session storage is split across this many SQLite files by a hash of the session id
+    # (1 = the single database_url file); scripts/split_db.py moves data between layouts
+    db_shards: int = 1
+
+    # SQLite connection pool (per shard)
+    db_read_pool_size: int = 8
+    db_busy_timeout_ms: int = 5000
+    db_mmap_size: int = 256 * 1024 * 1024
+    db_cache_size_kib: int = 16 * 1024
+
+    # Write path: "direct" commits every helper call; "sync" (default) group-commits and
+    # waits for the commit, so a write that returned is durable. "group" is the throughput
+    # opt-in: writes are queued and return at once (write-behind), so a crash loses the
+    # acknowledged writes still in the queue.
+    db_write_mode: Literal["direct", "sync", "group"] = "sync"
+    db_write_batch_interval_ms: float = 20.0
+    db_write_batch_max_rows: int = 500
+    db_write_queue_size: int = 10000
+
+    # GET /api/sessions is paged by a keyset cursor on (updated_at, id); transcript exports
+    # stream the hot log in batches of transcript_batch_rows
+    sessions_page_size: int = 50
+    sessions_max_page_size: int = 500
+    transcript_batch_rows: int = 500
+    progress_batch_max_sessions: int = 1000  # session ids per POST /api/sessions/progress
+
+    # Analytics rollup tables (/api/analytics), updated in the same write as the session
+    # change they count. A step's time is only counted up to the idle cap, so a tab left
+    # open overnight does not skew it.
+    analytics_rollups: bool = True
+    analytics_step_idle_cap_seconds: float = 1800.0
+
+    # Upstream HTTP connection pools (one long-lived client per provider)
+    openrouter_timeout: float = 30.0
+    openrouter_http2: bool = True
+    openrouter_max_connections: int = 100
+    sarvam_timeout: float = 30.0
+    sarvam_http2: bool = False
+    sarvam_max_connections: int = 100
+    upstream_connect_timeout: float = 5.0
+    upstream_pool_timeout: float = 10.0
+    upstream_max_keepalive_connections: int = 50
+    upstream_keepalive_expiry: float = 60.0
+
+    # Upstream governor (per provider, per process): in-flight cap, token-bucket rate limit
+    # (0 = unlimited), weighted fair queuing across sessions, retries and a circuit breaker
+    openrouter_max_in_flight: int = 64
+    openrouter_rate_per_second: float = 0.0
+    openrouter_rate_burst: int = 20
+    sarvam_max_in_flight: int = 64
+    sarvam_rate_per_second: float = 0.0
+    sarvam_rate_burst: int = 20
+    governor_background_weight: float = 0.5  # share of work outside a session vs. one session
+    upstream_queue_timeout: float = 10.0
+    upstream_max_retries: int = 2
+    upstream_retry_backoff_ms: float = 200.0
+    upstream_retry_max_backoff_ms: float = 2000.0
+    upstream_breaker_failures: int = 5
+    upstream_breaker_cooldown_seconds: float = 15.0
+
+    # Stream LLM tokens over SSE and pipeline finished sentences into TTS
+    llm_streaming: bool = True
+
+    # Hedge tutor LLM calls: when no first token arrives within a rolling percentile of
+    # recent time-to-first-token, race a duplicate on llm_fallback_model (empty = the same
+    # model) and keep whichever answers first. A request that fails outright is also
+    # re-sent to llm_fallback_model when one is set.
+    llm_hedging: bool = True
+    llm_fallback_model: str = ""
+    llm_hedge_percentile: float = 0.9
+    llm_hedge_window: int = 200
+    llm_hedge_min_samples: int = 20
+    llm_hedge_initial_delay_ms: float = 1500.0  # until min_samples have been seen
+    llm_hedge_min_delay_ms: float = 300.0
+    llm_hedge_max_delay_ms: float = 4000.0
+    llm_hedges_per_minute: int = 30
+
+    # Move the conversation logs of completed (after a grace period) and long-idle sessions
+    # out of the hot table into compressed, append-only segment files; history reads fall
+    # through to them transparently. See services/archiver.py.
+    archive_logs: bool = True
+    archive_dir: str = ""  # default: "<database file>-archive" next to the database
+    archive_compression: str = "auto"  # "zstd" (needs zstandard), "gzip", or "auto" for zstd when installed
+    archive_compression_level: int = 0  # 0 = the codec's default
+    archive_completed_grace_hours: float = 24.0
+    archive_idle_days: float = 30.0
+    archive_interval_seconds: float = 3600.0
+    archive_batch_sessions: int = 500  # sessions per segment (and per delete transaction)
+    archive_vacuum_pages: int = 2000  # freed pages handed back to the filesystem per batch
+
+    # Prompt context budget (estimated tokens per LLM call, system prompt included). Past
+    # context_summarize_at of it, older turns of the section are folded into a rolling
+    # summary in the background; the newest context_recent_fraction stays verbatim.
+    context_compaction: bool = True
+    context_budget_tokens: int = 4000
+    context_instruction_tokens: int = 300  # reserved for the per-turn tutor instruction
+    context_summarize_at: float = 0.75
+    context_recent_fraction: float = 0.4
+    context_summary_max_tokens: int = 250
+
+    # Serve the opening turn of each section (the same prompt for every learner in a
+    # language) from a pool of pre-generated variants with pre-synthesized audio
+    variant_pool: bool = True
+    variant_pool_size: int = 3
+    variant_pool_pace: float = 1.25  # audio is pre-synthesized at this pace; others synthesize live
+    variant_pool_refresh_seconds: float = 6 * 3600  # replace the oldest variant per turn this often (0 = never)
+    variant_pool_concurrency: int = 4
+
+    # Pre-rendered asset bundle (scripts/build_assets.py): opening turns' text and audio per
+    # supported pace, served from /api/assets/{hash} and referenced by URL over the WebSocket
+    asset_bundle: bool = True
+    asset_bundle_dir: str = ""  # empty = <repo>/cache/assets
+    asset_paces: list[float] = [0.75, 1.0, 1.25, 1.5]  # the frontend's speed options
+
+    # Pre-generate the next turn while the current one plays, when the curriculum makes it deterministic
+    speculative_turns: bool = True
+
+    # Learner audio upload: chunks are spooled (memory, then disk) up to a per-session cap
+    # and forwarded to STT while the learner is still speaking
+    stt_stream_upload: bool = True
+    stt_streaming_url: str = ""  # empty = streamed multipart to the regular endpoint
+    stt_max_upload_bytes: int = 10 * 1024 * 1024
+    stt_spool_memory_bytes: int = 1024 * 1024
+    stt_forward_queue_chunks: int = 32
+
+    # Where LLM/TTS/STT jobs run: "inline" on the WebSocket event loop, "process" in a pool
+    # of worker processes per front end, or "package.module:Class" for a custom Broker
+    job_broker: str = "inline"
+    job_workers: int = 2
+    job_worker_concurrency: int = 64
+    job_timeout_seconds: float = 60.0
+
+    # Turn trace records are logged on "backend.turns"; slow ones at WARNING
+    turn_trace_file: str = ""  # also append records here as JSON lines
+    turn_trace_slow_seconds: float = 5.0
+
+    # TTS audio cache (memory LRU + shared disk tier)
+    tts_cache_enabled: bool = True
+    tts_cache_memory_bytes: int = 64 * 1024 * 1024
+    tts_cache_disk: bool = True
+    tts_cache_dir: str = ""  # empty = <repo>/cache/tts
+    tts_cache_disk_bytes: int = 1024 * 1024 * 1024
+    tts_cache_ttl_seconds: float = 7 * 24 * 3600
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
 
@@ -1,27 +1,559 @@
+import asyncio
+import hashlib
+import logging
+import time
 import aiosqlite
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+from backend.config import settings
+from backend.services.log_archive import read_block
+from backend.services.metrics import timed
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tutor.db")
-SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "db", "schema.sql")
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
 
 
-async def get_db() -> aiosqlite.Connection:
-    db = await aiosqlite.connect(DB_PATH)
+def _path_from_url(url: str) -> str:
+    """sqlite:///relative/or/absolute.db -> file path; relative paths are from the repo root."""
+    prefix = "sqlite:///"
+    if not url.startswith(prefix):
+        raise ValueError(f"Only sqlite:/// database URLs are supported, got {url!r}")
+    path = url[len(prefix):]
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(ROOT_DIR, path))
+
+
+DB_PATH = _path_from_url(settings.database_url)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "db", "migrations")
+
+logger = logging.getLogger(__name__)
+
+
+async def _connect(path: str) -> aiosqlite.Connection:
+    """Open a connection with the per-connection PRAGMAs applied once, at creation."""
+    db = await aiosqlite.connect(path)
     db.row_factory = aiosqlite.Row
+    # Lets the archiver hand freed pages back incrementally. Only takes effect on a new,
+    # empty file (so it has to come before journal_mode); existing files keep their mode.
+    await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
     await db.execute("PRAGMA journal_mode=WAL")
+    await db.execute("PRAGMA synchronous=NORMAL")
+    await db.execute(f"PRAGMA busy_timeout={int(settings.db_busy_timeout_ms)}")
+    await db.execute(f"PRAGMA mmap_size={int(settings.db_mmap_size)}")
+    await db.execute(f"PRAGMA cache_size={-int(settings.db_cache_size_kib)}")
     return db
 
 
-async def init_db():
-    """Initialize the database with schema."""
-    schema = Path(SCHEMA_PATH).read_text()
-    db = await get_db()
-    try:
-        await db.executescript(schema)
-        await db.commit()
-    finally:
-        await db.close()
+async def get_db(path: str | None = None) -> aiosqlite.Connection:
+    """Open a standalone connection. Request handlers should use read_db()/write_db() instead."""
+    return await _connect(path or shard_paths()[0])
+
+
+class ConnectionPool:
+    """Bounded pool of initialized read connections plus one dedicated writer connection.
+
+    SQLite allows a single writer at a time, so all writes go through one connection
+    guarded by a lock; that serializes them in-process instead of spinning on SQLITE_BUSY.
+    Reads run concurrently on up to `read_size` connections (WAL lets them overlap the writer).
+    """
+
+    def __init__(self, path: str, read_size: int):
+        self.path = path
+        self.read_size = read_size
+        self._idle: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._read_open = 0
+        self._read_in_use = 0
+        self._opening = asyncio.Lock()
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+        self._waits = {
+            "read": {"acquires": 0, "waits": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0},
+            "write": {"acquires": 0, "waits": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0},
+        }
+
+    async def open(self):
+        self._writer = await _connect(self.path)
+
+    async def close(self):
+        self._closed = True
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+        self._read_open = 0
+        if self._writer is not None:
+            async with self._write_lock:
+                await self._writer.close()
+                self._writer = None
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        started = time.monotonic()
+        db = await self._acquire_reader()
+        self._record_wait("read", time.monotonic() - started)
+        self._read_in_use += 1
+        try:
+            yield db
+        finally:
+            self._read_in_use -= 1
+            if self._closed:
+                await db.close()
+                self._read_open -= 1
+            else:
+                # Never hand a connection with an open transaction to the next request
+                if db.in_transaction:
+                    await db.rollback()
+                self._idle.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        started = time.monotonic()
+        async with self._write_lock:
+            self._record_wait("write", time.monotonic() - started)
+            if self._writer is None:
+                await self.open()
+            try:
+                yield self._writer
+            except BaseException:
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+                raise
+
+    async def _acquire_reader(self) -> aiosqlite.Connection:
+        if self._idle.empty():
+            async with self._opening:
+                if self._idle.empty() and self._read_open < self.read_size:
+                    self._read_open += 1
+                    try:
+                        return await _connect(self.path)
+                    except BaseException:
+                        self._read_open -= 1
+                        raise
+        return await self._idle.get()
+
+    def _record_wait(self, kind: str, waited: float):
+        stats = self._waits[kind]
+        stats["acquires"] += 1
+        # Anything above a millisecond means the caller queued behind another holder
+        if waited > 0.001:
+            stats["waits"] += 1
+            stats["wait_seconds"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    def stats(self) -> dict:
+        return {
+            "read_pool_size": self.read_size,
+            "read_open": self._read_open,
+            "read_in_use": self._read_in_use,
+            "read_idle": self._idle.qsize(),
+            "writer_busy": self._write_lock.locked(),
+            "read": {**self._waits["read"], "wait_seconds": round(self._waits["read"]["wait_seconds"], 4)},
+            "write": {**self._waits["write"], "wait_seconds": round(self._waits["write"]["wait_seconds"], 4)},
+        }
+
+
+# --- Shards ---
+#
+# With db_shards > 1, every session lives in one of N SQLite files chosen by a stable
+# hash of its id, together with its progress rows and conversation log. Each shard has
+# its own connection pool and write-behind queue, so writes to different shards commit
+# in parallel. Queries keyed by session go to one shard; the rest scatter to all.
+
+def shard_paths(count: int | None = None) -> list[str]:
+    """Database files for `count` shards (default: configured). One shard is DB_PATH itself."""
+    count = count or settings.db_shards
+    if count == 1:
+        return [DB_PATH]
+    stem, suffix = os.path.splitext(DB_PATH)
+    return [f"{stem}.shard{i}-of-{count}{suffix}" for i in range(count)]
+
+
+def shard_index(session_id: str, count: int) -> int:
+    """Stable across processes and restarts (unlike hash())."""
+    if count == 1:
+        return 0
+    digest = hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+class Shard:
+    """One database file with its connection pool and, in the app, its write-behind queue."""
+
+    def __init__(self, index: int, path: str):
+        self.index = index
+        self.path = path
+        self.pool = ConnectionPool(path, settings.db_read_pool_size)
+        self.write_queue: WriteBehindQueue | None = None
+
+
+_shards: list[Shard] = []
+
+
+def _get_shards() -> list[Shard]:
+    if not _shards:
+        # Outside the app lifespan (scripts): open lazily; each writer connects on first use
+        _shards.extend(Shard(i, path) for i, path in enumerate(shard_paths()))
+    return _shards
+
+
+def _shard(session_id: str | None) -> Shard:
+    shards = _get_shards()
+    if session_id is None:
+        if len(shards) > 1:
+            raise ValueError("Sharded storage needs a session_id to route this query")
+        return shards[0]
+    return shards[shard_index(session_id, len(shards))]
+
+
+def shard_count() -> int:
+    return len(_get_shards())
+
+
+@asynccontextmanager
+async def shard_db(index: int, write: bool = False) -> AsyncIterator[aiosqlite.Connection]:
+    """A connection to one shard by index, for maintenance jobs that walk every shard.
+
+    With `write`, this is the shard's writer connection (held exclusively), for jobs that
+    run their own transactions rather than going through the write-behind queue.
+    """
+    pool = _get_shards()[index].pool
+    if write:
+        async with pool.writer() as db:
+            yield db
+    else:
+        async with pool.reader() as db:
+            yield db
+
+
+def archive_dir() -> str:
+    """Where archived conversation logs live; shared by every shard."""
+    return settings.archive_dir or f"{os.path.splitext(DB_PATH)[0]}-archive"
+
+
+async def init_pool():
+    for shard in _get_shards():
+        if shard.pool._writer is None:
+            await shard.pool.open()
+
+
+async def close_pool():
+    shards = list(_shards)
+    _shards.clear()
+    for shard in shards:
+        await shard.pool.close()
+
+
+@asynccontextmanager
+async def read_db(session_id: str | None = None) -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a pooled connection for reads on the shard holding `session_id`."""
+    async with _shard(session_id).pool.reader() as db:
+        yield db
+
+
+@asynccontextmanager
+async def write_db(session_id: str | None = None) -> AsyncIterator[aiosqlite.Connection]:
+    """Get a handle for a group of writes to the shard holding `session_id`.
+
+    With the write-behind queue running (app lifespan, db_write_mode "sync"/"group") this
+    yields a stand-in that queues the helpers' statements for the next group commit;
+    otherwise it holds the shard's single writer connection and commits directly.
+    """
+    shard = _shard(session_id)
+    with timed("db_write"):
+        if shard.write_queue is not None:
+            writes = _QueuedWrites(shard.write_queue)
+            yield writes
+            await writes.commit()
+            return
+        async with shard.pool.writer() as db:
+            yield db
+
+
+async def scatter_read(query: Callable[[aiosqlite.Connection], Awaitable[list]]) -> list[list]:
+    """Run a read on every shard concurrently; one result per shard, in shard order."""
+    async def run(shard: Shard) -> list:
+        async with shard.pool.reader() as db:
+            return await query(db)
+
+    return await asyncio.gather(*(run(shard) for shard in _get_shards()))
+
+
+async def gather_read(
+    session_ids: list[str], query: Callable[[aiosqlite.Connection, list[str]], Awaitable[dict]],
+) -> dict:
+    """Run a read for many sessions: one call per shard that holds any of them, concurrently,
+    with that shard's ids. The per-shard dicts are merged into one."""
+    shards = _get_shards()
+    by_shard: dict[int, list[str]] = {}
+    for session_id in session_ids:
+        by_shard.setdefault(shard_index(session_id, len(shards)), []).append(session_id)
+
+    async def run(index: int, ids: list[str]) -> dict:
+        async with shards[index].pool.reader() as db:
+            return await query(db, ids)
+
+    merged: dict = {}
+    for result in await asyncio.gather(*(run(index, ids) for index, ids in by_shard.items())):
+        merged.update(result)
+    return merged
+
+
+def _merge_stats(per_shard: list[dict]) -> dict:
+    """Sum numeric counters across shards (max for max_*), keeping the per-shard detail."""
+    if len(per_shard) == 1:
+        return per_shard[0]
+    merged: dict = {}
+    for stats in per_shard:
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                merged.setdefault(key, value)
+            elif key.startswith("max_"):
+                merged[key] = max(merged.get(key, 0), value)
+            else:
+                merged[key] = merged.get(key, 0) + value
+    merged["shards"] = per_shard
+    return merged
+
+
+def pool_stats() -> dict:
+    if not _shards:
+        return {"open": False}
+    return _merge_stats([shard.pool.stats() for shard in _shards])
+
+
+# --- Write-behind group commit ---
+
+class WriteBehindQueue:
+    """Bounded queue of pending writes, drained by one task into batched transactions.
+
+    Statements from every session are committed together every `interval` seconds or
+    `max_rows` statements, whichever comes first, so a turn's four or five small writes
+    cost a share of one fsync instead of one each. In "sync" mode writers still wait for
+    the commit that contains their statements; in "group" mode they return as soon as the
+    statements are queued. A full queue blocks producers (backpressure).
+    """
+
+    def __init__(self, pool: ConnectionPool, mode: str, interval: float, max_rows: int, max_queued: int):
+        self.pool = pool
+        self.mode = mode
+        self.interval = interval
+        self.max_rows = max_rows
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._task: asyncio.Task | None = None
+        self._stats = {
+            "batches": 0,
+            "statements": 0,
+            "max_batch": 0,
+            "errors": 0,
+            "backpressure_waits": 0,
+        }
+
+    def start(self):
+        self._task = asyncio.create_task(self._drain())
+
+    async def close(self):
+        """Flush everything queued so far and stop the drain task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, statements: list[tuple[str, tuple]]):
+        future = asyncio.get_running_loop().create_future() if self.mode == "sync" else None
+        if self._queue.full():
+            self._stats["backpressure_waits"] += 1
+        await self._queue.put((statements, future))
+        if future is not None:
+            await future
+
+    async def flush(self):
+        """Wait until every write queued before this call is committed."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(([], future))
+        await future
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "queue_depth": self._queue.qsize(), **self._stats}
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            rows = len(item[0])
+            deadline = loop.time() + self.interval
+            while rows < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            await self._commit(batch)
+
+    async def _commit(self, batch: list):
+        statements = [stmt for stmts, _ in batch for stmt in stmts]
+        try:
+            async with self.pool.writer() as db:
+                for sql, params in statements:
+                    await db.execute(sql, params)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Group commit of {len(statements)} statements failed, retrying individually: {e}")
+            await self._commit_individually(batch)
+            return
+        self._record_batch(len(statements))
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    async def _commit_individually(self, batch: list):
+        """Isolate a failing writer so one bad statement does not drop the whole batch."""
+        for statements, future in batch:
+            try:
+                async with self.pool.writer() as db:
+                    for sql, params in statements:
+                        await db.execute(sql, params)
+                    await db.commit()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Queued write failed: {e}")
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                continue
+            self._record_batch(len(statements))
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    def _record_batch(self, size: int):
+        self._stats["batches"] += 1
+        self._stats["statements"] += size
+        self._stats["max_batch"] = max(self._stats["max_batch"], size)
+
+
+class _QueuedWrites:
+    """Stands in for the writer connection inside write_db(), collecting statements for the queue."""
+
+    def __init__(self, queue: WriteBehindQueue):
+        self._queue = queue
+        self._statements: list[tuple[str, tuple]] = []
+
+    async def execute(self, sql: str, params: tuple = ()):
+        self._statements.append((sql, tuple(params)))
+
+    async def commit(self):
+        statements, self._statements = self._statements, []
+        if statements:
+            await self._queue.submit(statements)
+
+
+async def init_write_queue():
+    if settings.db_write_mode == "direct":
+        return
+    for shard in _get_shards():
+        if shard.write_queue is not None:
+            continue
+        shard.write_queue = WriteBehindQueue(
+            shard.pool,
+            mode=settings.db_write_mode,
+            interval=settings.db_write_batch_interval_ms / 1000,
+            max_rows=settings.db_write_batch_max_rows,
+            max_queued=settings.db_write_queue_size,
+        )
+        shard.write_queue.start()
+
+
+async def close_write_queue():
+    for shard in _shards:
+        if shard.write_queue is not None:
+            queue, shard.write_queue = shard.write_queue, None
+            await queue.close()
+
+
+async def flush_writes(session_id: str | None = None):
+    """Make queued writes visible to readers: one session's shard, or every shard."""
+    shards = [_shard(session_id)] if session_id is not None else _get_shards()
+    await asyncio.gather(*(s.write_queue.flush() for s in shards if s.write_queue is not None))
+
+
+def write_queue_stats() -> dict:
+    queues = [shard.write_queue for shard in _shards if shard.write_queue is not None]
+    if not queues:
+        return {"mode": "direct"}
+    return _merge_stats([queue.stats() for queue in queues])
+
+
+async def init_db() -> list[str]:
+    """Initialize every shard by applying any pending schema migrations."""
+    paths = shard_paths()
+    if len(paths) > 1 and os.path.exists(DB_PATH) and not any(os.path.exists(p) for p in paths):
+        logger.warning(
+            f"{DB_PATH} exists but its {len(paths)} shards do not; "
+            f"run scripts/split_db.py --shards {len(paths)} to move existing sessions"
+        )
+    applied = []
+    for path in paths:
+        db = await get_db(path)
+        try:
+            applied.extend(await run_migrations(db))
+        finally:
+            await db.close()
+    return applied
+
+
+# --- Schema migrations ---
+
+def list_migrations() -> list[tuple[int, str, Path]]:
+    """Migration files named NNNN_description.sql, in version order."""
+    migrations = []
+    for path in Path(MIGRATIONS_DIR).glob("*.sql"):
+        version, _, name = path.stem.partition("_")
+        migrations.append((int(version), name, path))
+    return sorted(migrations)
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    await db.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    row = await cursor.fetchone()
+    return row[0]
+
+
+async def run_migrations(db: aiosqlite.Connection, target: int | None = None) -> list[str]:
+    """Apply migrations newer than the recorded schema_version, each in its own transaction."""
+    current = await get_schema_version(db)
+    await db.commit()
+    applied = []
+    for version, name, path in list_migrations():
+        if version <= current or (target is not None and version > target):
+            continue
+        # executescript runs outside the driver's implicit transactions, so wrap the
+        # migration and its version row together to apply it atomically
+        try:
+            await db.executescript(
+                "BEGIN;\n"
+                f"{path.read_text()}\n"
+                f"INSERT INTO schema_version (version, name) VALUES ({version}, '{name}');\n"
+                "COMMIT;"
+            )
+        except Exception:
+            if db.in_transaction:
+                await db.rollback()
+            raise
+        applied.append(path.name)
+    return applied
 
 
 # --- Session helpers ---
@@ -31,6 +563,8 @@ async def create_session(db: aiosqlite.Connection, session_id: str, module_id: s
         "INSERT INTO sessions (id, module_id, language) VALUES (?, ?, ?)",
         (session_id, module_id, language),
     )
+    await _rollup(db, ROLLUP_MODULE_STARTED, (module_id, language))
+    await _rollup(db, ROLLUP_FIRST_STEP_REACHED, (module_id, language))
     await db.commit()
 
 
@@ -43,6 +577,9 @@ async def get_session(db: aiosqlite.Connection, session_id: str) -> dict | None:
 
 
 async def update_session_position(db: aiosqlite.Connection, session_id: str, section: int, step: int):
+    # Both read the position being left, so they go before the update
+    await _rollup(db, ROLLUP_STEP_TIMED, (settings.analytics_step_idle_cap_seconds, session_id, section, step))
+    await _rollup(db, ROLLUP_STEP_REACHED, (section, step, session_id, section, step))
     await db.execute(
         "UPDATE sessions SET current_section = ?, current_step = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
         (section, step, session_id),
@@ -51,6 +588,8 @@ async def update_session_position(db: aiosqlite.Connection, session_id: str, sec
 
 
 async def update_session_status(db: aiosqlite.Connection, session_id: str, status: str):
+    if status == "completed":
+        await _rollup(db, ROLLUP_MODULE_COMPLETED, (session_id,))
     await db.execute(
         "UPDATE sessions SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
         (status, session_id),
@@ -58,6 +597,33 @@ async def update_session_status(db: aiosqlite.Connection, session_id: str, statu
     await db.commit()
 
 
+async def list_sessions(
+    db: aiosqlite.Connection, status: str | None = None,
+    before: tuple[str, str] | None = None, limit: int | None = None,
+) -> list[dict]:
+    """Sessions with `status` (default: active or paused), most recently updated first.
+
+    `before` is the (updated_at, id) of the last session of the previous page; only
+    sessions ordered after it are returned, at most `limit` of them.
+    """
+    if status:
+        source, where, params = "sessions", "status = ?", [status]
+    else:
+        # Without ANALYZE statistics the planner prefers the status index for an IN list
+        # and sorts every live session; the partial index is already in page order
+        source, where, params = "sessions INDEXED BY idx_sessions_live_updated_id", "status IN ('active', 'paused')", []
+    if before is not None:
+        where += " AND (updated_at, id) < (?, ?)"
+        params.extend(before)
+    sql = f"SELECT * FROM {source} WHERE {where} ORDER BY updated_at DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    cursor = await db.execute(sql, params)
+    rows = await cursor.fetchall()
+    return [dict(r) for r in rows]
+
+
 # --- Section progress helpers ---
 
 async def init_section_progress(db: aiosqlite.Connection, session_id: str, section_count: int):
@@ -70,6 +636,11 @@ async def init_section_progress(db: aiosqlite.Connection, session_id: str, secti
 
 
 async def update_section_progress(db: aiosqlite.Connection, session_id: str, section_index: int, status: str):
+    if status == "in_progress":
+        await _rollup(db, ROLLUP_SECTION_STARTED, (session_id, section_index))
+    elif status == "completed":
+        await _rollup(db, ROLLUP_SECTION_DURATION, (session_id, section_index))
+        await _rollup(db, ROLLUP_SECTION_COMPLETED, (session_id, section_index))
     if status == "in_progress":
         await db.execute(
             "UPDATE section_progress SET status = ?, started_at = CURRENT_TIMESTAMP WHERE session_id = ? AND section_index = ?",
@@ -97,6 +668,37 @@ async def get_section_progress(db: aiosqlite.Connection, session_id: str) -> lis
     return [dict(r) for r in rows]
 
 
+PROGRESS_QUERY_CHUNK = 500  # ids per IN list, well under SQLite's bound-parameter limit
+
+
+async def get_progress_snapshots(db: aiosqlite.Connection, session_ids: list[str]) -> dict[str, dict]:
+    """Status, position timestamp and every section's status for many sessions at once.
+
+    One joined query per chunk of ids instead of two queries per session. Unknown ids
+    are absent from the result.
+    """
+    snapshots: dict[str, dict] = {}
+    for start in range(0, len(session_ids), PROGRESS_QUERY_CHUNK):
+        chunk = session_ids[start:start + PROGRESS_QUERY_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        cursor = await db.execute(
+            "SELECT s.id, s.module_id, s.status, s.updated_at, p.section_index, p.status AS section_status "
+            "FROM sessions s LEFT JOIN section_progress p ON p.session_id = s.id "
+            f"WHERE s.id IN ({placeholders}) ORDER BY s.id, p.section_index",
+            chunk,
+        )
+        for row in await cursor.fetchall():
+            snapshot = snapshots.get(row["id"])
+            if snapshot is None:
+                snapshot = snapshots[row["id"]] = {
+                    "module_id": row["module_id"], "status": row["status"],
+                    "updated_at": row["updated_at"], "sections": [],
+                }
+            if row["section_index"] is not None:
+                snapshot["sections"].append((row["section_index"], row["section_status"]))
+    return snapshots
+
+
 # --- Conversation log helpers ---
 
 async def log_conversation(db: aiosqlite.Connection, session_id: str, section_index: int, step_index: int, role: str, text: str, language: str = "en"):
@@ -104,10 +706,13 @@ async def log_conversation(db: aiosqlite.Connection, session_id: str, section_in
         "INSERT INTO conversation_log (session_id, section_index, step_index, role, text, language) VALUES (?, ?, ?, ?, ?, ?)",
         (session_id, section_index, step_index, role, text, language),
     )
+    await _rollup(db, ROLLUP_TURN, (section_index, step_index, language, role, role, session_id))
     await db.commit()
 
 
 async def get_conversation_history(db: aiosqlite.Connection, session_id: str, section_index: int | None = None) -> list[dict]:
+    """A session's log in order, archived turns first (see services/archiver.py)."""
+    archived = await _get_archived_history(db, session_id, section_index)
     if section_index is not None:
         cursor = await db.execute(
             "SELECT role, text FROM conversation_log WHERE session_id = ? AND section_index = ? ORDER BY id",
@@ -119,4 +724,144 @@ async def get_conversation_history(db: aiosqlite.Connection, session_id: str, se
             (session_id,),
         )
     rows = await cursor.fetchall()
+    return archived + [dict(r) for r in rows]
+
+
+async def get_conversation_rows(db: aiosqlite.Connection, session_id: str, after_id: int = 0, limit: int = 500) -> list[dict]:
+    """Up to `limit` hot log rows of a session with ids above `after_id`, in order."""
+    cursor = await db.execute(
+        "SELECT id, section_index, step_index, role, text, language, created_at FROM conversation_log "
+        "WHERE session_id = ? AND id > ? ORDER BY id LIMIT ?",
+        (session_id, after_id, limit),
+    )
+    rows = await cursor.fetchall()
     return [dict(r) for r in rows]
+
+
+async def list_archived_blocks(db: aiosqlite.Connection, session_id: str) -> list[dict]:
+    """Where a session's archived log rows are, oldest segment first."""
+    cursor = await db.execute(
+        "SELECT segment, byte_offset, byte_length FROM archived_sessions WHERE session_id = ? ORDER BY rowid",
+        (session_id,),
+    )
+    rows = await cursor.fetchall()
+    return [dict(r) for r in rows]
+
+
+async def read_archived_block(block: dict) -> list[dict]:
+    return await asyncio.to_thread(
+        read_block, archive_dir(), block["segment"], block["byte_offset"], block["byte_length"],
+    )
+
+
+async def _get_archived_history(db: aiosqlite.Connection, session_id: str, section_index: int | None) -> list[dict]:
+    history = []
+    for block in await list_archived_blocks(db, session_id):
+        rows = await read_archived_block(block)
+        history.extend(
+            {"role": row["role"], "text": row["text"]}
+            for row in rows if section_index is None or row["section_index"] == section_index
+        )
+    return history
+
+
+# --- Analytics rollups ---
+#
+# Each write helper above that moves a session along also bumps the rollup rows it
+# affects (migration 0006), in the same transaction or write-behind batch. Statements
+# that depend on the state being replaced run before the update and guard on it, so a
+# repeated call (e.g. marking a section in progress again on resume) counts once.
+
+# Upper bounds (seconds) of the completed-section duration buckets; the last is open-ended
+ANALYTICS_DURATION_BUCKETS = (30, 60, 120, 180, 300, 450, 600, 900, 1200, 1800, 2700, 3600, 7200)
+
+
+def duration_bucket_sql(seconds: str) -> str:
+    """A CASE expression mapping a duration in seconds to its bucket index."""
+    cases = " ".join(f"WHEN {seconds} <= {bound} THEN {i}" for i, bound in enumerate(ANALYTICS_DURATION_BUCKETS))
+    return f"CASE {cases} ELSE {len(ANALYTICS_DURATION_BUCKETS)} END"
+
+
+_SECTION_SECONDS = "(julianday('now') - julianday(p.started_at)) * 86400"
+_STEP_SECONDS = "(julianday('now') - julianday(updated_at)) * 86400"
+
+ROLLUP_MODULE_STARTED = (
+    "INSERT INTO analytics_modules (module_id, language, started) VALUES (?, ?, 1) "
+    "ON CONFLICT (module_id, language) DO UPDATE SET started = started + 1"
+)
+ROLLUP_MODULE_COMPLETED = (
+    "INSERT INTO analytics_modules (module_id, language, completed) "
+    "SELECT module_id, language, 1 FROM sessions WHERE id = ? AND status != 'completed' "
+    "ON CONFLICT (module_id, language) DO UPDATE SET completed = completed + 1"
+)
+ROLLUP_SECTION_STARTED = (
+    "INSERT INTO analytics_sections (module_id, section_index, language, started) "
+    "SELECT s.module_id, p.section_index, s.language, 1 "
+    "FROM section_progress p JOIN sessions s ON s.id = p.session_id "
+    "WHERE p.session_id = ? AND p.section_index = ? AND p.status = 'not_started' "
+    "ON CONFLICT (module_id, section_index, language) DO UPDATE SET started = started + 1"
+)
+ROLLUP_SECTION_COMPLETED = (
+    "INSERT INTO analytics_sections (module_id, section_index, language, completed, seconds_total) "
+    f"SELECT s.module_id, p.section_index, s.language, 1, COALESCE({_SECTION_SECONDS}, 0) "
+    "FROM section_progress p JOIN sessions s ON s.id = p.session_id "
+    "WHERE p.session_id = ? AND p.section_index = ? AND p.status != 'completed' "
+    "ON CONFLICT (module_id, section_index, language) DO UPDATE SET "
+    "completed = completed + 1, seconds_total = seconds_total + excluded.seconds_total"
+)
+ROLLUP_SECTION_DURATION = (
+    "INSERT INTO analytics_section_durations (module_id, section_index, language, bucket, sessions) "
+    f"SELECT s.module_id, p.section_index, s.language, {duration_bucket_sql(_SECTION_SECONDS)}, 1 "
+    "FROM section_progress p JOIN sessions s ON s.id = p.session_id "
+    "WHERE p.session_id = ? AND p.section_index = ? AND p.status != 'completed' AND p.started_at IS NOT NULL "
+    "ON CONFLICT (module_id, section_index, language, bucket) DO UPDATE SET sessions = sessions + 1"
+)
+ROLLUP_FIRST_STEP_REACHED = (
+    "INSERT INTO analytics_steps (module_id, section_index, step_index, language, reached) VALUES (?, 0, 0, ?, 1) "
+    "ON CONFLICT (module_id, section_index, step_index, language) DO UPDATE SET reached = reached + 1"
+)
+ROLLUP_STEP_REACHED = (
+    "INSERT INTO analytics_steps (module_id, section_index, step_index, language, reached) "
+    "SELECT module_id, ?, ?, language, 1 FROM sessions WHERE id = ? AND (current_section, current_step) != (?, ?) "
+    "ON CONFLICT (module_id, section_index, step_index, language) DO UPDATE SET reached = reached + 1"
+)
+# updated_at is when the session entered its current step (or last resumed or paused there)
+ROLLUP_STEP_TIMED = (
+    "INSERT INTO analytics_steps (module_id, section_index, step_index, language, timed, seconds_total) "
+    f"SELECT module_id, current_section, current_step, language, 1, {_STEP_SECONDS} FROM sessions "
+    f"WHERE {_STEP_SECONDS} <= ? AND id = ? AND (current_section, current_step) != (?, ?) "
+    "ON CONFLICT (module_id, section_index, step_index, language) DO UPDATE SET "
+    "timed = timed + 1, seconds_total = seconds_total + excluded.seconds_total"
+)
+ROLLUP_TURN = (
+    "INSERT INTO analytics_steps (module_id, section_index, step_index, language, tutor_turns, learner_turns) "
+    "SELECT module_id, ?, ?, ?, ? = 'tutor', ? != 'tutor' FROM sessions WHERE id = ? "
+    "ON CONFLICT (module_id, section_index, step_index, language) DO UPDATE SET "
+    "tutor_turns = tutor_turns + excluded.tutor_turns, learner_turns = learner_turns + excluded.learner_turns"
+)
+
+
+async def _rollup(db: aiosqlite.Connection, sql: str, params: tuple):
+    if settings.analytics_rollups:
+        await db.execute(sql, params)
+
+
+# --- Section summary helpers ---
+
+async def get_section_summary(db: aiosqlite.Connection, session_id: str, section_index: int) -> dict | None:
+    cursor = await db.execute(
+        "SELECT covered, summary FROM section_summaries WHERE session_id = ? AND section_index = ?",
+        (session_id, section_index),
+    )
+    row = await cursor.fetchone()
+    return dict(row) if row is not None else None
+
+
+async def save_section_summary(db: aiosqlite.Connection, session_id: str, section_index: int, covered: int, summary: str):
+    await db.execute(
+        "INSERT INTO section_summaries (session_id, section_index, covered, summary) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (session_id, section_index) DO UPDATE SET "
+        "covered = excluded.covered, summary = excluded.summary, updated_at = CURRENT_TIMESTAMP",
+        (session_id, section_index, covered, summary),
+    )
+    await db.commit()
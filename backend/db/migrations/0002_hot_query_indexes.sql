@@ -0,0 +1,15 @@
+-- get_conversation_history: WHERE session_id = ? AND section_index = ? ORDER BY id.
+-- Key columns only: carrying role and text would copy every utterance into the index to
+-- save one row lookup per history row, and history is read once per connection.
+CREATE INDEX IF NOT EXISTS idx_conversation_log_session_section
+    ON conversation_log (session_id, section_index, id);
+
+-- list_sessions with an explicit status: WHERE status = ? ORDER BY updated_at DESC.
+CREATE INDEX IF NOT EXISTS idx_sessions_status_updated
+    ON sessions (status, updated_at);
+
+-- list_sessions default: WHERE status IN ('active', 'paused') ORDER BY updated_at DESC.
+-- An IN list defeats ordered reads from the index above; this partial index only holds
+-- live sessions (a small slice of the table) already in updated_at order.
+CREATE INDEX IF NOT EXISTS idx_sessions_live_updated
+    ON sessions (updated_at) WHERE status IN ('active', 'paused');
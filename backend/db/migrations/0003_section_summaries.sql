@@ -0,0 +1,11 @@
+-- Rolling summary of the older part of a section's conversation, used to keep prompts
+-- within the context budget. `covered` is how many of the section's log rows (in id
+-- order) the summary stands in for; the rest are sent verbatim.
+CREATE TABLE IF NOT EXISTS section_summaries (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    section_index INTEGER NOT NULL,
+    covered INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (session_id, section_index)
+);
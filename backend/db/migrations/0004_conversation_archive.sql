@@ -0,0 +1,12 @@
+-- Catalog of conversation logs moved out of conversation_log into compressed archive
+-- segments (services/archiver.py). A session archived more than once (resumed after going
+-- idle) has one row per segment, read back in rowid order.
+CREATE TABLE IF NOT EXISTS archived_sessions (
+    session_id TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL,
+    byte_length INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (session_id, segment)
+);
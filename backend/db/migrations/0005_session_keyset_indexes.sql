@@ -0,0 +1,10 @@
+-- list_sessions pages with a keyset on (updated_at, id): updated_at has one-second
+-- resolution, so id breaks ties and both must come from the index in order for
+-- WHERE (updated_at, id) < (?, ?) ORDER BY updated_at DESC, id DESC to seek rather than scan.
+DROP INDEX IF EXISTS idx_sessions_status_updated;
+CREATE INDEX IF NOT EXISTS idx_sessions_status_updated_id
+    ON sessions (status, updated_at, id);
+
+DROP INDEX IF EXISTS idx_sessions_live_updated;
+CREATE INDEX IF NOT EXISTS idx_sessions_live_updated_id
+    ON sessions (updated_at, id) WHERE status IN ('active', 'paused');
@@ -0,0 +1,50 @@
+-- Analytics rollups, kept current by the write helpers in database.py as sessions advance
+-- and read by /api/analytics. Their size depends on the curriculum, not on history, so
+-- analytics queries never scan conversation_log or section_progress. A database that
+-- already has history starts with empty rollups: run scripts/rebuild_analytics.py.
+
+-- Sessions started and completed per module
+CREATE TABLE IF NOT EXISTS analytics_modules (
+    module_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    started INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (module_id, language)
+) WITHOUT ROWID;
+
+-- Sections started and completed, and the total of completed sections' durations
+-- (completed_at - started_at)
+CREATE TABLE IF NOT EXISTS analytics_sections (
+    module_id TEXT NOT NULL,
+    section_index INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    started INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    seconds_total REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (module_id, section_index, language)
+) WITHOUT ROWID;
+
+-- Completed section durations by bucket (ANALYTICS_DURATION_BUCKETS), for percentiles
+CREATE TABLE IF NOT EXISTS analytics_section_durations (
+    module_id TEXT NOT NULL,
+    section_index INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (module_id, section_index, language, bucket)
+) WITHOUT ROWID;
+
+-- Sessions that reached each step, logged turns, and time spent in the step by sessions
+-- that moved on from it (timed of them, seconds_total in all)
+CREATE TABLE IF NOT EXISTS analytics_steps (
+    module_id TEXT NOT NULL,
+    section_index INTEGER NOT NULL,
+    step_index INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    reached INTEGER NOT NULL DEFAULT 0,
+    tutor_turns INTEGER NOT NULL DEFAULT 0,
+    learner_turns INTEGER NOT NULL DEFAULT 0,
+    timed INTEGER NOT NULL DEFAULT 0,
+    seconds_total REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (module_id, section_index, step_index, language)
+) WITHOUT ROWID;
@@ -1,17 +1,46 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from backend.database import init_db
-from backend.routers import modules, sessions, conversation
+from backend.database import (
+    init_db, init_pool, close_pool, init_write_queue, close_write_queue,
+    pool_stats as db_pool_stats, write_queue_stats,
+)
+from backend.routers import modules, sessions, conversation, assets, analytics
+from backend.services.assets import init_assets, close_assets, asset_bundle
 from backend.services.gemini import chat_completion
+from backend.services.http_clients import init_clients, close_clients, pool_stats
+from backend.services.archiver import init_archiver, close_archiver, archiver_stats
+from backend.services.governor import governor_stats
+from backend.services.hedging import hedging_stats
+from backend.services.jobs import init_jobs, close_jobs, job_stats
+from backend.services.metrics import db_queue_depth, init_turn_trace, render as render_metrics
 from backend.services.sarvam_tts import text_to_speech
+from backend.services.tts_cache import tts_cache
+from backend.services.speculation import speculation_stats
+from backend.services.variant_pool import init_variant_pool, close_variant_pool, variant_pool
 from backend.services.sarvam_stt import speech_to_text
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    init_turn_trace()
     await init_db()
+    await init_pool()
+    await init_write_queue()
+    await init_clients()
+    await init_jobs()
+    await init_assets()
+    await init_variant_pool(modules.AVAILABLE_MODULES)
+    await init_archiver()
     yield
+    await close_archiver()
+    await close_variant_pool()
+    await close_assets()
+    await close_jobs()
+    await close_clients()
+    await close_write_queue()
+    await close_pool()
 
 
 app = FastAPI(title="AI Leadership Tutor", version="0.1.0", lifespan=lifespan)
@@ -27,6 +56,8 @@ app.add_middleware(
 app.include_router(modules.router)
 app.include_router(sessions.router)
 app.include_router(conversation.router)
+app.include_router(assets.router)
+app.include_router(analytics.router)
 
 
 @app.get("/api/health")
@@ -34,6 +65,30 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/api/stats")
+async def stats():
+    return {
+        "upstream_pools": pool_stats(),
+        "governor": governor_stats(),
+        "llm_hedging": hedging_stats(),
+        "db_pool": db_pool_stats(),
+        "db_writes": write_queue_stats(),
+        "tts_cache": tts_cache.stats(),
+        "speculation": speculation_stats(),
+        "variant_pool": variant_pool.stats(),
+        "assets": asset_bundle.stats(),
+        "jobs": job_stats(),
+        "archive": archiver_stats(),
+    }
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    db_queue_depth.set(write_queue_stats().get("queue_depth", 0))
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Dev-only test routes
 @app.get("/api/test/gemini")
 async def test_gemini():
@@ -47,7 +102,7 @@ async def test_gemini():
 @app.get("/api/test/tts")
 async def test_tts():
     audio = await text_to_speech("Hello, welcome to the leadership tutor.", "en")
-    return {"audio_base64_length": len(audio)}
+    return {"audio_bytes": len(audio)}
 
 
 @app.post("/api/test/stt")
@@ -56,6 +56,15 @@ class ProgressResponse(BaseModel):
     overall_status: SessionStatus
 
 
+class ProgressBatchRequest(BaseModel):
+    session_ids: list[str]
+
+
+class ProgressBatchResponse(BaseModel):
+    sessions: list[ProgressResponse]
+    missing: list[str]  # requested ids with no such session
+
+
 # WebSocket message types
 class WSMessageType(str, Enum):
     # Client -> Server
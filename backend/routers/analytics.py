@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from backend.models import Language
+from backend.services.analytics import module_funnel, module_summaries
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+# Both read only the rollup tables, so their cost depends on the curriculum, not on how
+# many sessions or turns there have been.
+@router.get("/modules")
+async def list_module_analytics(language: Language | None = None):
+    return await module_summaries(language.value if language else None)
+
+
+@router.get("/modules/{module_id}")
+async def get_module_analytics(module_id: str, language: Language | None = None):
+    return await module_funnel(module_id, language.value if language else None)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from backend.services.assets import AUDIO_CONTENT_TYPE, asset_bundle
+
+router = APIRouter(prefix="/api/assets", tags=["assets"])
+
+# Assets are addressed by content hash, so a URL never changes meaning
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{asset_hash}")
+async def get_asset(asset_hash: str, request: Request):
+    etag = f'"{asset_hash}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    data = asset_bundle.blob(asset_hash)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type=AUDIO_CONTENT_TYPE, headers=headers)
@@ -1,59 +1,388 @@
 """WebSocket handler for the voice conversation loop."""
 
 import json
+import time
+import uuid
 import base64
+import asyncio
 import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from backend.config import settings
 from backend.database import (
-    get_db, get_session, update_session_position, update_session_status,
-    update_section_progress, log_conversation, get_conversation_history,
+    read_db, write_db, get_session, update_session_position, update_session_status,
+    update_section_progress, log_conversation,
 )
 from backend.services.tutor_engine import (
     load_curriculum, get_step, get_section, step_expects_response,
-    next_position, is_last_step, is_last_section, generate_tutor_turn,
+    next_position, is_last_step, is_last_section, build_system_prompt,
+)
+from backend.services.jobs import generate_turn, generate_turn_stream, synthesize, transcribe
+from backend.services.curriculum import Curriculum
+from backend.services.segmenter import SentenceSegmenter
+from backend.services.speculation import (
+    TurnSpeculator, SpeculativeTurn, SpeculationCost, split_segments, synthesize_segments,
+)
+from backend.services.history import ConversationHistory
+from backend.services.governor import set_session
+from backend.services.variant_pool import Variant, variant_pool
+from backend.services.assets import BundledTurn, asset_bundle, asset_url, pace_key
+from backend.services.context import estimate_tokens
+from backend.services.audio_frames import (
+    pack_frame, unpack_frame, turn_number, TUTOR_AUDIO, LEARNER_AUDIO, CODEC_WAV, FLAG_LAST,
+)
+from backend.services.learner_audio import LearnerAudioUpload, UploadTooLarge
+from backend.services.metrics import (
+    TurnTrace, active_sessions, current_trace, detach_trace, finish_turn, observe, start_turn, timed,
+    turn_cancel_seconds, upstream_calls_avoided,
 )
-from backend.services.sarvam_tts import text_to_speech
-from backend.services.sarvam_stt import speech_to_text
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+@dataclass
+class LiveSession:
+    """Per-connection state shared by the turn helpers."""
+    ws: WebSocket
+    session_id: str
+    curriculum: Curriculum
+    language: str
+    history: ConversationHistory
+    section_idx: int = 0  # current lesson position, moved on by the turn runner
+    step_idx: int = 0
+    pace: float = 1.25  # updated by client via set_pace message
+    stream_text: bool = False
+    binary_audio: bool = False
+    stream_audio: bool = False  # binary learner frames are chunks of one answer, ended by audio_end
+    asset_audio: bool = False  # bundled audio is sent as /api/assets URLs for the client to fetch
+    speculator: TurnSpeculator = field(default_factory=TurnSpeculator)
+    upload: LearnerAudioUpload | None = None  # the answer currently being recorded
+    upload_rejected: bool = False  # the recording went over the cap; its remaining chunks are dropped
+    runner: asyncio.Task | None = None  # the turn work in progress (see _start_runner)
+
+    def drop_upload(self):
+        if self.upload is not None:
+            self.upload.abort()
+            self.upload = None
+
+    async def log(self, section_idx: int, step_idx: int, role: str, text: str):
+        """Persist a turn and mirror it into the in-memory history."""
+        async with write_db(self.session_id) as db:
+            await log_conversation(db, self.session_id, section_idx, step_idx, role, text, self.language)
+        self.history.append(section_idx, role, text)
+
+
 async def send_json(ws: WebSocket, msg_type: str, data: dict | None = None):
     await ws.send_text(json.dumps({"type": msg_type, "data": data or {}}))
 
 
-async def send_tutor_message(ws: WebSocket, text: str, language: str, pace: float = 1.25):
-    """Send tutor text + audio to the client."""
-    await send_json(ws, "tutor_text", {"text": text})
-    await send_json(ws, "status", {"state": "synthesizing"})
+async def send_tutor_audio_ref(ws: WebSocket, asset_hash: str, seq: int, turn_id: str):
+    """Point the client at a bundled audio asset instead of sending the audio itself."""
+    with timed("ws_send"):
+        await send_json(ws, "tutor_audio", {
+            "url": asset_url(asset_hash), "hash": asset_hash, "seq": seq, "turn_id": turn_id,
+        })
+    trace = current_trace()
+    if trace is not None:
+        trace.mark("first_audio")
+
+
+async def send_tutor_audio(ws: WebSocket, audio: bytes, seq: int, turn_id: str, binary: bool = False):
+    """Send one audio chunk: a binary frame for clients that negotiated it, base64 JSON otherwise."""
+    with timed("ws_send"):
+        if binary:
+            await ws.send_bytes(pack_frame(TUTOR_AUDIO, CODEC_WAV, audio, seq=seq, turn=turn_number(turn_id)))
+        else:
+            audio_b64 = base64.b64encode(audio).decode("ascii")
+            await send_json(ws, "tutor_audio", {"audio": audio_b64, "seq": seq, "turn_id": turn_id})
+    trace = current_trace()
+    if trace is not None:
+        trace.mark("first_audio")
+
+
+async def stream_tutor_message(
+    ws: WebSocket,
+    deltas: AsyncIterator[str],
+    language: str,
+    pace: float = 1.25,
+    stream_text: bool = False,
+    binary_audio: bool = False,
+    on_text: Callable[[str], Awaitable[None]] | None = None,
+    turn_id: str | None = None,
+) -> str:
+    """Send a tutor turn to the client, pipelining finished sentences into TTS.
+
+    Each sentence is handed to TTS as soon as the segmenter closes it, and the audio
+    chunks are sent in order (with sequence numbers) while the LLM is still generating.
+    Clients that opted into `stream_text` also get incremental `tutor_text` deltas, and
+    `binary_audio` clients get audio as binary frames instead of base64 JSON.
+    Returns the full text; `on_text` is awaited with it as soon as generation ends.
+    """
+    turn_id = turn_id or uuid.uuid4().hex[:8]
+    segmenter = SentenceSegmenter()
+    pending: asyncio.Queue = asyncio.Queue()
+    sender = asyncio.create_task(_send_audio_in_order(ws, pending, turn_id, binary_audio))
+    parts = []
+    segment_count = 0
+
+    async def queue_segment(segment: str):
+        nonlocal segment_count
+        if segment_count == 0:
+            await send_json(ws, "status", {"state": "synthesizing"})
+        segment_count += 1
+        pending.put_nowait(asyncio.create_task(synthesize(segment, language, pace=pace)))
+
     try:
-        audio_b64 = await text_to_speech(text, language, pace=pace)
-        await send_json(ws, "tutor_audio", {"audio": audio_b64})
-    except Exception as e:
-        logger.error(f"TTS error: {e}")
-        # Still usable without audio — text was already sent
-        await send_json(ws, "error", {"message": "Audio synthesis failed, but you can read the transcript above."})
+        async for delta in deltas:
+            parts.append(delta)
+            if stream_text:
+                await send_json(ws, "tutor_text", {"delta": delta, "turn_id": turn_id})
+            for segment in segmenter.feed(delta):
+                await queue_segment(segment)
+        tail = segmenter.flush()
+        if tail:
+            await queue_segment(tail)
+        pending.put_nowait(None)
+
+        text = "".join(parts).strip()
+        await send_json(ws, "tutor_text", {"text": text, "turn_id": turn_id, "final": True})
+        if on_text is not None:
+            await on_text(text)
+        await sender
+    except BaseException:
+        sender.cancel()
+        while not pending.empty():
+            task = pending.get_nowait()
+            if task is not None:
+                task.cancel()
+        raise
+    return text
+
+
+async def _send_audio_in_order(ws: WebSocket, pending: asyncio.Queue, turn_id: str, binary: bool):
+    """Await queued TTS tasks in submission order and forward each as a `tutor_audio` chunk."""
+    seq = 0
+    failed = False
+    while True:
+        task = await pending.get()
+        if task is None:
+            return
+        try:
+            audio = await task
+        except Exception as e:
+            logger.error(f"TTS error: {e}")
+            if not failed:
+                failed = True
+                # Still usable without audio — text is sent regardless
+                await send_json(ws, "error", {"message": "Audio synthesis failed, but you can read the transcript above."})
+            continue
+        await send_tutor_audio(ws, audio, seq, turn_id, binary)
+        seq += 1
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+async def _send_turn_text(live: LiveSession, text: str, turn_id: str):
+    if live.stream_text:
+        await send_json(live.ws, "tutor_text", {"delta": text, "turn_id": turn_id})
+    await send_json(live.ws, "tutor_text", {"text": text, "turn_id": turn_id, "final": True})
+
+
+async def _send_prepared_turn(live: LiveSession, turn: SpeculativeTurn, turn_id: str) -> str:
+    """Send a turn whose text and audio were generated ahead of time."""
+    await _send_turn_text(live, turn.text, turn_id)
+    seq = 0
+    failed = False
+    for audio in turn.audio:
+        if audio is None:
+            if not failed:
+                failed = True
+                await send_json(live.ws, "error", {"message": "Audio synthesis failed, but you can read the transcript above."})
+            continue
+        await send_tutor_audio(live.ws, audio, seq, turn_id, live.binary_audio)
+        seq += 1
+    return turn.text
+
+
+async def _run_tutor_turn(
+    live: LiveSession, section_idx: int, step_idx: int, learner_response: str | None = None,
+) -> str:
+    """Generate, log and send one tutor turn at the given position.
+
+    The turn is traced from here (or from when the learner's answer arrived, if that
+    already started a trace) until its audio has been sent.
+    """
+    trace = current_trace() or _start_trace(live, section_idx, step_idx)
+    trace.fields["kind"] = "feedback" if learner_response is not None else "turn"
+    try:
+        text = await _generate_and_send_turn(live, section_idx, step_idx, learner_response, trace)
+    except BaseException as e:
+        finish_turn(trace, error=type(e).__name__)
+        raise
+    finish_turn(trace)
+    return text
+
+
+def _start_trace(live: LiveSession, section_idx: int, step_idx: int) -> TurnTrace:
+    step = get_step(live.curriculum, section_idx, step_idx)
+    return start_turn(
+        live.session_id, live.curriculum.id, live.language, section_idx, step_idx,
+        step.type if step is not None else "",
+    )
+
+
+async def _generate_and_send_turn(
+    live: LiveSession, section_idx: int, step_idx: int, learner_response: str | None, trace: TurnTrace,
+) -> str:
+    async def on_text(text: str):
+        await live.log(section_idx, step_idx, "tutor", text)
+        _maybe_speculate_next(live, section_idx, step_idx, learner_response)
+
+    if learner_response is None and live.history.is_empty(section_idx):
+        bundled = asset_bundle.turn(live.curriculum, section_idx, step_idx, live.language)
+        if bundled is not None:
+            trace.fields["bundled"] = True
+            text = await _send_bundled_turn(live, bundled, trace.turn_id)
+            await on_text(text)
+            return text
+        variant = variant_pool.take(live.curriculum, section_idx, step_idx, live.language, live.pace)
+        if variant is not None:
+            trace.fields["pooled"] = True
+            text = await _send_variant(live, variant, trace.turn_id)
+            await on_text(text)
+            return text
+
+    if learner_response is None and settings.speculative_turns:
+        prepared = await live.speculator.take((section_idx, step_idx, live.pace))
+        trace.fields["speculated"] = prepared is not None
+        if prepared is not None:
+            text = await _send_prepared_turn(live, prepared, trace.turn_id)
+            await on_text(text)
+            return text
+
+    with timed("history"):
+        history = live.history.prompt_messages(section_idx)
+    if settings.llm_streaming:
+        deltas = generate_turn_stream(
+            live.curriculum, section_idx, step_idx, live.language, history, learner_response=learner_response
+        )
+    else:
+        deltas = _single(await generate_turn(
+            live.curriculum, section_idx, step_idx, live.language, history, learner_response=learner_response
+        ))
+
+    return await stream_tutor_message(
+        live.ws, deltas, live.language, pace=live.pace, stream_text=live.stream_text,
+        binary_audio=live.binary_audio, on_text=on_text, turn_id=trace.turn_id,
+    )
+
+
+async def _send_bundled_turn(live: LiveSession, turn: BundledTurn, turn_id: str) -> str:
+    """Send a pre-rendered turn: audio by URL to clients that fetch assets, from the bundle otherwise."""
+    upstream_calls_avoided.inc(operation="llm")
+    hashes = turn.audio.get(pace_key(live.pace))
+    if hashes is None:
+        # Not rendered at this pace; the text still saves the LLM call
+        asset_bundle.record_served(0, 0)
+        return await stream_tutor_message(
+            live.ws, _single(turn.text), live.language, pace=live.pace, stream_text=live.stream_text,
+            binary_audio=live.binary_audio, turn_id=turn_id,
+        )
+    upstream_calls_avoided.inc(len(hashes), operation="tts")
+    await _send_turn_text(live, turn.text, turn_id)
+    for seq, digest in enumerate(hashes):
+        if live.asset_audio:
+            await send_tutor_audio_ref(live.ws, digest, seq, turn_id)
+            continue
+        audio = asset_bundle.blob(digest)
+        if audio is not None:  # None only if the bundle was swapped mid-turn
+            await send_tutor_audio(live.ws, audio, seq, turn_id, live.binary_audio)
+    asset_bundle.record_served(len(hashes) if live.asset_audio else 0, 0 if live.asset_audio else len(hashes))
+    return turn.text
+
+
+async def _send_variant(live: LiveSession, variant: Variant, turn_id: str) -> str:
+    """Send a pooled turn, with its audio when it was synthesized at this session's pace."""
+    if variant.pace == live.pace:
+        return await _send_prepared_turn(live, variant, turn_id)
+    return await stream_tutor_message(
+        live.ws, _single(variant.text), live.language, pace=live.pace, stream_text=live.stream_text,
+        binary_audio=live.binary_audio, turn_id=turn_id,
+    )
+
+
+def _maybe_speculate_next(live: LiveSession, section_idx: int, step_idx: int, learner_response: str | None):
+    """Start pre-generating the following turn when the curriculum makes it deterministic.
+
+    A teach-only step, or the feedback to a learner answer, is always followed straight
+    away by the turn at next_position, so that turn can be produced while this one plays.
+    """
+    if not settings.speculative_turns:
+        return
+    step = get_step(live.curriculum, section_idx, step_idx)
+    if step is None or (step_expects_response(step) and learner_response is None):
+        return
+    new_section, new_step = next_position(live.curriculum, section_idx, step_idx)
+    if (new_section, new_step) == (section_idx, step_idx):
+        return
+    if new_section != section_idx and (
+        asset_bundle.covers(live.curriculum, new_section, new_step, live.language)
+        or variant_pool.covers(live.curriculum, new_section, new_step, live.language)
+    ):
+        return  # served ready-made
+    # Taken now, after this turn was appended; a new section starts with no history
+    history = live.history.prompt_messages(section_idx, traced=False) if new_section == section_idx else []
+
+    async def produce(cost: SpeculationCost) -> SpeculativeTurn:
+        detach_trace()  # speculative work is not part of the turn that started it
+        return await _speculate_turn(live, new_section, new_step, history, live.pace, cost)
+
+    live.speculator.start((new_section, new_step, live.pace), produce)
+
+
+async def _speculate_turn(
+    live: LiveSession, section_idx: int, step_idx: int, history: list[dict],
+    pace: float, cost: SpeculationCost,
+) -> SpeculativeTurn:
+    """Produce a full turn (text plus per-sentence audio) without sending anything."""
+    cost.llm_calls += 1
+    text = (await generate_turn(live.curriculum, section_idx, step_idx, live.language, history)).strip()
+
+    segments = split_segments(text)
+    cost.tts_calls += len(segments)
+    cost.tts_chars += sum(len(seg) for seg in segments)
+    audio = await synthesize_segments(segments, live.language, pace)
+    return SpeculativeTurn(text=text, audio=audio)
 
 
 @router.websocket("/ws/conversation/{session_id}")
 async def conversation_ws(ws: WebSocket, session_id: str):
+    """Read the socket; the lesson's turns run in a separate, cancellable task (see _start_runner).
+
+    Keeping the reader free means `skip`, `pause`, `set_pace` and a new answer are handled
+    while the tutor is still thinking or speaking: the turn in progress, with its upstream
+    calls, is cancelled (barge-in) and the new work starts at once.
+    """
     await ws.accept()
+    active_sessions.inc()
+    set_session(session_id)  # upstream calls from this lesson queue fairly against other lessons
 
-    db = await get_db()
+    live = None
     try:
-        session = await get_session(db, session_id)
+        async with read_db(session_id) as db:
+            session = await get_session(db, session_id)
         if session is None:
             await send_json(ws, "error", {"message": "Session not found"})
             await ws.close()
             return
 
-        module_id = session["module_id"]
-        language = session["language"]
-        curriculum = load_curriculum(module_id)
+        curriculum = load_curriculum(session["module_id"])
         section_idx = session["current_section"]
         step_idx = session["current_step"]
-        session_pace = 1.25  # default, updated by client via set_pace message
 
         # Wait for "start" message from client
         start_msg = await ws.receive_text()
@@ -62,51 +391,39 @@ async def conversation_ws(ws: WebSocket, session_id: str):
             await send_json(ws, "error", {"message": "Expected 'start' message"})
             await ws.close()
             return
-
-        # Mark first section as in_progress
-        await update_section_progress(db, session_id, section_idx, "in_progress")
-
-        # Reactivate if resuming a paused session
-        if session["status"] == "paused":
-            await update_session_status(db, session_id, "active")
+        # Client capabilities; older clients send a bare start message
+        capabilities = start_data.get("data") or {}
+        live = LiveSession(
+            ws=ws, session_id=session_id, curriculum=curriculum, language=session["language"],
+            history=ConversationHistory(
+                session_id, session["language"], reserved_tokens=_reserved_tokens(curriculum, session["language"]),
+            ),
+            section_idx=section_idx,
+            step_idx=step_idx,
+            stream_text=bool(capabilities.get("stream_text", False)),
+            binary_audio=bool(capabilities.get("binary_audio", False)),
+            stream_audio=bool(capabilities.get("stream_audio", False)),
+            asset_audio=bool(capabilities.get("asset_audio", False)),
+        )
+        # The only history read for this connection; afterwards turns are appended in memory
+        await live.history.load(section_idx)
+
+        async with write_db(session_id) as db:
+            # Mark first section as in_progress
+            await update_section_progress(db, session_id, section_idx, "in_progress")
+
+            # Reactivate if resuming a paused session
+            if session["status"] == "paused":
+                await update_session_status(db, session_id, "active")
 
         # Send initial position info
-        section_data = get_section(curriculum, section_idx)
-        await send_json(ws, "progress", {
-            "section_index": section_idx,
-            "step_index": step_idx,
-            "section_title": section_data["title"] if section_data else "",
-            "total_sections": len(curriculum["sections"]),
-        })
+        await ws.send_text(curriculum.progress_message(section_idx, step_idx))
 
-        # Send curriculum structure for sidebar
-        sections_info = []
-        for i, sec in enumerate(curriculum["sections"]):
-            sections_info.append({
-                "index": i,
-                "title": sec["title"],
-                "title_hi": sec.get("title_hi", sec["title"]),
-                "step_count": len(sec["steps"]),
-            })
-        await send_json(ws, "curriculum_info", {"sections": sections_info})
-
-        # Generate and send the first tutor turn
-        await send_json(ws, "status", {"state": "thinking"})
-        history = await _build_gemini_history(db, session_id, section_idx)
-        tutor_text = await generate_tutor_turn(curriculum, section_idx, step_idx, language, history)
-
-        await log_conversation(db, session_id, section_idx, step_idx, "tutor", tutor_text, language)
-        await send_tutor_message(ws, tutor_text, language, pace=session_pace)
-
-        step = get_step(curriculum, section_idx, step_idx)
-        if step and not step_expects_response(step):
-            # Auto-advance for teach-only steps
-            section_idx, step_idx = _advance(curriculum, db, session_id, section_idx, step_idx)
-            await update_session_position(db, session_id, section_idx, step_idx)
-            # Generate the next turn immediately
-            await _send_next_tutor_turn(ws, db, session_id, curriculum, section_idx, step_idx, language, pace=session_pace)
-        else:
-            await send_json(ws, "status", {"state": "listening"})
+        # Send curriculum structure for sidebar (pre-serialized when the curriculum was compiled)
+        await ws.send_text(curriculum.curriculum_info_message)
+
+        # Tutor turns from the current position (auto-advancing past teach-only steps)
+        _start_runner(live, _continue_lesson(live, advance=False))
 
         # Main conversation loop
         while True:
@@ -114,21 +431,80 @@ async def conversation_ws(ws: WebSocket, session_id: str):
                 raw = await ws.receive()
             except WebSocketDisconnect:
                 break
+            received_at = time.monotonic()
 
-            if "text" in raw:
+            if raw["type"] == "websocket.disconnect":
+                break
+            if raw.get("text") is not None:
                 msg = json.loads(raw["text"])
-            elif "bytes" in raw:
-                # Binary audio data
-                msg = {"type": "audio", "data": {"audio_bytes": raw["bytes"]}}
+            elif raw.get("bytes") is not None:
+                # Binary audio: framed for clients on the binary protocol, raw bytes for older ones
+                audio_bytes = raw["bytes"]
+                final = False
+                if live.binary_audio:
+                    try:
+                        frame_type, _, flags, _, _, payload = unpack_frame(audio_bytes)
+                    except ValueError as e:
+                        await send_json(ws, "error", {"message": str(e)})
+                        continue
+                    if frame_type != LEARNER_AUDIO:
+                        continue
+                    audio_bytes = payload.tobytes()
+                    final = bool(flags & FLAG_LAST)
+                if live.stream_audio:
+                    msg = {"type": "audio_chunk", "data": {"audio_bytes": audio_bytes, "final": final}}
+                else:
+                    msg = {"type": "audio", "data": {"audio_bytes": audio_bytes}}
             else:
                 continue
 
             msg_type = msg.get("type")
 
-            if msg_type == "audio":
-                # Process learner's voice
-                await send_json(ws, "status", {"state": "transcribing"})
+            if msg_type == "audio_chunk":
+                # Part of an answer still being recorded; buffered and forwarded to STT as it arrives
+                chunk_data = msg.get("data", {})
+                if "audio_bytes" in chunk_data:
+                    chunk = chunk_data["audio_bytes"]
+                else:
+                    chunk = base64.b64decode(chunk_data.get("audio", ""))
+                if live.upload_rejected:
+                    # The rest of a recording already turned down; it ends with its last chunk
+                    if chunk_data.get("final"):
+                        live.upload_rejected = False
+                    continue
+                if live.upload is None:
+                    # The learner started talking: stop the tutor (barge-in)
+                    await _interrupt(live, "barge_in")
+                    live.upload = LearnerAudioUpload(live.language)
+                try:
+                    await live.upload.add(chunk)
+                except UploadTooLarge:
+                    live.drop_upload()
+                    live.upload_rejected = not chunk_data.get("final")
+                    await send_json(ws, "error", {"message": "That answer was too long. Please try a shorter one."})
+                    await send_json(ws, "status", {"state": "listening"})
+                    continue
+                if not chunk_data.get("final"):
+                    continue
+                msg_type = "audio_end"
 
+            if msg_type == "audio_end":
+                if live.upload_rejected:
+                    live.upload_rejected = False
+                    continue
+                upload, live.upload = live.upload, None
+                if upload is None:
+                    await send_json(ws, "error", {"message": "No audio data received"})
+                    continue
+                # Only the final frame counts as receiving; the rest of the upload was the learner speaking
+                receive_seconds = time.monotonic() - received_at
+                await _interrupt(live, "barge_in")
+                _start_runner(live, _answer(
+                    live, upload.finish, receive_seconds, recording_seconds=received_at - upload.started,
+                ))
+
+            elif msg_type == "audio":
+                # Process learner's voice, sent as one message after recording stopped
                 audio_data = msg.get("data", {})
                 if "audio_bytes" in audio_data:
                     audio_bytes = audio_data["audio_bytes"]
@@ -137,44 +513,32 @@ async def conversation_ws(ws: WebSocket, session_id: str):
                 else:
                     await send_json(ws, "error", {"message": "No audio data received"})
                     continue
-
-                try:
-                    transcript = await speech_to_text(audio_bytes, language)
-                except Exception as e:
-                    logger.error(f"STT error: {e}")
-                    await send_json(ws, "error", {"message": "Could not understand audio. Please try again."})
+                if len(audio_bytes) > settings.stt_max_upload_bytes:
+                    await send_json(ws, "error", {"message": "That answer was too long. Please try a shorter one."})
                     await send_json(ws, "status", {"state": "listening"})
                     continue
 
-                await send_json(ws, "learner_text", {"text": transcript})
-                await log_conversation(db, session_id, section_idx, step_idx, "learner", transcript, language)
-
-                # Generate tutor feedback on learner's response
-                await send_json(ws, "status", {"state": "thinking"})
-                history = await _build_gemini_history(db, session_id, section_idx)
-                feedback_text = await generate_tutor_turn(
-                    curriculum, section_idx, step_idx, language, history, learner_response=transcript
-                )
-                await log_conversation(db, session_id, section_idx, step_idx, "tutor", feedback_text, language)
-                await send_tutor_message(ws, feedback_text, language, pace=session_pace)
-
-                # Advance after feedback
-                section_idx, step_idx = await _advance_and_notify(
-                    ws, db, session_id, curriculum, section_idx, step_idx, language, pace=session_pace
-                )
+                receive_seconds = time.monotonic() - received_at
+                await _interrupt(live, "barge_in")
+                _start_runner(live, _answer(live, lambda: transcribe(audio_bytes, live.language), receive_seconds))
 
             elif msg_type == "skip":
                 # Skip current step
-                section_idx, step_idx = await _advance_and_notify(
-                    ws, db, session_id, curriculum, section_idx, step_idx, language, pace=session_pace
-                )
+                live.drop_upload()
+                live.speculator.discard()
+                await _interrupt(live, "skip")
+                _start_runner(live, _continue_lesson(live))
 
             elif msg_type == "set_pace":
                 pace_val = msg.get("data", {}).get("pace", 1.25)
-                session_pace = max(0.5, min(2.0, float(pace_val)))
+                live.pace = max(0.5, min(2.0, float(pace_val)))
 
             elif msg_type == "pause":
-                await update_session_status(db, session_id, "paused")
+                live.drop_upload()
+                live.speculator.discard()
+                await _interrupt(live, "pause")
+                async with write_db(session_id) as db:
+                    await update_session_status(db, session_id, "paused")
                 await send_json(ws, "status", {"state": "paused"})
                 await ws.close()
                 break
@@ -188,105 +552,182 @@ async def conversation_ws(ws: WebSocket, session_id: str):
         except Exception:
             pass
     finally:
-        await db.close()
+        active_sessions.dec()
+        if live is not None:
+            await _interrupt(live, "disconnect")
+            live.drop_upload()
+            live.speculator.discard()
+            live.history.close()
 
 
-def _advance(curriculum: dict, db, session_id: str, section_idx: int, step_idx: int) -> tuple[int, int]:
-    """Calculate next position (pure logic, no DB writes)."""
-    return next_position(curriculum, section_idx, step_idx)
+def _reserved_tokens(curriculum: Curriculum, language: str) -> int:
+    """Context budget taken by the system prompt and the per-turn instruction."""
+    return estimate_tokens(build_system_prompt(curriculum, language)) + settings.context_instruction_tokens
 
 
-async def _advance_and_notify(
-    ws: WebSocket, db, session_id: str, curriculum: dict,
-    section_idx: int, step_idx: int, language: str, pace: float = 1.25
-) -> tuple[int, int]:
-    """Advance to next step, handle section/module completion, send next tutor turn."""
-    old_section = section_idx
-    new_section, new_step = next_position(curriculum, section_idx, step_idx)
+# --- turn runner ---
 
-    if new_section == section_idx and new_step == step_idx:
-        # At the very end of the module
-        await update_section_progress(db, session_id, section_idx, "completed")
-        await update_session_status(db, session_id, "completed")
-        await send_json(ws, "module_complete", {"message": "Congratulations! You've completed the module."})
-        return new_section, new_step
+def _start_runner(live: LiveSession, work: Awaitable[None]):
+    """Run turn work (one call of _continue_lesson or _answer) as the session's runner task.
 
-    if new_section != old_section:
-        # Section changed
-        await update_section_progress(db, session_id, old_section, "completed")
-        await send_json(ws, "section_complete", {
-            "section_index": old_section,
-            "section_title": get_section(curriculum, old_section)["title"],
-        })
-        await update_section_progress(db, session_id, new_section, "in_progress")
+    Only one runs at a time; interrupt the previous one first.
+    """
+    live.runner = asyncio.create_task(_run_guarded(live, work))
 
-    await update_session_position(db, session_id, new_section, new_step)
 
-    # Send progress update
-    section_data = get_section(curriculum, new_section)
-    await send_json(ws, "progress", {
-        "section_index": new_section,
-        "step_index": new_step,
-        "section_title": section_data["title"] if section_data else "",
-        "total_sections": len(curriculum["sections"]),
-    })
-
-    # Generate next tutor turn
-    await _send_next_tutor_turn(ws, db, session_id, curriculum, new_section, new_step, language, pace=pace)
-    return new_section, new_step
-
-
-async def _send_next_tutor_turn(
-    ws: WebSocket, db, session_id: str, curriculum: dict,
-    section_idx: int, step_idx: int, language: str, pace: float = 1.25
+async def _run_guarded(live: LiveSession, work: Awaitable[None]):
+    try:
+        await work
+    except WebSocketDisconnect:
+        pass  # the reader sees the disconnect too
+    except Exception as e:
+        logger.error(f"Turn error in session {live.session_id}: {e}", exc_info=True)
+        try:
+            await send_json(live.ws, "error", {"message": str(e)})
+            await send_json(live.ws, "status", {"state": "listening"})
+        except Exception:
+            pass
+
+
+async def _interrupt(live: LiveSession, reason: str):
+    """Cancel the turn work in progress, with its upstream calls, and wait until it has stopped.
+
+    The time that takes is exported per reason. Clients are told on barge-in and skip so
+    they can drop the audio they still have queued.
+    """
+    runner, live.runner = live.runner, None
+    if runner is None or runner.done():
+        return
+    started = time.monotonic()
+    runner.cancel()
+    await asyncio.wait([runner])
+    turn_cancel_seconds.observe(time.monotonic() - started, reason=reason)
+    if reason in ("barge_in", "skip"):
+        await send_json(live.ws, "interrupted", {"reason": reason})
+
+
+async def _continue_lesson(live: LiveSession, advance: bool = True):
+    """Run the lesson on from the current position until a step waits for the learner.
+
+    With `advance`, first moves past the current step. A teach-only step is followed by
+    the next turn straight away; this loops instead of recursing, so any length of teach
+    chain runs in constant stack depth.
+    """
+    if advance and not await _advance(live):
+        return
+    while True:
+        section_idx, step_idx = live.section_idx, live.step_idx
+        step = get_step(live.curriculum, section_idx, step_idx)
+        if step is None:
+            return
+        await send_json(live.ws, "status", {"state": "thinking"})
+        await _run_tutor_turn(live, section_idx, step_idx)
+        if step_expects_response(step):
+            await send_json(live.ws, "status", {"state": "listening"})
+            return
+        # Auto-advance for teach-only and summarize steps
+        if not await _advance(live):
+            return
+
+
+async def _answer(
+    live: LiveSession, stt: Callable[[], Awaitable[str]], receive_seconds: float, recording_seconds: float | None = None,
 ):
-    """Generate and send the next tutor turn, then auto-advance if it's teach-only."""
-    step = get_step(curriculum, section_idx, step_idx)
-    if step is None:
+    """Transcribe the learner's answer, log it, give feedback on it, and move on.
+
+    `recording_seconds` is how long a chunked upload ran, from its first chunk to its last.
+    """
+    section_idx, step_idx = live.section_idx, live.step_idx
+    await send_json(live.ws, "status", {"state": "transcribing"})
+    _start_trace(live, section_idx, step_idx)
+    observe("ws_receive", receive_seconds)
+    if recording_seconds is not None:
+        observe("learner_recording", recording_seconds)
+    transcript = await _transcribe(live, stt())
+    if transcript is None:
         return
 
-    await send_json(ws, "status", {"state": "thinking"})
-    history = await _build_gemini_history(db, session_id, section_idx)
-    tutor_text = await generate_tutor_turn(curriculum, section_idx, step_idx, language, history)
-    await log_conversation(db, session_id, section_idx, step_idx, "tutor", tutor_text, language)
-    await send_tutor_message(ws, tutor_text, language, pace=pace)
+    await send_json(live.ws, "learner_text", {"text": transcript})
+    await live.log(section_idx, step_idx, "learner", transcript)
 
-    if not step_expects_response(step):
-        # Auto-advance for teach-only and summarize steps
-        new_section, new_step = next_position(curriculum, section_idx, step_idx)
-        if new_section != section_idx or new_step != step_idx:
-            await update_session_position(db, session_id, new_section, new_step)
-
-            if new_section != section_idx:
-                await update_section_progress(db, session_id, section_idx, "completed")
-                await send_json(ws, "section_complete", {
-                    "section_index": section_idx,
-                    "section_title": get_section(curriculum, section_idx)["title"],
-                })
-                await update_section_progress(db, session_id, new_section, "in_progress")
-
-            section_data = get_section(curriculum, new_section)
-            await send_json(ws, "progress", {
-                "section_index": new_section,
-                "step_index": new_step,
-                "section_title": section_data["title"] if section_data else "",
-                "total_sections": len(curriculum["sections"]),
-            })
-            await _send_next_tutor_turn(ws, db, session_id, curriculum, new_section, new_step, language, pace=pace)
-        else:
-            # End of module on a teach/summarize step
+    # Generate tutor feedback on learner's response
+    await send_json(live.ws, "status", {"state": "thinking"})
+    await _run_tutor_turn(live, section_idx, step_idx, learner_response=transcript)
+
+    # Advance after feedback
+    await _continue_lesson(live)
+
+
+async def _transcribe(live: LiveSession, stt: Awaitable[str]) -> str | None:
+    """Await a transcription, telling the learner to retry if it fails.
+
+    Runs inside the trace of the turn that will answer it; a failure ends that trace.
+    """
+    try:
+        with timed("stt"):
+            return await stt
+    except Exception as e:
+        logger.error(f"STT error: {e}")
+        trace = current_trace()
+        if trace is not None:
+            finish_turn(trace, error="stt")
+        await send_json(live.ws, "error", {"message": "Could not understand audio. Please try again."})
+        await send_json(live.ws, "status", {"state": "listening"})
+        return None
+
+
+async def _advance(live: LiveSession) -> bool:
+    """Move to the next step, reporting section and module completion and the new position.
+
+    Returns False at the end of the module. The move is completed even if the turn is
+    cancelled part way (a barge-in, skip or pause), so the stored position, section
+    progress, `live` and what the client was told never disagree.
+    """
+    return await _uninterruptible(_move_on(live))
+
+
+async def _move_on(live: LiveSession) -> bool:
+    ws, session_id, curriculum = live.ws, live.session_id, live.curriculum
+    section_idx, step_idx = live.section_idx, live.step_idx
+    new_section, new_step = next_position(curriculum, section_idx, step_idx)
+
+    if new_section == section_idx and new_step == step_idx:
+        # At the very end of the module
+        async with write_db(session_id) as db:
             await update_section_progress(db, session_id, section_idx, "completed")
             await update_session_status(db, session_id, "completed")
-            await send_json(ws, "module_complete", {"message": "Congratulations! You've completed the module."})
-    else:
-        await send_json(ws, "status", {"state": "listening"})
+        await send_json(ws, "module_complete", {"message": "Congratulations! You've completed the module."})
+        return False
+
+    async with write_db(session_id) as db:
+        if new_section != section_idx:
+            await update_section_progress(db, session_id, section_idx, "completed")
+            await update_section_progress(db, session_id, new_section, "in_progress")
+        await update_session_position(db, session_id, new_section, new_step)
+    live.section_idx, live.step_idx = new_section, new_step
+
+    if new_section != section_idx:
+        await send_json(ws, "section_complete", {
+            "section_index": section_idx,
+            "section_title": get_section(curriculum, section_idx).title,
+        })
+    # Send progress update
+    await ws.send_text(curriculum.progress_message(new_section, new_step))
+    return True
+
 
+async def _uninterruptible(work: Awaitable):
+    """Await `work` to the end even if the caller is cancelled, then re-raise the cancellation.
 
-async def _build_gemini_history(db, session_id: str, section_idx: int) -> list[dict]:
-    """Build Gemini-compatible message history from conversation log."""
-    rows = await get_conversation_history(db, session_id, section_idx)
-    messages = []
-    for row in rows:
-        role = "assistant" if row["role"] == "tutor" else "user"
-        messages.append({"role": role, "content": row["text"]})
-    return messages
+    Unlike a bare asyncio.shield, the cancelled caller does not finish (and let
+    _interrupt move on) until the shielded work has.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        try:
+            await task
+        except Exception:
+            pass  # the caller is going away; the cancellation is what it reports
+        raise
@@ -1,12 +1,20 @@
+import base64
+import binascii
+import hashlib
+import heapq
+import json
 import uuid
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from backend.config import settings
 from backend.models import (
-    SessionCreate, SessionResponse, ProgressResponse,
+    SessionCreate, SessionResponse, ProgressResponse, ProgressBatchRequest, ProgressBatchResponse,
     SectionProgressResponse, SessionStatus, SectionStatus, Language,
 )
 from backend.database import (
-    get_db, create_session, get_session, init_section_progress,
-    get_section_progress,
+    read_db, write_db, flush_writes, scatter_read, gather_read, create_session, get_session, init_section_progress,
+    get_progress_snapshots, list_sessions as list_session_rows, get_conversation_rows, list_archived_blocks,
+    read_archived_block,
 )
 from backend.services.tutor_engine import load_curriculum
 
@@ -18,12 +26,11 @@ async def start_session(body: SessionCreate):
     curriculum = load_curriculum(body.module_id)
     session_id = uuid.uuid4().hex[:12]
 
-    db = await get_db()
-    try:
+    async with write_db(session_id) as db:
         await create_session(db, session_id, body.module_id, body.language.value)
-        await init_section_progress(db, session_id, len(curriculum["sections"]))
-    finally:
-        await db.close()
+        await init_section_progress(db, session_id, len(curriculum.sections))
+    # The client connects to the session right away; make sure it is readable first
+    await flush_writes(session_id)
 
     return SessionResponse(
         id=session_id,
@@ -35,21 +42,40 @@ async def start_session(body: SessionCreate):
     )
 
 
-@router.get("", response_model=list[SessionResponse])
-async def list_sessions(status: str | None = None):
-    db = await get_db()
+TRANSCRIPT_FIELDS = ("section_index", "step_index", "role", "text", "language", "created_at")
+
+
+def _encode_cursor(row: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps([row["updated_at"], row["id"]]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
     try:
-        if status:
-            cursor = await db.execute(
-                "SELECT * FROM sessions WHERE status = ? ORDER BY updated_at DESC", (status,)
-            )
-        else:
-            cursor = await db.execute(
-                "SELECT * FROM sessions WHERE status IN ('active', 'paused') ORDER BY updated_at DESC"
-            )
-        rows = await cursor.fetchall()
-    finally:
-        await db.close()
+        updated_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return updated_at, session_id
+
+
+@router.get("", response_model=list[SessionResponse])
+async def list_sessions(
+    response: Response,
+    status: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+):
+    """One page of sessions, newest first. The X-Next-Cursor header, absent on the last
+    page, is passed back as `cursor` for the next one."""
+    limit = min(limit or settings.sessions_page_size, settings.sessions_max_page_size)
+    before = _decode_cursor(cursor) if cursor else None
+    # Each shard returns its next page newest first; merge them into one ordering. One
+    # row beyond the page tells whether there is another.
+    per_shard = await scatter_read(lambda db: list_session_rows(db, status, before, limit + 1))
+    merged = heapq.merge(*per_shard, key=lambda r: (r["updated_at"], r["id"]), reverse=True)
+    rows = [r for _, r in zip(range(limit + 1), merged)]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
 
     return [
         SessionResponse(
@@ -62,11 +88,8 @@ async def list_sessions(status: str | None = None):
 
 @router.get("/{session_id}", response_model=SessionResponse)
 async def get_session_info(session_id: str):
-    db = await get_db()
-    try:
+    async with read_db(session_id) as db:
         session = await get_session(db, session_id)
-    finally:
-        await db.close()
 
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -81,31 +104,142 @@ async def get_session_info(session_id: str):
     )
 
 
+# Progress changes while a lesson runs; clients may keep it but must revalidate (cheaply, via the ETag)
+PROGRESS_CACHE_CONTROL = "private, no-cache"
+
+
 @router.get("/{session_id}/progress", response_model=ProgressResponse)
-async def get_progress(session_id: str):
-    db = await get_db()
-    try:
-        session = await get_session(db, session_id)
-        if session is None:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        curriculum = load_curriculum(session["module_id"])
-        progress_rows = await get_section_progress(db, session_id)
-    finally:
-        await db.close()
-
-    sections = []
-    for row in progress_rows:
-        section_data = curriculum["sections"][row["section_index"]]
-        sections.append(SectionProgressResponse(
-            section_id=row["section_index"],
-            title=section_data["title"],
-            status=SectionStatus(row["status"]),
-        ))
+async def get_progress(session_id: str, request: Request, response: Response):
+    async with read_db(session_id) as db:
+        snapshots = await get_progress_snapshots(db, [session_id])
+    snapshot = snapshots.get(session_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    etag = _progress_etag([_progress_state(session_id, snapshot)])
+    headers = {"ETag": etag, "Cache-Control": PROGRESS_CACHE_CONTROL}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return _progress_response(session_id, snapshot)
+
+
+@router.post("/progress", response_model=ProgressBatchResponse)
+async def get_progress_batch(body: ProgressBatchRequest, request: Request, response: Response):
+    """Progress of many sessions in one round trip (one joined query per shard).
+
+    The ETag covers every requested session; a poller that sends it back in
+    If-None-Match gets an empty 304 until one of them changes.
+    """
+    session_ids = list(dict.fromkeys(body.session_ids))
+    if len(session_ids) > settings.progress_batch_max_sessions:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.progress_batch_max_sessions} sessions per request",
+        )
+    snapshots = await gather_read(session_ids, get_progress_snapshots)
+
+    etag = _progress_etag([
+        _progress_state(sid, snapshots[sid]) if sid in snapshots else [sid, None] for sid in session_ids
+    ])
+    headers = {"ETag": etag, "Cache-Control": PROGRESS_CACHE_CONTROL}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return ProgressBatchResponse(
+        sessions=[_progress_response(sid, snapshots[sid]) for sid in session_ids if sid in snapshots],
+        missing=[sid for sid in session_ids if sid not in snapshots],
+    )
+
 
+def _progress_state(session_id: str, snapshot: dict) -> list:
+    """Everything a progress response depends on: the session row, its sections, and the
+    curriculum version the section titles come from."""
+    return [
+        session_id, snapshot["module_id"], snapshot["status"], snapshot["updated_at"], snapshot["sections"],
+        load_curriculum(snapshot["module_id"]).mtime,
+    ]
+
+
+def _progress_etag(states: list) -> str:
+    digest = hashlib.sha256(json.dumps(states, separators=(",", ":")).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) or if_none_match.strip() == "*"
+
+
+def _progress_response(session_id: str, snapshot: dict) -> ProgressResponse:
+    curriculum = load_curriculum(snapshot["module_id"])
     return ProgressResponse(
         session_id=session_id,
-        module_id=session["module_id"],
-        sections=sections,
-        overall_status=SessionStatus(session["status"]),
+        module_id=snapshot["module_id"],
+        sections=[
+            SectionProgressResponse(
+                section_id=index, title=curriculum.sections[index].title, status=SectionStatus(status),
+            ) for index, status in snapshot["sections"]
+        ],
+        overall_status=SessionStatus(snapshot["status"]),
     )
+
+
+@router.get("/{session_id}/transcript")
+async def export_transcript(session_id: str):
+    """The session's whole conversation log as NDJSON, one turn per line, oldest first."""
+    async with read_db(session_id) as db:
+        session = await get_session(db, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    # Turns still in the write-behind queue belong in the export
+    await flush_writes(session_id)
+
+    return StreamingResponse(
+        _transcript_lines(session_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="transcript-{session_id}.ndjson"'},
+    )
+
+
+async def _transcript_lines(session_id: str):
+    """Archived blocks one at a time, then the hot log in keyset batches by id.
+
+    Each batch is a short read, so a slow client holds neither a pooled connection nor
+    a read snapshot open while memory stays at one batch whatever the transcript length.
+
+    Archived rows keep the ids they had when archived, which scripts/split_db.py does
+    not preserve for the hot log, so the two are never compared except for one case:
+    the archiver may move hot rows into a new segment mid-export. Those rows carry
+    hot-log ids, so once the hot log runs out the catalog is listed again and a new
+    segment's rows past the hot cursor go out before the hot log is read on from there.
+    """
+    async with read_db(session_id) as db:
+        blocks = await list_archived_blocks(db, session_id)
+    sent_segments = {block["segment"] for block in blocks}
+    for block in blocks:
+        yield _ndjson(await read_archived_block(block))
+
+    after_id = 0
+    while True:
+        while True:
+            async with read_db(session_id) as db:
+                rows = await get_conversation_rows(db, session_id, after_id, settings.transcript_batch_rows)
+            if not rows:
+                break
+            yield _ndjson(rows)
+            after_id = rows[-1]["id"]
+
+        async with read_db(session_id) as db:
+            blocks = [b for b in await list_archived_blocks(db, session_id) if b["segment"] not in sent_segments]
+        if not blocks:
+            return
+        for block in blocks:
+            sent_segments.add(block["segment"])
+            rows = [row for row in await read_archived_block(block) if row["id"] > after_id]
+            if rows:
+                yield _ndjson(rows)
+                after_id = rows[-1]["id"]
+
+
+def _ndjson(rows: list[dict]) -> str:
+    return "".join(json.dumps({k: row.get(k) for k in TRANSCRIPT_FIELDS}, ensure_ascii=False) + "\n" for row in rows)
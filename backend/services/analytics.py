@@ -0,0 +1,288 @@
+"""Learner analytics from the rollup tables: completion, drop-off and time per step.
+
+The rollups (migration 0006) are maintained by the write helpers in database.py as
+sessions advance, so reading them costs the same whatever the size of history: a few
+rows per step of a module, per shard. rebuild_rollups() recomputes them from history
+once (scripts/rebuild_analytics.py), for databases that predate them or after a bug.
+"""
+
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from backend.config import settings
+from backend.database import (
+    ANALYTICS_DURATION_BUCKETS, duration_bucket_sql, flush_writes, read_archived_block, scatter_read, shard_count,
+    shard_db,
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLES = ("analytics_modules", "analytics_sections", "analytics_section_durations", "analytics_steps")
+REBUILD_BATCH_SESSIONS = 500
+
+
+async def _rollup_rows(sql: str, params: tuple) -> list[dict]:
+    async def query(db):
+        cursor = await db.execute(sql, params)
+        return [dict(r) for r in await cursor.fetchall()]
+
+    return [row for rows in await scatter_read(query) for row in rows]
+
+
+def _language_filter(language: str | None) -> tuple[str, tuple]:
+    return (" AND language = ?", (language,)) if language else ("", ())
+
+
+async def module_summaries(language: str | None = None) -> list[dict]:
+    """Sessions started and completed per module."""
+    where, params = _language_filter(language)
+    rows = await _rollup_rows(f"SELECT * FROM analytics_modules WHERE 1{where}", params)
+    modules: dict[str, dict] = {}
+    for row in rows:
+        module = modules.setdefault(row["module_id"], {"module_id": row["module_id"], "started": 0, "completed": 0, "by_language": {}})
+        module["started"] += row["started"]
+        module["completed"] += row["completed"]
+        by_language = module["by_language"].setdefault(row["language"], {"started": 0, "completed": 0})
+        by_language["started"] += row["started"]
+        by_language["completed"] += row["completed"]
+    for module in modules.values():
+        module["completion_rate"] = _ratio(module["completed"], module["started"])
+    return sorted(modules.values(), key=lambda m: m["module_id"])
+
+
+async def module_funnel(module_id: str, language: str | None = None) -> dict:
+    """Per section and per step of one module: how many got there, how many left, and how long it took."""
+    where, params = _language_filter(language)
+    params = (module_id, *params)
+    section_rows = await _rollup_rows(f"SELECT * FROM analytics_sections WHERE module_id = ?{where}", params)
+    duration_rows = await _rollup_rows(f"SELECT * FROM analytics_section_durations WHERE module_id = ?{where}", params)
+    step_rows = await _rollup_rows(f"SELECT * FROM analytics_steps WHERE module_id = ?{where}", params)
+
+    sections: dict[int, dict] = {}
+    for row in section_rows:
+        section = _section(sections, row["section_index"])
+        section["started"] += row["started"]
+        section["completed"] += row["completed"]
+        section["seconds_total"] += row["seconds_total"]
+    for row in duration_rows:
+        histogram = _section(sections, row["section_index"])["histogram"]
+        histogram[row["bucket"]] += row["sessions"]
+
+    steps: dict[tuple[int, int], dict] = {}
+    for row in step_rows:
+        step = steps.get((row["section_index"], row["step_index"]))
+        if step is None:
+            step = steps[(row["section_index"], row["step_index"])] = {
+                "section_index": row["section_index"], "step_index": row["step_index"],
+                "reached": 0, "timed": 0, "seconds_total": 0.0, "turns_by_language": {},
+            }
+        step["reached"] += row["reached"]
+        step["timed"] += row["timed"]
+        step["seconds_total"] += row["seconds_total"]
+        if row["tutor_turns"] or row["learner_turns"]:
+            turns = step["turns_by_language"].setdefault(row["language"], {"tutor": 0, "learner": 0})
+            turns["tutor"] += row["tutor_turns"]
+            turns["learner"] += row["learner_turns"]
+
+    section_list = []
+    for index in sorted(sections):
+        section = sections[index]
+        histogram = section.pop("histogram")
+        timed = sum(histogram)
+        seconds_total = section.pop("seconds_total")
+        section_list.append({
+            **section,
+            "dropped": max(section["started"] - section["completed"], 0),
+            "completion_rate": _ratio(section["completed"], section["started"]),
+            "timed": timed,
+            "mean_seconds": round(seconds_total / timed, 1) if timed else None,
+            "p50_seconds": _percentile(histogram, 0.5),
+            "p90_seconds": _percentile(histogram, 0.9),
+        })
+
+    step_list = []
+    previous_reached = None
+    for key in sorted(steps):
+        step = steps[key]
+        seconds_total = step.pop("seconds_total")
+        step_list.append({
+            **step,
+            # Sessions that reached the previous step but not this one: left there, or are still there
+            "dropped_before": max(previous_reached - step["reached"], 0) if previous_reached is not None else 0,
+            "mean_seconds": round(seconds_total / step["timed"], 1) if step["timed"] else None,
+        })
+        previous_reached = step["reached"]
+
+    return {"module_id": module_id, "language": language, "sections": section_list, "steps": step_list}
+
+
+def _section(sections: dict[int, dict], index: int) -> dict:
+    section = sections.get(index)
+    if section is None:
+        section = sections[index] = {
+            "section_index": index, "started": 0, "completed": 0, "seconds_total": 0.0,
+            "histogram": [0] * (len(ANALYTICS_DURATION_BUCKETS) + 1),
+        }
+    return section
+
+
+def _ratio(part: int, whole: int) -> float | None:
+    return round(part / whole, 4) if whole else None
+
+
+def _percentile(histogram: list[int], q: float) -> float | None:
+    """Estimate a percentile from bucket counts, interpolating linearly within the bucket.
+
+    The open-ended last bucket reports its lower bound.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= target:
+            lower = ANALYTICS_DURATION_BUCKETS[i - 1] if i > 0 else 0
+            if i == len(ANALYTICS_DURATION_BUCKETS):
+                return float(lower)
+            upper = ANALYTICS_DURATION_BUCKETS[i]
+            return round(lower + (upper - lower) * (target - seen) / count, 1)
+        seen += count
+    return None
+
+
+# --- Rebuild from history ---
+
+_COMPLETED_SECONDS = "(julianday(p.completed_at) - julianday(p.started_at)) * 86400"
+REBUILD_MODULES_SQL = (
+    "SELECT module_id, language, COUNT(*), SUM(status = 'completed') FROM sessions GROUP BY module_id, language"
+)
+REBUILD_SECTIONS_SQL = (
+    "SELECT s.module_id, p.section_index, s.language, SUM(p.status != 'not_started'), SUM(p.status = 'completed'), "
+    f"SUM(CASE WHEN p.status = 'completed' THEN COALESCE({_COMPLETED_SECONDS}, 0) ELSE 0 END) "
+    "FROM section_progress p JOIN sessions s ON s.id = p.session_id "
+    "GROUP BY s.module_id, p.section_index, s.language"
+)
+REBUILD_DURATIONS_SQL = (
+    f"SELECT s.module_id, p.section_index, s.language, {duration_bucket_sql(_COMPLETED_SECONDS)} AS bucket, COUNT(*) "
+    "FROM section_progress p JOIN sessions s ON s.id = p.session_id "
+    "WHERE p.status = 'completed' AND p.started_at IS NOT NULL AND p.completed_at IS NOT NULL "
+    "GROUP BY s.module_id, p.section_index, s.language, bucket"
+)
+
+
+async def rebuild_rollups(index: int) -> dict:
+    """Recompute one shard's rollups from sessions, section_progress and the whole
+    conversation log, archived segments included.
+
+    Step entry times are not stored, so the backfill takes a step's first logged turn
+    (the session's creation for the first step) as the moment it was entered. Counts
+    that live sessions add while the history is being read are overwritten, so run it
+    with the server stopped for exact figures.
+    """
+    started = time.monotonic()
+    async with shard_db(index) as db:
+        modules = await (await db.execute(REBUILD_MODULES_SQL)).fetchall()
+        sections = await (await db.execute(REBUILD_SECTIONS_SQL)).fetchall()
+        durations = await (await db.execute(REBUILD_DURATIONS_SQL)).fetchall()
+
+    # (module, section, step, language) -> [reached, tutor_turns, learner_turns, timed, seconds_total]
+    steps: dict[tuple, list] = defaultdict(lambda: [0, 0, 0, 0, 0.0])
+    after, sessions, rows = "", 0, 0
+    while True:
+        async with shard_db(index) as db:
+            cursor = await db.execute(
+                "SELECT id, module_id, language, current_section, current_step, created_at FROM sessions "
+                "WHERE id > ? ORDER BY id LIMIT ?",
+                (after, REBUILD_BATCH_SESSIONS),
+            )
+            batch = [dict(r) for r in await cursor.fetchall()]
+            if not batch:
+                break
+            logs = await _session_logs(db, [s["id"] for s in batch])
+        for session in batch:
+            rows += _count_session(steps, session, logs.get(session["id"], []))
+        sessions += len(batch)
+        after = batch[-1]["id"]
+
+    async with shard_db(index, write=True) as db:
+        for table in ROLLUP_TABLES:
+            await db.execute(f"DELETE FROM {table}")
+        await db.executemany(
+            "INSERT INTO analytics_modules (module_id, language, started, completed) VALUES (?, ?, ?, ?)", modules,
+        )
+        await db.executemany(
+            "INSERT INTO analytics_sections (module_id, section_index, language, started, completed, seconds_total) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            sections,
+        )
+        await db.executemany(
+            "INSERT INTO analytics_section_durations (module_id, section_index, language, bucket, sessions) "
+            "VALUES (?, ?, ?, ?, ?)",
+            durations,
+        )
+        await db.executemany(
+            "INSERT INTO analytics_steps "
+            "(module_id, section_index, step_index, language, reached, tutor_turns, learner_turns, timed, seconds_total) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*key, *values) for key, values in steps.items()],
+        )
+        await db.commit()
+    return {"shard": index, "sessions": sessions, "log_rows": rows, "seconds": round(time.monotonic() - started, 2)}
+
+
+async def _session_logs(db, session_ids: list[str]) -> dict[str, list[dict]]:
+    """The log rows of a batch of sessions in order, archived blocks first."""
+    placeholders = ",".join("?" * len(session_ids))
+    logs: dict[str, list[dict]] = defaultdict(list)
+    cursor = await db.execute(
+        f"SELECT session_id, segment, byte_offset, byte_length FROM archived_sessions "
+        f"WHERE session_id IN ({placeholders}) ORDER BY rowid",
+        session_ids,
+    )
+    for block in await cursor.fetchall():
+        logs[block["session_id"]].extend(await read_archived_block(dict(block)))
+    cursor = await db.execute(
+        "SELECT session_id, section_index, step_index, role, language, created_at FROM conversation_log "
+        f"WHERE session_id IN ({placeholders}) ORDER BY session_id, id",
+        session_ids,
+    )
+    for row in await cursor.fetchall():
+        logs[row["session_id"]].append(dict(row))
+    return logs
+
+
+def _count_session(steps: dict[tuple, list], session: dict, rows: list[dict]) -> int:
+    module_id, language = session["module_id"], session["language"]
+    turns = Counter((r["section_index"], r["step_index"], r["language"], r["role"]) for r in rows)
+    for (section, step, turn_language, role), count in turns.items():
+        steps[(module_id, section, step, turn_language)][1 if role == "tutor" else 2] += count
+
+    # Positions in the order they were entered, with the time each was entered
+    entered: dict[tuple[int, int], str | None] = {(0, 0): session["created_at"]}
+    for row in rows:
+        entered.setdefault((row["section_index"], row["step_index"]), row["created_at"])
+    entered.setdefault((session["current_section"], session["current_step"]), None)
+    positions = list(entered.items())
+    for i, (position, entered_at) in enumerate(positions):
+        values = steps[(module_id, *position, language)]
+        values[0] += 1
+        left_at = positions[i + 1][1] if i + 1 < len(positions) else None
+        if entered_at and left_at:
+            seconds = (datetime.fromisoformat(left_at) - datetime.fromisoformat(entered_at)).total_seconds()
+            if 0 <= seconds <= settings.analytics_step_idle_cap_seconds:
+                values[3] += 1
+                values[4] += seconds
+    return len(rows)
+
+
+async def rebuild_all() -> list[dict]:
+    await flush_writes()
+    results = []
+    for index in range(shard_count()):
+        result = await rebuild_rollups(index)
+        logger.info(f"Rebuilt analytics rollups of shard {index}: {result}")
+        results.append(result)
+    return results
@@ -0,0 +1,170 @@
+"""Archival of finished conversation logs out of the hot conversation_log table.
+
+conversation_log only grows, and every finished session's turns would otherwise stay in
+the B-tree and page cache that live sessions read from. Periodically, the logs of
+sessions that completed more than ARCHIVE_COMPLETED_GRACE_HOURS ago, or have been idle
+for ARCHIVE_IDLE_DAYS, are written to a compressed segment (services/log_archive.py),
+catalogued in archived_sessions and deleted from the hot table, a batch of sessions at a
+time. On databases created with auto_vacuum=INCREMENTAL (new ones are), the freed pages
+are handed back a few thousand at a time; otherwise SQLite reuses them for new rows.
+
+get_conversation_history reads archived turns back transparently. A session that
+resumes after being archived simply logs new turns to the hot table again.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from backend.config import settings
+from backend.database import archive_dir, shard_count, shard_db
+from backend.services.log_archive import INDEX_SUFFIX, write_segment
+from backend.services.metrics import archived_rows
+
+logger = logging.getLogger(__name__)
+
+CANDIDATES_SQL = (
+    "SELECT id FROM sessions "
+    "WHERE ((status = 'completed' AND updated_at < datetime('now', ?)) OR updated_at < datetime('now', ?)) "
+    "AND EXISTS (SELECT 1 FROM conversation_log WHERE conversation_log.session_id = sessions.id) "
+    "LIMIT ?"
+)
+LOG_COLUMNS = "id, session_id, section_index, step_index, role, text, language, created_at"
+
+_stats = {
+    "runs": 0,
+    "segments": 0,
+    "sessions": 0,
+    "rows": 0,
+    "bytes_written": 0,
+    "pages_reclaimed": 0,
+    "conflicts": 0,
+    "errors": 0,
+    "last_run_seconds": 0.0,
+}
+_task: asyncio.Task | None = None
+
+
+async def archive_batch(index: int, limit: int | None = None) -> int:
+    """Archive up to `limit` eligible sessions of one shard into one segment.
+
+    Returns how many sessions were archived (0 when none are due).
+    """
+    limit = limit or settings.archive_batch_sessions
+    async with shard_db(index) as db:
+        cursor = await db.execute(CANDIDATES_SQL, (
+            f"-{settings.archive_completed_grace_hours} hours", f"-{settings.archive_idle_days} days", limit,
+        ))
+        session_ids = [row[0] for row in await cursor.fetchall()]
+        if not session_ids:
+            return 0
+        placeholders = ",".join("?" * len(session_ids))
+        cursor = await db.execute(
+            f"SELECT {LOG_COLUMNS} FROM conversation_log WHERE session_id IN ({placeholders}) ORDER BY session_id, id",
+            session_ids,
+        )
+        rows = [dict(row) for row in await cursor.fetchall()]
+
+    sessions: dict[str, list[dict]] = {}
+    for row in rows:
+        sessions.setdefault(row.pop("session_id"), []).append(row)
+    # Rows logged after the read above have larger ids and stay hot until the next run
+    last_id = max(row["id"] for row in rows)
+    directory = archive_dir()
+    segment, blocks = await asyncio.to_thread(write_segment, directory, sessions)
+
+    async with shard_db(index, write=True) as db:
+        cursor = await db.execute(
+            f"DELETE FROM conversation_log WHERE session_id IN ({placeholders}) AND id <= ?",
+            (*session_ids, last_id),
+        )
+        if cursor.rowcount != len(rows):
+            # Another process archived (some of) these sessions first; keep its copy
+            await db.rollback()
+            await asyncio.to_thread(_remove_segment, directory, segment)
+            _stats["conflicts"] += 1
+            return 0
+        await db.executemany(
+            "INSERT INTO archived_sessions (session_id, segment, byte_offset, byte_length, row_count) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(session_id, segment, *block) for session_id, block in blocks.items()],
+        )
+        await db.commit()
+        _stats["pages_reclaimed"] += await _reclaim_pages(db)
+
+    _stats["segments"] += 1
+    _stats["sessions"] += len(sessions)
+    _stats["rows"] += len(rows)
+    _stats["bytes_written"] += sum(length for _, length, _ in blocks.values())
+    archived_rows.inc(len(rows))
+    return len(sessions)
+
+
+async def _reclaim_pages(db) -> int:
+    """Return up to archive_vacuum_pages free pages to the filesystem (incremental auto-vacuum only)."""
+    cursor = await db.execute("PRAGMA auto_vacuum")
+    if (await cursor.fetchone())[0] != 2:
+        return 0
+    cursor = await db.execute("PRAGMA freelist_count")
+    before = (await cursor.fetchone())[0]
+    # The pragma frees one page per step; execute() would only take the first step
+    await db.executescript(f"PRAGMA incremental_vacuum({int(settings.archive_vacuum_pages)});")
+    cursor = await db.execute("PRAGMA freelist_count")
+    return before - (await cursor.fetchone())[0]
+
+
+def _remove_segment(directory: str, segment: str):
+    for name in (segment, segment + INDEX_SUFFIX):
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+async def archive_all() -> int:
+    """Archive every session that is due, shard by shard and batch by batch."""
+    started = time.monotonic()
+    archived = 0
+    for index in range(shard_count()):
+        while True:
+            count = await archive_batch(index)
+            archived += count
+            if count < settings.archive_batch_sessions:
+                break
+    _stats["runs"] += 1
+    _stats["last_run_seconds"] = round(time.monotonic() - started, 3)
+    if archived:
+        logger.info(f"Archived the conversation logs of {archived} sessions in {_stats['last_run_seconds']}s")
+    return archived
+
+
+async def _run():
+    while True:
+        try:
+            await archive_all()
+        except Exception as e:
+            _stats["errors"] += 1
+            logger.error(f"Conversation log archival failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.archive_interval_seconds)
+
+
+async def init_archiver():
+    global _task
+    if settings.archive_logs and _task is None:
+        _task = asyncio.create_task(_run())
+
+
+async def close_archiver():
+    global _task
+    task, _task = _task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def archiver_stats() -> dict:
+    return {"enabled": settings.archive_logs, "directory": archive_dir(), **_stats}
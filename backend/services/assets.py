@@ -0,0 +1,227 @@
+"""Pre-rendered curriculum assets: tutor text and audio built offline into a bundle.
+
+`scripts/build_assets.py` renders every learner-independent turn (see
+Curriculum.learner_independent) for each language and supported pace, and writes:
+
+- bundle-<hash>.bin: every audio blob, concatenated, addressed by content hash
+- manifest.json: where each blob sits in the .bin file, and for each turn its text,
+  the guidance hash it was rendered from and its audio hashes per pace
+
+The server memory-maps the .bin file (shared page cache across worker processes) and
+serves blobs at /api/assets/{hash} with immutable caching. Lessons send clients that
+support it the URL instead of the audio itself. A turn whose guidance changed since the
+build is ignored (generated live) until the bundle is rebuilt.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import time
+from dataclasses import dataclass
+
+from backend.config import settings
+from backend.services.curriculum import Curriculum, Step
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "cache", "assets")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_SCHEMA = 1
+AUDIO_CONTENT_TYPE = "audio/wav"
+
+# How often a running server checks whether the bundle was rebuilt
+RELOAD_CHECK_SECONDS = 30.0
+
+
+def asset_dir() -> str:
+    return settings.asset_bundle_dir or DEFAULT_ASSET_DIR
+
+
+def asset_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def asset_url(digest: str) -> str:
+    return f"/api/assets/{digest}"
+
+
+def turn_key(module_id: str, section_index: int, step_index: int, language: str) -> str:
+    return f"{module_id}/{section_index}/{step_index}/{language}"
+
+
+def pace_key(pace: float) -> str:
+    return f"{pace:.2f}"
+
+
+def guidance_hash(curriculum: Curriculum, step: Step, language: str) -> str:
+    """Everything a bundled turn was prompted with, so edits invalidate exactly that turn."""
+    raw = "\x1f".join([curriculum.system_prompts[language], step.type, step.guidance(language)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class BundledTurn:
+    text: str
+    audio: dict[str, list[str]]  # pace_key -> audio hashes, one per sentence segment
+
+
+class AssetBundle:
+    """Read side of the bundle: manifest lookups and blobs from the memory-mapped file."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._manifest: dict = {"blobs": {}, "turns": {}}
+        self._map: mmap.mmap | None = None
+        self._file = None
+        self._manifest_mtime: float | None = None
+        self._checked_at = 0.0
+        self._stats = {"turns_served": 0, "audio_by_url": 0, "audio_inline": 0, "stale_turns": 0}
+
+    def load(self) -> bool:
+        """(Re)open the bundle; False if there is none. A rebuilt bundle replaces the old atomically."""
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path) as f:
+                manifest = json.load(f)
+            if manifest.get("schema") != MANIFEST_SCHEMA:
+                logger.error(f"Asset manifest {path} has unsupported schema {manifest.get('schema')}")
+                return False
+            file = open(os.path.join(self.directory, manifest["blob_file"]), "rb")
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not load asset bundle from {self.directory}: {e}")
+            return False
+        size = os.fstat(file.fileno()).st_size
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.close()
+        self._manifest, self._map, self._file, self._manifest_mtime = manifest, mapped, file, mtime
+        logger.info(f"Loaded asset bundle: {len(manifest['turns'])} turns, {len(manifest['blobs'])} blobs")
+        return True
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(os.path.join(self.directory, MANIFEST_NAME)).st_mtime
+        except OSError:
+            return
+        if mtime != self._manifest_mtime:
+            self.load()
+
+    def blob(self, digest: str) -> bytes | None:
+        self._maybe_reload()
+        entry = self._manifest["blobs"].get(digest)
+        if entry is None or self._map is None:
+            return None
+        offset, length = entry
+        return self._map[offset:offset + length]
+
+    def turn(self, curriculum: Curriculum, section_index: int, step_index: int, language: str) -> BundledTurn | None:
+        """The pre-rendered turn, if the bundle has one built from the current guidance."""
+        if not settings.asset_bundle:
+            return None
+        self._maybe_reload()
+        step = curriculum.step(section_index, step_index)
+        if step is None:
+            return None
+        entry = self._manifest["turns"].get(turn_key(curriculum.id, section_index, step_index, language))
+        if entry is None:
+            return None
+        if entry["guidance_hash"] != guidance_hash(curriculum, step, language):
+            self._stats["stale_turns"] += 1
+            return None
+        return BundledTurn(text=entry["text"], audio=entry["audio"])
+
+    def covers(self, curriculum: Curriculum, section_index: int, step_index: int, language: str) -> bool:
+        step = curriculum.step(section_index, step_index)
+        if not settings.asset_bundle or step is None:
+            return False
+        entry = self._manifest["turns"].get(turn_key(curriculum.id, section_index, step_index, language))
+        return entry is not None and entry["guidance_hash"] == guidance_hash(curriculum, step, language)
+
+    def record_served(self, by_url: int, inline: int):
+        self._stats["turns_served"] += 1
+        self._stats["audio_by_url"] += by_url
+        self._stats["audio_inline"] += inline
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "loaded": self._manifest_mtime is not None,
+            "turns": len(self._manifest["turns"]),
+            "blobs": len(self._manifest["blobs"]),
+            "bytes": len(self._map) if self._map is not None else 0,
+        }
+
+
+def read_manifest(directory: str) -> dict | None:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return manifest if manifest.get("schema") == MANIFEST_SCHEMA else None
+
+
+def write_bundle(directory: str, turns: dict[str, dict], blobs: dict[str, bytes]) -> str:
+    """Write a bundle: the .bin file first, then the manifest (renamed into place) that points at it.
+
+    Blob files of earlier builds are removed afterwards; a server that still has one
+    mapped keeps reading it until it reloads.
+    """
+    os.makedirs(directory, exist_ok=True)
+    digests = sorted(blobs)
+    blob_index, offset = {}, 0
+    for digest in digests:
+        blob_index[digest] = [offset, len(blobs[digest])]
+        offset += len(blobs[digest])
+    blob_file = f"bundle-{asset_hash(''.join(digests).encode())}.bin"
+
+    tmp = os.path.join(directory, f".{blob_file}.tmp")
+    with open(tmp, "wb") as f:
+        for digest in digests:
+            f.write(blobs[digest])
+    os.replace(tmp, os.path.join(directory, blob_file))
+
+    manifest = {
+        "schema": MANIFEST_SCHEMA,
+        "built_at": time.time(),
+        "blob_file": blob_file,
+        "blobs": blob_index,
+        "turns": turns,
+    }
+    tmp = os.path.join(directory, f".{MANIFEST_NAME}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, os.path.join(directory, MANIFEST_NAME))
+
+    for name in os.listdir(directory):
+        if name.startswith("bundle-") and name.endswith(".bin") and name != blob_file:
+            os.remove(os.path.join(directory, name))
+    return blob_file
+
+
+asset_bundle = AssetBundle(asset_dir())
+
+
+async def init_assets():
+    if settings.asset_bundle and not asset_bundle.load():
+        logger.info(f"No asset bundle in {asset_bundle.directory}; opening turns are generated (run scripts/build_assets.py)")
+
+
+async def close_assets():
+    asset_bundle.close()
@@ -0,0 +1,42 @@
+"""Binary WebSocket framing for audio, negotiated with the `binary_audio` capability.
+
+Each audio payload travels as one binary frame: a 12-byte header followed by the raw
+audio bytes. Header layout (network byte order):
+
+    type:u8  codec:u8  flags:u8  version:u8  seq:u32  turn:u32
+"""
+
+import struct
+
+HEADER = struct.Struct("!BBBBII")
+VERSION = 1
+
+# Frame types
+TUTOR_AUDIO = 1
+LEARNER_AUDIO = 2
+
+# Codecs
+CODEC_WAV = 1
+CODEC_WEBM_OPUS = 2
+
+# Flags
+FLAG_LAST = 0x01
+
+
+def pack_frame(frame_type: int, codec: int, payload: bytes, seq: int = 0, turn: int = 0, flags: int = 0) -> bytes:
+    return b"".join((HEADER.pack(frame_type, codec, flags, VERSION, seq, turn), payload))
+
+
+def unpack_frame(frame: bytes) -> tuple[int, int, int, int, int, memoryview]:
+    """Return (type, codec, flags, seq, turn, payload); the payload is a zero-copy view."""
+    if len(frame) < HEADER.size:
+        raise ValueError("Audio frame shorter than its header")
+    frame_type, codec, flags, version, seq, turn = HEADER.unpack_from(frame)
+    if version != VERSION:
+        raise ValueError(f"Unsupported audio frame version {version}")
+    return frame_type, codec, flags, seq, turn, memoryview(frame)[HEADER.size:]
+
+
+def turn_number(turn_id: str) -> int:
+    """Turn ids are 8 hex chars, i.e. exactly a u32."""
+    return int(turn_id, 16)
@@ -0,0 +1,109 @@
+"""Prompt context budgeting: a local token estimate and rolling summaries of older turns.
+
+Every tutor turn sends the system prompt plus the section's conversation so far, which
+grows without bound in long sections (and Hindi in Devanagari costs several times more
+tokens than the same English). `fit_history` keeps a call within the configured budget
+by standing a summary in for the older part of the section and sending only the recent
+turns verbatim. Summaries are produced off the critical path (see ConversationHistory).
+"""
+
+import re
+
+from backend.services.gemini import chat_completion
+
+# Rough tokens-per-character for the scripts the tutor speaks; deliberately on the high
+# side so the budget holds with any of the usual tokenizers.
+ASCII_CHARS_PER_TOKEN = 4.0
+DEVANAGARI_CHARS_PER_TOKEN = 2.0
+OTHER_CHARS_PER_TOKEN = 1.5
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_DEVANAGARI = re.compile(r"[\u0900-\u097F]")
+
+SUMMARY_PREFIX = "[SUMMARY OF EARLIER CONVERSATION — not visible to learner]: "
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate, weighted by script."""
+    if text.isascii():
+        return int(len(text) / ASCII_CHARS_PER_TOKEN) + 1
+    devanagari = len(_DEVANAGARI.findall(text))
+    ascii_chars = sum(1 for c in text if c < "\x80")
+    other = len(text) - devanagari - ascii_chars
+    return int(
+        ascii_chars / ASCII_CHARS_PER_TOKEN
+        + devanagari / DEVANAGARI_CHARS_PER_TOKEN
+        + other / OTHER_CHARS_PER_TOKEN
+    ) + 1
+
+
+def message_tokens(message: dict) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def summary_message(summary: str) -> dict:
+    return {"role": "user", "content": SUMMARY_PREFIX + summary}
+
+
+def split_point(costs: list[int], covered: int, recent_budget: int) -> int:
+    """Index from which the newest turns fit in `recent_budget`, never before `covered`.
+
+    At least the last two messages (the latest exchange) always stay verbatim.
+    """
+    index, total = len(costs), 0
+    while index > covered:
+        cost = costs[index - 1]
+        if index <= len(costs) - 2 and total + cost > recent_budget:
+            break
+        total += cost
+        index -= 1
+    return index
+
+
+def fit_history(
+    messages: list[dict], costs: list[int], summary: str | None, covered: int, budget: int,
+) -> tuple[list[dict], int]:
+    """History to send within `budget` tokens, and the estimated tokens it saved.
+
+    The first `covered` messages are replaced by `summary` when there is one. If what
+    remains still exceeds the budget (the summary is behind), the oldest uncovered turns
+    are dropped as a last resort; the next summary folds them back in.
+    """
+    full = sum(costs)
+    if full <= budget:
+        return messages, 0
+    if summary:
+        head, head_cost = [summary_message(summary)], estimate_tokens(summary) + MESSAGE_OVERHEAD_TOKENS
+    else:
+        head, head_cost, covered = [], 0, 0
+    start = covered
+    sent = head_cost + sum(costs[start:])
+    while sent > budget and start < len(messages) - 2:
+        sent -= costs[start]
+        start += 1
+    return head + messages[start:], max(0, full - sent)
+
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You keep a running summary of a one-on-one voice lesson between a leadership tutor and a "
+    "learner, so the tutor can continue the conversation without the full transcript. Merge the "
+    "previous summary (if any) with the new turns. Keep what the tutor would need later: what was "
+    "taught, the questions asked, and the learner's answers, examples, names and feelings in their "
+    "own terms. Write compact English prose in the third person, at most {max_words} words, with "
+    "no preamble."
+)
+
+
+async def summarize_turns(previous: str | None, messages: list[dict], max_tokens: int = 250) -> str:
+    """Fold `messages` into `previous`, returning the new rolling summary (runs as a job)."""
+    lines = [f"{'Tutor' if m['role'] == 'assistant' else 'Learner'}: {m['content']}" for m in messages]
+    prompt = (f"Previous summary:\n{previous}\n\n" if previous else "") + "New turns:\n" + "\n".join(lines)
+    return (await chat_completion(
+        [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT.format(max_words=int(max_tokens * 0.6))},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.2,
+        max_tokens=max_tokens,
+        hedge=False,
+    )).strip()
@@ -0,0 +1,280 @@
+"""Compiled curriculum: validated once, immutable, with precomputed navigation and payloads."""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+
+logger = logging.getLogger(__name__)
+
+CURRICULUM_DIR = Path(__file__).parent.parent / "curriculum"
+
+STEP_TYPES = ("teach", "teach_and_ask", "reflect", "scenario", "summarize")
+RESPONSE_STEP_TYPES = ("teach_and_ask", "reflect", "scenario")
+LANGUAGES = ("en", "hi")
+
+
+class CurriculumError(ValueError):
+    """The curriculum file does not match the expected schema."""
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    section_index: int
+    index: int
+    flat_index: int
+    type: str
+    prompt_guidance: str
+    prompt_guidance_hi: str | None
+    feedback_guidance: str | None
+    expects_response: bool
+
+    def guidance(self, language: str) -> str:
+        if language == "hi" and self.prompt_guidance_hi:
+            return self.prompt_guidance_hi
+        return self.prompt_guidance
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    index: int
+    id: str
+    title: str
+    title_hi: str
+    estimated_minutes: int | None
+    steps: tuple[Step, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Curriculum:
+    id: str
+    title: str
+    title_hi: str
+    description: str
+    estimated_minutes: int
+    sections: tuple[Section, ...]
+    steps: tuple[Step, ...]                    # every step, flattened in lesson order
+    section_offsets: tuple[int, ...]           # flat index of each section's first step
+    next_flat: tuple[int, ...]                 # flat index of the following step (itself at the end)
+    learner_independent: frozenset[int]        # flat indexes whose opening turn is the same for every learner
+    system_prompts: Mapping[str, str]          # pre-rendered per language
+    curriculum_info_message: str               # ready-to-send `curriculum_info` WS message
+    progress_messages: tuple[str, ...]         # ready-to-send `progress` WS message per flat index
+    summary_json: bytes                        # ModuleResponse body for the REST API
+    mtime: float
+
+    def __reduce__(self):
+        # Pickled (e.g. into a job worker) by id: the receiving process loads its own compiled copy
+        return load_curriculum, (self.id,)
+
+    def flat_index(self, section_index: int, step_index: int) -> int | None:
+        if not 0 <= section_index < len(self.sections):
+            return None
+        if not 0 <= step_index < len(self.sections[section_index].steps):
+            return None
+        return self.section_offsets[section_index] + step_index
+
+    def step(self, section_index: int, step_index: int) -> Step | None:
+        flat = self.flat_index(section_index, step_index)
+        return None if flat is None else self.steps[flat]
+
+    def is_learner_independent(self, section_index: int, step_index: int) -> bool:
+        """Whether the turn opening this step depends only on the language (not on the learner)."""
+        flat = self.flat_index(section_index, step_index)
+        return flat is not None and flat in self.learner_independent
+
+    def section(self, section_index: int) -> Section | None:
+        if 0 <= section_index < len(self.sections):
+            return self.sections[section_index]
+        return None
+
+    def next_position(self, section_index: int, step_index: int) -> tuple[int, int]:
+        flat = self.flat_index(section_index, step_index)
+        if flat is None:
+            # Past the end of a section (e.g. a saved position from an older curriculum)
+            if 0 <= section_index < len(self.sections) - 1:
+                return section_index + 1, 0
+            return section_index, step_index
+        step = self.steps[self.next_flat[flat]]
+        return step.section_index, step.index
+
+    def progress_message(self, section_index: int, step_index: int) -> str:
+        flat = self.flat_index(section_index, step_index)
+        if flat is None:
+            return _ws_message("progress", {
+                "section_index": section_index,
+                "step_index": step_index,
+                "section_title": "",
+                "total_sections": len(self.sections),
+            })
+        return self.progress_messages[flat]
+
+
+def _ws_message(msg_type: str, data: dict) -> str:
+    return json.dumps({"type": msg_type, "data": data})
+
+
+def render_system_prompt(title: str, language: str) -> str:
+    lang_name = "Hindi" if language == "hi" else "English"
+    return f"""You are a warm, direct leadership tutor in a voice conversation.
+
+Rules:
+- Speak in {lang_name}. Maximum 1-2 sentences per turn. Never more than 2.
+- This is spoken aloud — be crisp, not wordy.
+- No bullet points, lists, or markdown. No filler praise like "Great question!"
+- Be specific when affirming. Be genuinely curious when asking.
+- Module: {title}"""
+
+
+def _require(obj: dict, key: str, kind: type | tuple[type, ...], where: str):
+    if key not in obj:
+        raise CurriculumError(f"{where}: missing '{key}'")
+    value = obj[key]
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise CurriculumError(f"{where}.{key}: expected {getattr(kind, '__name__', kind)}")
+    return value
+
+
+def _optional_str(obj: dict, key: str, where: str) -> str | None:
+    value = obj.get(key)
+    if value is not None and not isinstance(value, str):
+        raise CurriculumError(f"{where}.{key}: expected str")
+    return value
+
+
+def compile_curriculum(raw: dict, mtime: float = 0.0) -> Curriculum:
+    """Validate the raw JSON and build the immutable, precomputed form."""
+    if not isinstance(raw, dict):
+        raise CurriculumError("curriculum: expected an object")
+    module_id = _require(raw, "id", str, "curriculum")
+    title = _require(raw, "title", str, "curriculum")
+    title_hi = _optional_str(raw, "title_hi", "curriculum") or title
+    description = _require(raw, "description", str, "curriculum")
+    estimated_minutes = _require(raw, "estimated_minutes", int, "curriculum")
+    raw_sections = _require(raw, "sections", list, "curriculum")
+    if not raw_sections:
+        raise CurriculumError("curriculum.sections: must not be empty")
+
+    sections = []
+    steps = []
+    offsets = []
+    for s_idx, raw_section in enumerate(raw_sections):
+        where = f"sections[{s_idx}]"
+        if not isinstance(raw_section, dict):
+            raise CurriculumError(f"{where}: expected an object")
+        raw_steps = _require(raw_section, "steps", list, where)
+        if not raw_steps:
+            raise CurriculumError(f"{where}.steps: must not be empty")
+        offsets.append(len(steps))
+        section_steps = []
+        for st_idx, raw_step in enumerate(raw_steps):
+            step_where = f"{where}.steps[{st_idx}]"
+            if not isinstance(raw_step, dict):
+                raise CurriculumError(f"{step_where}: expected an object")
+            step_type = _require(raw_step, "type", str, step_where)
+            if step_type not in STEP_TYPES:
+                raise CurriculumError(f"{step_where}.type: unknown step type '{step_type}'")
+            step = Step(
+                section_index=s_idx,
+                index=st_idx,
+                flat_index=len(steps),
+                type=step_type,
+                prompt_guidance=_require(raw_step, "prompt_guidance", str, step_where),
+                prompt_guidance_hi=_optional_str(raw_step, "prompt_guidance_hi", step_where),
+                feedback_guidance=_optional_str(raw_step, "feedback_guidance", step_where),
+                expects_response=step_type in RESPONSE_STEP_TYPES,
+            )
+            section_steps.append(step)
+            steps.append(step)
+        section_title = _require(raw_section, "title", str, where)
+        minutes = raw_section.get("estimated_minutes")
+        if minutes is not None and (not isinstance(minutes, int) or isinstance(minutes, bool)):
+            raise CurriculumError(f"{where}.estimated_minutes: expected int")
+        sections.append(Section(
+            index=s_idx,
+            id=_require(raw_section, "id", str, where),
+            title=section_title,
+            title_hi=_optional_str(raw_section, "title_hi", where) or section_title,
+            estimated_minutes=minutes,
+            steps=tuple(section_steps),
+        ))
+
+    # The last step points at itself, matching next_position's "same position at the end"
+    next_flat = tuple(min(i + 1, len(steps) - 1) for i in range(len(steps)))
+
+    # A section's first step is prompted with an empty section history and no learner
+    # answer, so its opening turn is the same for everyone speaking a given language
+    learner_independent = frozenset(offsets)
+
+    progress_messages = tuple(
+        _ws_message("progress", {
+            "section_index": step.section_index,
+            "step_index": step.index,
+            "section_title": sections[step.section_index].title,
+            "total_sections": len(sections),
+        })
+        for step in steps
+    )
+    curriculum_info_message = _ws_message("curriculum_info", {"sections": [
+        {"index": sec.index, "title": sec.title, "title_hi": sec.title_hi, "step_count": len(sec.steps)}
+        for sec in sections
+    ]})
+    summary_json = json.dumps({
+        "id": module_id,
+        "title": title,
+        "title_hi": title_hi,
+        "description": description,
+        "section_count": len(sections),
+        "estimated_minutes": estimated_minutes,
+    }, ensure_ascii=False).encode("utf-8")
+
+    return Curriculum(
+        id=module_id,
+        title=title,
+        title_hi=title_hi,
+        description=description,
+        estimated_minutes=estimated_minutes,
+        sections=tuple(sections),
+        steps=tuple(steps),
+        section_offsets=tuple(offsets),
+        next_flat=next_flat,
+        learner_independent=learner_independent,
+        system_prompts=MappingProxyType({lang: render_system_prompt(title, lang) for lang in LANGUAGES}),
+        curriculum_info_message=curriculum_info_message,
+        progress_messages=progress_messages,
+        summary_json=summary_json,
+        mtime=mtime,
+    )
+
+
+_compiled: dict[str, Curriculum] = {}
+_rejected_mtimes: dict[str, float] = {}
+
+
+def load_curriculum(module_id: str) -> Curriculum:
+    """Return the compiled curriculum, recompiling if the file changed on disk.
+
+    A recompiled curriculum replaces the old one in a single assignment, so callers see
+    either the old or the new version, never a mix. Lessons already running keep the
+    object they started with. If the edited file fails validation, the last good
+    version keeps being served.
+    """
+    path = CURRICULUM_DIR / f"{module_id}.json"
+    mtime = os.stat(path).st_mtime
+    current = _compiled.get(module_id)
+    if current is not None and (current.mtime == mtime or _rejected_mtimes.get(module_id) == mtime):
+        return current
+
+    try:
+        compiled = compile_curriculum(json.loads(path.read_text()), mtime)
+    except (CurriculumError, json.JSONDecodeError) as e:
+        if current is None:
+            raise
+        logger.error(f"Curriculum {module_id} failed to recompile, keeping the previous version: {e}")
+        _rejected_mtimes[module_id] = mtime
+        return current
+    _compiled[module_id] = compiled
+    return compiled
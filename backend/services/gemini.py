@@ -1,26 +1,92 @@
-import httpx
+import json
+from typing import AsyncIterator
 from backend.config import settings
+from backend.services.governor import get_governor
+from backend.services.hedging import hedged
+from backend.services.http_clients import OPENROUTER, get_client
 
 
-async def chat_completion(messages: list[dict], temperature: float = 0.7, max_tokens: int = 150) -> str:
-    """Send a chat completion request to Gemini via OpenRouter."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            f"{settings.openrouter_base_url}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.openrouter_api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": settings.gemini_model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-            },
-        )
+def _headers() -> dict:
+    return {
+        "Authorization": f"Bearer {settings.openrouter_api_key}",
+        "Content-Type": "application/json",
+    }
+
+
+async def chat_completion(
+    messages: list[dict], temperature: float = 0.7, max_tokens: int = 150, hedge: bool | None = None
+) -> str:
+    """Send a chat completion request to Gemini via OpenRouter.
+
+    Slow or failed requests are hedged (see services/hedging.py); by default only when
+    made for a lesson session, since background work can wait.
+    """
+
+    async def complete(model: str) -> AsyncIterator[str]:
+        yield await _complete(model, messages, temperature, max_tokens)
+
+    return "".join([content async for content in hedged("complete", complete, hedge)])
+
+
+async def _complete(model: str, messages: list[dict], temperature: float, max_tokens: int) -> str:
+    client = get_client(OPENROUTER)
+    response = await get_governor(OPENROUTER).request(lambda: client.post(
+        f"{settings.openrouter_base_url}/chat/completions",
+        headers=_headers(),
+        json={
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+    ))
+    response.raise_for_status()
+    data = response.json()
+    return data["choices"][0]["message"]["content"]
+
+
+async def chat_completion_stream(
+    messages: list[dict], temperature: float = 0.7, max_tokens: int = 150, hedge: bool | None = None
+) -> AsyncIterator[str]:
+    """Stream a chat completion from OpenRouter's SSE endpoint, yielding content deltas.
+
+    A request with no first token by the hedge deadline is raced against a second one.
+    """
+    async for delta in hedged("stream", lambda model: _stream(model, messages, temperature, max_tokens), hedge):
+        yield delta
+
+
+async def _stream(model: str, messages: list[dict], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+    client = get_client(OPENROUTER)
+    async with get_governor(OPENROUTER).stream(lambda: client.stream(
+        "POST",
+        f"{settings.openrouter_base_url}/chat/completions",
+        headers=_headers(),
+        json={
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        },
+    )) as response:
         response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+        async for line in response.aiter_lines():
+            # SSE comments (": OPENROUTER PROCESSING") and blank keep-alive lines carry no data
+            if not line.startswith("data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == "[DONE]":
+                break
+            chunk = json.loads(payload)
+            if "error" in chunk:
+                raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+            choices = chunk.get("choices") or []
+            if not choices:
+                continue
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
 
 
 async def generate_tutor_response(
@@ -31,3 +97,14 @@ async def generate_tutor_response(
     """Generate a tutor response given system prompt and conversation history."""
     messages = [{"role": "system", "content": system_prompt}] + conversation_history
     return await chat_completion(messages, temperature=temperature)
+
+
+async def generate_tutor_response_stream(
+    system_prompt: str,
+    conversation_history: list[dict],
+    temperature: float = 0.7,
+) -> AsyncIterator[str]:
+    """Streaming variant of generate_tutor_response, yielding text deltas."""
+    messages = [{"role": "system", "content": system_prompt}] + conversation_history
+    async for delta in chat_completion_stream(messages, temperature=temperature):
+        yield delta
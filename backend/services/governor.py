@@ -0,0 +1,338 @@
+"""Upstream concurrency governor shared by the OpenRouter and Sarvam clients.
+
+Every upstream call goes through the provider's governor, which
+
+- caps calls in flight and meters them with a token bucket (requests per second),
+- grants waiting calls in weighted-fair order across lesson sessions, so one chatty
+  session cannot starve the others (work outside a session, e.g. summaries or the
+  variant pool refill, shares one lower-weight queue),
+- retries 429/5xx responses and transport errors a bounded number of times with
+  jittered exponential backoff (honouring Retry-After), and
+- trips a circuit breaker after repeated failures, failing fast instead of piling up
+  hung requests. A failing TTS call already degrades the turn to text only.
+
+Limits apply per process (each job worker has its own governor). Time spent queued is
+exported separately from upstream latency, so saturation can be told apart from a slow
+provider.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable
+
+import httpx
+
+from backend.config import settings
+from backend.services.http_clients import OPENROUTER, SARVAM
+from backend.services.metrics import (
+    upstream_circuit_state, upstream_in_flight, upstream_queue_wait, upstream_queued, upstream_rejected, upstream_retries,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+BACKGROUND = ""  # queue key for work not tied to a session
+
+_session: ContextVar[str] = ContextVar("upstream_session", default=BACKGROUND)
+
+
+def set_session(session_id: str):
+    """Attribute upstream calls made by this task (and tasks it starts) to a session."""
+    _session.set(session_id)
+
+
+def current_session() -> str:
+    return _session.get()
+
+
+class UpstreamUnavailable(Exception):
+    """The governor refused the call without sending it."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class QueueTimeout(UpstreamUnavailable):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 = now). A rate of 0 means unlimited."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        if self.rate > 0:
+            self.tokens -= 1
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; after `cooldown` one probe call is let through."""
+
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(self, provider: str, threshold: int, cooldown: float):
+        self.provider = provider
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def check(self):
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                raise CircuitOpenError(f"{self.provider} circuit open")
+            self._set(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(f"{self.provider} circuit half-open, probe in flight")
+            self._probing = True
+
+    def success(self):
+        self.failures = 0
+        self._probing = False
+        if self.state != self.CLOSED:
+            logger.info(f"{self.provider} circuit closed")
+            self._set(self.CLOSED)
+
+    def failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+            logger.warning(f"{self.provider} circuit open after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+            self._set(self.OPEN)
+
+    def release_probe(self):
+        """A probe that ended without a verdict (e.g. cancelled) lets the next call probe."""
+        self._probing = False
+
+    def _set(self, state: int):
+        self.state = state
+        upstream_circuit_state.set(state, provider=self.provider)
+
+
+class _Waiter:
+    __slots__ = ("future",)
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+
+
+class Governor:
+    """Admission control, fair queuing, retries and circuit breaking for one provider."""
+
+    def __init__(self, provider: str, max_in_flight: int, rate: float, burst: int):
+        self.provider = provider
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(provider, settings.upstream_breaker_failures, settings.upstream_breaker_cooldown_seconds)
+        self.in_flight = 0
+        # Weighted fair queuing: each waiter gets a virtual finish tag of
+        # max(virtual time, its session's last tag) + 1/weight; the smallest tag goes first
+        self._queue: list[tuple[float, int, _Waiter]] = []
+        self._finish_tags: dict[str, float] = {}
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0, "queue_wait_seconds": 0.0}
+
+    # --- admission ---
+
+    async def acquire(self):
+        """Wait for a slot in fair order; raises QueueTimeout instead of waiting forever."""
+        started = time.monotonic()
+        if not self._queue and self.in_flight < self.max_in_flight and self.bucket.wait_time() == 0:
+            self.bucket.take()
+            self._admit()
+        else:
+            key = current_session()
+            weight = settings.governor_background_weight if key == BACKGROUND else 1.0
+            tag = max(self._vtime, self._finish_tags.get(key, 0.0)) + 1.0 / weight
+            self._finish_tags[key] = tag
+            waiter = _Waiter(asyncio.get_running_loop().create_future())
+            heapq.heappush(self._queue, (tag, next(self._seq), waiter))
+            upstream_queued.inc(provider=self.provider)
+            self._dispatch()  # a slot may be free with only a token to wait for
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), settings.upstream_queue_timeout)
+            except asyncio.TimeoutError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    self.release()  # granted just as the wait timed out
+                waiter.future.cancel()
+                self._stats["rejected"] += 1
+                upstream_rejected.inc(provider=self.provider, reason="queue_timeout")
+                raise QueueTimeout(f"{self.provider}: no upstream slot within {settings.upstream_queue_timeout}s")
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    self.release()  # granted just as we were cancelled
+                else:
+                    waiter.future.cancel()
+                raise
+            finally:
+                upstream_queued.dec(provider=self.provider)
+            self._vtime = max(self._vtime, tag)
+            self._prune_tags()
+        waited = time.monotonic() - started
+        self._stats["queue_wait_seconds"] += waited
+        upstream_queue_wait.observe(waited, provider=self.provider)
+
+    def _admit(self):
+        self.in_flight += 1
+        self._stats["calls"] += 1
+        upstream_in_flight.inc(provider=self.provider)
+
+    def release(self):
+        self.in_flight -= 1
+        upstream_in_flight.dec(provider=self.provider)
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queue and self.in_flight < self.max_in_flight:
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._on_timer)
+                return
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue  # gave up waiting
+            self.bucket.take()
+            self._admit()
+            waiter.future.set_result(None)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def _prune_tags(self):
+        if len(self._finish_tags) > 10000:
+            self._finish_tags = {k: t for k, t in self._finish_tags.items() if t > self._vtime}
+
+    # --- calls ---
+
+    async def request(self, send: Callable[[], Awaitable[httpx.Response]], retries: int | None = None) -> httpx.Response:
+        """Send a request (a fresh one per attempt), retrying 429/5xx and transport errors."""
+        async with self.stream(lambda: _as_context(send), retries) as response:
+            return response
+
+    @asynccontextmanager
+    async def stream(
+        self, open_response: Callable[[], AsyncContextManager[httpx.Response]], retries: int | None = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """Open a response (e.g. `client.stream(...)`) under the governor and hold the slot while it is read.
+
+        Retries happen only before the response is handed over; a failure while the
+        caller reads the body is not retried.
+        """
+        retries = settings.upstream_max_retries if retries is None else retries
+        try:
+            self.breaker.check()
+        except CircuitOpenError:
+            self._stats["rejected"] += 1
+            upstream_rejected.inc(provider=self.provider, reason="circuit_open")
+            raise
+        attempt = 0
+        try:
+            while True:
+                await self.acquire()
+                handed_over = False
+                try:
+                    async with open_response() as response:
+                        if response.status_code in RETRYABLE_STATUS and attempt < retries:
+                            delay = self._backoff(attempt, response)
+                        else:
+                            if response.status_code in RETRYABLE_STATUS:
+                                self._failed()
+                            else:
+                                self.breaker.success()
+                            handed_over = True
+                            yield response
+                            return
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    if handed_over or attempt >= retries:
+                        self._failed()
+                        raise
+                    delay = self._backoff(attempt)
+                    logger.info(f"{self.provider} request failed ({type(e).__name__}), retrying")
+                finally:
+                    self.release()
+                attempt += 1
+                self._stats["retries"] += 1
+                upstream_retries.inc(provider=self.provider)
+                await asyncio.sleep(delay)
+                if self.breaker.state == CircuitBreaker.OPEN:
+                    raise CircuitOpenError(f"{self.provider} circuit opened while retrying")
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+
+    def _failed(self):
+        self._stats["failures"] += 1
+        self.breaker.failure()
+
+    def _backoff(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Full-jitter exponential backoff, at least Retry-After (capped) when the provider sends one."""
+        cap = settings.upstream_retry_max_backoff_ms / 1000
+        delay = random.uniform(0, min(cap, settings.upstream_retry_backoff_ms / 1000 * 2 ** attempt))
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), cap))
+            except ValueError:
+                pass
+        return delay
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "queue_wait_seconds": round(self._stats["queue_wait_seconds"], 3),
+            "in_flight": self.in_flight,
+            "queued": len(self._queue),
+            "circuit": ("closed", "open", "half_open")[self.breaker.state],
+        }
+
+
+@asynccontextmanager
+async def _as_context(send: Callable[[], Awaitable[httpx.Response]]) -> AsyncIterator[httpx.Response]:
+    yield await send()
+
+
+_governors: dict[str, Governor] = {}
+
+
+def get_governor(provider: str) -> Governor:
+    governor = _governors.get(provider)
+    if governor is None:
+        if provider == OPENROUTER:
+            limits = (settings.openrouter_max_in_flight, settings.openrouter_rate_per_second, settings.openrouter_rate_burst)
+        elif provider == SARVAM:
+            limits = (settings.sarvam_max_in_flight, settings.sarvam_rate_per_second, settings.sarvam_rate_burst)
+        else:
+            raise ValueError(f"Unknown upstream provider: {provider}")
+        governor = _governors[provider] = Governor(provider, *limits)
+    return governor
+
+
+def governor_stats() -> dict:
+    return {provider: get_governor(provider).stats() for provider in (OPENROUTER, SARVAM)}
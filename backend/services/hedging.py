@@ -0,0 +1,197 @@
+"""Hedged LLM requests: cut the latency tail by racing a second request against a slow first one.
+
+If the first request has not produced its first token by an adaptive deadline (a
+rolling percentile of recent time-to-first-token, p90 by default), a duplicate is sent
+to the fallback model (or the same model if none is configured). Whichever produces a
+token first is used and the other is cancelled. Hedges are capped per minute so a
+provider-wide slowdown cannot double our LLM spend. A request that fails before its
+first token goes to the fallback model straight away.
+
+Only what happens before the first token is raced; once a response is streaming to the
+learner it is not switched.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Callable
+
+from backend.config import settings
+from backend.services.governor import BACKGROUND, UpstreamUnavailable, current_session
+from backend.services.metrics import llm_fallbacks, llm_hedge_deadline, llm_hedges
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of time-to-first-token samples and the hedge deadline derived from it."""
+
+    def __init__(self, window: int):
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def deadline(self) -> float:
+        """Seconds to wait for a first token before hedging."""
+        if len(self.samples) < settings.llm_hedge_min_samples:
+            return settings.llm_hedge_initial_delay_ms / 1000
+        ordered = sorted(self.samples)
+        value = ordered[min(len(ordered) - 1, int(len(ordered) * settings.llm_hedge_percentile))]
+        return min(max(value, settings.llm_hedge_min_delay_ms / 1000), settings.llm_hedge_max_delay_ms / 1000)
+
+
+class HedgeBudget:
+    """At most `per_minute` hedges in any sliding minute."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._sent: deque[float] = deque()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        while self._sent and now - self._sent[0] >= 60:
+            self._sent.popleft()
+        if len(self._sent) >= self.per_minute:
+            return False
+        self._sent.append(now)
+        return True
+
+
+_trackers: dict[str, LatencyTracker] = {}
+_budget: HedgeBudget | None = None
+_stats = {"requests": 0, "hedged": 0, "hedge_won": 0, "budget_exhausted": 0, "fallbacks": 0}
+
+
+def _tracker(kind: str) -> LatencyTracker:
+    tracker = _trackers.get(kind)
+    if tracker is None:
+        tracker = _trackers[kind] = LatencyTracker(settings.llm_hedge_window)
+    return tracker
+
+
+def _hedge_budget() -> HedgeBudget:
+    global _budget
+    if _budget is None:
+        _budget = HedgeBudget(settings.llm_hedges_per_minute)
+    return _budget
+
+
+class _Attempt:
+    """One request: its delta stream and the task waiting for its next delta."""
+
+    def __init__(self, model: str, stream: AsyncIterator[str]):
+        self.model = model
+        self.stream = stream
+        self.started = time.monotonic()
+        self.next = asyncio.ensure_future(stream.__anext__())
+
+    async def cancel(self):
+        self.next.cancel()
+        try:
+            await self.next
+        except BaseException:
+            pass
+        await self.stream.aclose()
+
+
+async def hedged(
+    kind: str, open_stream: Callable[[str], AsyncIterator[str]], hedge: bool | None = None,
+) -> AsyncIterator[str]:
+    """Yield the deltas of `open_stream(model)`, hedged as described above.
+
+    `kind` names the latency population the deadline is learned from ("stream" for
+    time to first token, "complete" for whole non-streamed responses). By default only
+    calls made for a lesson session are hedged; background work can wait.
+    """
+    primary_model = settings.gemini_model
+    fallback_model = settings.llm_fallback_model or primary_model
+    if hedge is None:
+        hedge = current_session() != BACKGROUND
+    if not (hedge and settings.llm_hedging):
+        async for delta in open_stream(primary_model):
+            yield delta
+        return
+
+    _stats["requests"] += 1
+    tracker = _tracker(kind)
+    deadline = tracker.deadline()
+    llm_hedge_deadline.set(deadline, kind=kind)
+    primary = _Attempt(primary_model, open_stream(primary_model))
+    attempts = [primary]
+    hedge_attempt: _Attempt | None = None
+    may_hedge = True
+    winner: _Attempt | None = None
+    try:
+        while winner is None:
+            timeout = max(0.0, primary.started + deadline - time.monotonic()) if may_hedge else None
+            done, _ = await asyncio.wait([a.next for a in attempts], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # The deadline passed without a first token
+                may_hedge = False
+                if _hedge_budget().take():
+                    _stats["hedged"] += 1
+                    logger.info(f"No first token from {primary_model} after {deadline:.2f}s, hedging to {fallback_model}")
+                    hedge_attempt = _Attempt(fallback_model, open_stream(fallback_model))
+                    attempts.append(hedge_attempt)
+                else:
+                    _stats["budget_exhausted"] += 1
+                    llm_hedges.inc(kind=kind, result="budget_exhausted")
+                continue
+            for attempt in [a for a in attempts if a.next in done]:
+                error = attempt.next.exception()
+                if error is None:
+                    winner = attempt
+                    break
+                attempts.remove(attempt)
+                await attempt.stream.aclose()
+                if isinstance(error, StopAsyncIteration) and not attempts:
+                    return  # an empty response
+                if isinstance(error, StopAsyncIteration) or attempts:
+                    continue  # the other request carries on
+                # An open circuit or full queue is the provider's, not the model's, so
+                # another model there would fare no better
+                retry_elsewhere = fallback_model != primary_model and not isinstance(error, UpstreamUnavailable)
+                if attempt is primary and may_hedge and retry_elsewhere:
+                    _stats["fallbacks"] += 1
+                    llm_fallbacks.inc(kind=kind)
+                    logger.warning(f"LLM request to {primary_model} failed ({error}), falling back to {fallback_model}")
+                    may_hedge = False
+                    attempts.append(_Attempt(fallback_model, open_stream(fallback_model)))
+                    continue
+                raise error
+
+        if winner is primary:
+            tracker.record(time.monotonic() - primary.started)
+            llm_hedges.inc(kind=kind, result="primary_won" if hedge_attempt else "not_hedged")
+        elif winner is hedge_attempt:
+            if primary in attempts:
+                # The primary's time to first token was at least this long; recording it
+                # rather than dropping it keeps the deadline from shrinking (and hedging
+                # from growing) because of the very outliers it hedged.
+                tracker.record(time.monotonic() - primary.started)
+            _stats["hedge_won"] += 1
+            llm_hedges.inc(kind=kind, result="hedge_won")
+        for attempt in attempts:
+            if attempt is not winner:
+                await attempt.cancel()
+        attempts = [winner]
+
+        yield winner.next.result()
+        async for delta in winner.stream:
+            yield delta
+    finally:
+        for attempt in attempts:
+            if attempt is not winner:
+                await attempt.cancel()
+        if winner is not None:
+            await winner.stream.aclose()
+
+
+def hedging_stats() -> dict:
+    return {
+        **_stats,
+        "deadline_seconds": {kind: round(t.deadline(), 3) for kind, t in _trackers.items()},
+        "hedges_last_minute": len(_budget._sent) if _budget is not None else 0,
+    }
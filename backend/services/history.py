@@ -0,0 +1,148 @@
+"""In-memory conversation history for a live lesson, so turns don't re-read the log."""
+
+import asyncio
+import logging
+
+from backend.config import settings
+from backend.database import (
+    read_db, write_db, flush_writes, get_conversation_history, get_section_summary, save_section_summary,
+)
+from backend.services.context import fit_history, message_tokens, split_point, estimate_tokens
+from backend.services.governor import BACKGROUND, set_session
+from backend.services.jobs import summarize
+from backend.services.metrics import context_summaries, current_trace, detach_trace, prompt_tokens, prompt_tokens_saved
+
+logger = logging.getLogger(__name__)
+
+
+def to_message(role: str, text: str) -> dict:
+    """Map a conversation_log role onto an LLM chat message."""
+    return {"role": "assistant" if role == "tutor" else "user", "content": text}
+
+
+async def load_history(session_id: str, section_index: int) -> list[dict]:
+    """Build LLM message history for a section from the conversation log."""
+    # Rows logged moments ago may still be in the write-behind queue
+    await flush_writes(session_id)
+    async with read_db(session_id) as db:
+        rows = await get_conversation_history(db, session_id, section_index)
+    return [to_message(row["role"], row["text"]) for row in rows]
+
+
+class ConversationHistory:
+    """Section history for one live session, loaded once and then appended to.
+
+    The conversation log stays the source of truth: this mirrors what the live loop
+    logs, and is rebuilt from storage only on connect/resume. Positions only move
+    forward, so a new section always starts empty.
+
+    `prompt_messages` keeps what is sent within the context budget. Once the history
+    nears the budget, the older turns are folded into a rolling summary by a background
+    job; the summary is stored with how many of the section's turns it covers, so a
+    resumed session picks it up again.
+    """
+
+    def __init__(self, session_id: str, language: str = "en", reserved_tokens: int = 0):
+        self.session_id = session_id
+        self.language = language
+        # Budget left for history once the system prompt and instruction are counted
+        self.budget = max(settings.context_budget_tokens - reserved_tokens, 200)
+        self.section_index: int | None = None
+        self._messages: list[dict] = []
+        self._costs: list[int] = []
+        self.summary: str | None = None
+        self.covered = 0
+        self._summarizing: asyncio.Task | None = None
+
+    async def load(self, section_index: int):
+        self.section_index = section_index
+        self._messages = await load_history(self.session_id, section_index)
+        self._costs = [message_tokens(m) for m in self._messages]
+        self.summary, self.covered = None, 0
+        if settings.context_compaction:
+            async with read_db(self.session_id) as db:
+                row = await get_section_summary(db, self.session_id, section_index)
+            if row is not None and row["covered"] <= len(self._messages):
+                self.summary, self.covered = row["summary"], row["covered"]
+
+    def messages(self, section_index: int) -> list[dict]:
+        """A snapshot of the history for `section_index`, resetting at a section boundary."""
+        self._enter(section_index)
+        return list(self._messages)
+
+    def is_empty(self, section_index: int) -> bool:
+        self._enter(section_index)
+        return not self._messages
+
+    def prompt_messages(self, section_index: int, traced: bool = True) -> list[dict]:
+        """The history to send for a turn in `section_index`, fitted to the context budget.
+
+        The token counts go on the current turn's trace unless `traced` is False (a
+        speculative next turn, fitted while this one is still being traced).
+        """
+        self._enter(section_index)
+        if not settings.context_compaction:
+            return list(self._messages)
+        messages, saved = fit_history(self._messages, self._costs, self.summary, self.covered, self.budget)
+        sent = sum(self._costs) - saved
+        prompt_tokens.inc(sent, language=self.language)
+        if saved:
+            prompt_tokens_saved.inc(saved, language=self.language)
+        trace = current_trace() if traced else None
+        if trace is not None:
+            trace.fields["prompt_history_tokens"] = sent
+            trace.fields["prompt_history_tokens_saved"] = saved
+        self._maybe_summarize()
+        return messages
+
+    def append(self, section_index: int, role: str, text: str):
+        self._enter(section_index)
+        message = to_message(role, text)
+        self._messages.append(message)
+        self._costs.append(message_tokens(message))
+
+    def close(self):
+        if self._summarizing is not None:
+            self._summarizing.cancel()
+            self._summarizing = None
+
+    def _enter(self, section_index: int):
+        if section_index != self.section_index:
+            self.section_index = section_index
+            self._messages, self._costs = [], []
+            self.summary, self.covered = None, 0
+
+    def _maybe_summarize(self):
+        """Start folding older turns into the summary once the history nears the budget."""
+        if self._summarizing is not None and not self._summarizing.done():
+            return
+        summary_cost = estimate_tokens(self.summary) if self.summary else 0
+        if summary_cost + sum(self._costs[self.covered:]) <= self.budget * settings.context_summarize_at:
+            return
+        split = split_point(self._costs, self.covered, int(self.budget * settings.context_recent_fraction))
+        if split <= self.covered:
+            return
+        self._summarizing = asyncio.create_task(self._summarize(
+            self.section_index, self.summary, self.covered, split, self._messages[self.covered:split],
+        ))
+
+    async def _summarize(self, section_index: int, previous: str | None, covered: int, split: int, turns: list[dict]):
+        detach_trace()  # background work is not part of the turn that started it
+        set_session(BACKGROUND)  # nor of its session: summaries share the lower-weight background queue
+        try:
+            summary = await summarize(previous, turns, settings.context_summary_max_tokens)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            context_summaries.inc(result="error")
+            logger.warning(f"Summarizing section {section_index} of session {self.session_id} failed: {e}")
+            return
+        if not summary:
+            context_summaries.inc(result="empty")
+            return
+        async with write_db(self.session_id) as db:
+            await save_section_summary(db, self.session_id, section_index, split, summary)
+        # Only adopt it if the section (and the summary it extends) are still current
+        if self.section_index == section_index and self.covered == covered:
+            self.summary, self.covered = summary, split
+        context_summaries.inc(result="ok")
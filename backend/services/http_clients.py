@@ -0,0 +1,135 @@
+"""Long-lived, pooled HTTP clients for the upstream providers (OpenRouter, Sarvam).
+
+One `httpx.AsyncClient` per provider is opened in the app lifespan and reused by
+every request, so tutor turns ride on warm keep-alive connections instead of
+paying a TCP + TLS handshake each time.
+"""
+
+import logging
+import httpx
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER = "openrouter"
+SARVAM = "sarvam"
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_saturated_acquires: dict[str, int] = {OPENROUTER: 0, SARVAM: 0}
+
+
+def _provider_config(provider: str) -> dict:
+    if provider == OPENROUTER:
+        return {
+            "timeout": settings.openrouter_timeout,
+            "http2": settings.openrouter_http2,
+            "max_connections": settings.openrouter_max_connections,
+        }
+    if provider == SARVAM:
+        return {
+            "timeout": settings.sarvam_timeout,
+            "http2": settings.sarvam_http2,
+            "max_connections": settings.sarvam_max_connections,
+        }
+    raise ValueError(f"Unknown upstream provider: {provider}")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client(provider: str) -> httpx.AsyncClient:
+    config = _provider_config(provider)
+    http2 = config["http2"]
+    if http2 and not _http2_available():
+        logger.warning(f"HTTP/2 requested for {provider} but 'h2' is not installed; using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=config["max_connections"],
+        max_keepalive_connections=settings.upstream_max_keepalive_connections,
+        keepalive_expiry=settings.upstream_keepalive_expiry,
+    )
+    timeout = httpx.Timeout(
+        config["timeout"],
+        connect=settings.upstream_connect_timeout,
+        pool=settings.upstream_pool_timeout,
+    )
+    client = httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+    client.event_hooks = {"request": [_count_saturated_acquire(provider, client)]}
+    return client
+
+
+def _count_saturated_acquire(provider: str, client: httpx.AsyncClient):
+    """A request hook counting requests sent while max_connections requests were already in flight.
+
+    An approximation of pool waits. It is exact over HTTP/1.1, where each in-flight request
+    holds or queues for a connection of its own, but over-counts over HTTP/2, where one
+    connection carries many requests at once. httpx runs request hooks right before it
+    hands the request to the pool, so the pool is seen as the request finds it.
+    """
+    max_connections = _provider_config(provider)["max_connections"]
+
+    async def hook(request: httpx.Request):
+        pool = _connection_pool(client)
+        if pool is not None and len(getattr(pool, "_requests", [])) >= max_connections:
+            _saturated_acquires[provider] += 1
+
+    return hook
+
+
+async def init_clients():
+    """Open one pooled client per provider. Called from the app lifespan."""
+    for provider in (OPENROUTER, SARVAM):
+        if provider not in _clients:
+            _clients[provider] = _build_client(provider)
+
+
+async def close_clients():
+    """Close all pooled clients, draining their keep-alive connections."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    """Return the shared client for a provider, creating it lazily outside the lifespan (scripts)."""
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = _build_client(provider)
+        _clients[provider] = client
+    return client
+
+
+def _connection_pool(client: httpx.AsyncClient):
+    # httpx keeps the httpcore pool on its default transport; it is not public API.
+    transport = getattr(client, "_transport", None)
+    return getattr(transport, "_pool", None)
+
+
+def pool_stats() -> dict:
+    """Connection-pool occupancy per provider, for sizing the limits."""
+    stats = {}
+    for provider in (OPENROUTER, SARVAM):
+        client = _clients.get(provider)
+        pool = _connection_pool(client) if client is not None else None
+        if pool is None:
+            stats[provider] = {"open": False, "saturated_acquires": _saturated_acquires[provider]}
+            continue
+        connections = pool.connections
+        idle = sum(1 for c in connections if c.is_idle())
+        stats[provider] = {
+            "open": True,
+            "connections": len(connections),
+            "in_use": len(connections) - idle,
+            "idle": idle,
+            "queued_requests": sum(1 for r in getattr(pool, "_requests", []) if r.is_queued()),
+            "saturated_acquires": _saturated_acquires[provider],
+            "max_connections": _provider_config(provider)["max_connections"],
+        }
+    return stats
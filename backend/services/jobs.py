@@ -0,0 +1,427 @@
+"""Job tier for the upstream work of a lesson: generating turns, synthesizing and transcribing.
+
+The WebSocket handlers submit jobs through the helpers at the bottom of this module and
+await the results. Where the jobs run is up to the configured broker:
+
+- "inline" (default) runs them on the calling event loop, exactly as before.
+- "process" runs them in a pool of worker processes, each with its own event loop and
+  pooled upstream clients, so base64 and JSON work on audio payloads stays off the
+  front-end loop. Set the front-end count with uvicorn's `--workers` and the worker count
+  per front end with JOB_WORKERS.
+- "package.module:Class" loads a custom `Broker` subclass, e.g. one backed by a shared
+  queue so front ends and workers can run on different hosts.
+"""
+
+import asyncio
+import importlib
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Any, AsyncIterator
+
+from backend.config import settings
+from backend.services.context import summarize_turns
+from backend.services.curriculum import Curriculum
+from backend.services.governor import current_session, set_session
+from backend.services.http_clients import init_clients, close_clients
+from backend.services.metrics import observe, timed, upstream_errors
+from backend.services.sarvam_stt import speech_to_text
+from backend.services.sarvam_tts import text_to_speech
+from backend.services.tutor_engine import generate_tutor_turn, generate_tutor_turn_stream
+
+logger = logging.getLogger(__name__)
+
+GENERATE_TURN = "generate_turn"
+SYNTHESIZE = "synthesize"
+TRANSCRIBE = "transcribe"
+SUMMARIZE = "summarize"
+
+HANDLERS = {
+    GENERATE_TURN: generate_tutor_turn,
+    SYNTHESIZE: text_to_speech,
+    TRANSCRIBE: speech_to_text,
+    SUMMARIZE: summarize_turns,
+}
+STREAM_HANDLERS = {
+    GENERATE_TURN: generate_tutor_turn_stream,
+}
+
+# Worker -> front-end message statuses
+_DELTA = "delta"
+_DONE = "done"
+_ERROR = "error"
+
+
+class JobError(Exception):
+    """A job failed in a worker; the message carries the original exception."""
+
+
+class Broker:
+    """Runs jobs and hands back their results. Subclass to plug in another transport."""
+
+    name = "base"
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def submit(self, kind: str, kwargs: dict) -> Any:
+        raise NotImplementedError
+
+    def stream(self, kind: str, kwargs: dict) -> AsyncIterator[Any]:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"broker": self.name}
+
+
+class InlineBroker(Broker):
+    """Runs jobs directly on the calling event loop."""
+
+    name = "inline"
+
+    async def submit(self, kind: str, kwargs: dict) -> Any:
+        return await HANDLERS[kind](**kwargs)
+
+    def stream(self, kind: str, kwargs: dict) -> AsyncIterator[Any]:
+        return STREAM_HANDLERS[kind](**kwargs)
+
+
+class ProcessPoolBroker(Broker):
+    """Runs jobs in worker processes fed from one shared request queue.
+
+    Each worker runs up to `concurrency` jobs at once and only takes a new request when it
+    has a free slot, so load spreads across workers by itself. A reader thread hands
+    results back to the event loop. A job the caller abandons (cancelled, e.g. on
+    barge-in, or timed out) is cancelled in its worker too, closing its upstream call, or
+    dropped by the worker that takes it if it was still queued; a worker that dies is
+    restarted and the jobs it held fail with a timeout.
+    """
+
+    name = "process"
+
+    def __init__(self, workers: int, concurrency: int, timeout: float):
+        self.workers = workers
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._requests = None
+        self._responses = None
+        self._procs: list = []
+        self._controls: list = []  # per worker: ids of jobs to cancel
+        self._pending: dict[int, asyncio.Queue] = {}
+        self._ids = itertools.count(1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reader: threading.Thread | None = None
+        self._monitor: asyncio.Task | None = None
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0, "restarts": 0}
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._controls = [self._ctx.Queue() for _ in range(self.workers)]
+        self._procs = [self._spawn(control) for control in self._controls]
+        self._reader = threading.Thread(target=self._read_responses, name="job-results", daemon=True)
+        self._reader.start()
+        self._monitor = asyncio.create_task(self._watch_workers())
+
+    async def close(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+        for _ in self._procs:
+            self._requests.put(None)
+        for proc in self._procs:
+            await asyncio.to_thread(proc.join, self.timeout)
+            if proc.is_alive():
+                proc.terminate()
+        for control in self._controls:
+            control.close()
+        self._responses.put(None)
+        await asyncio.to_thread(self._reader.join)
+        self._requests.close()
+        self._responses.close()
+        for queue in self._pending.values():
+            queue.put_nowait((_ERROR, "Job broker shut down"))
+
+    async def submit(self, kind: str, kwargs: dict) -> Any:
+        async for status, value in self._results(kind, kwargs, streamed=False):
+            if status == _DONE:
+                return value
+
+    async def stream(self, kind: str, kwargs: dict) -> AsyncIterator[Any]:
+        async for status, value in self._results(kind, kwargs, streamed=True):
+            if status == _DONE:
+                return
+            yield value
+
+    def stats(self) -> dict:
+        return {
+            "broker": self.name,
+            **self._stats,
+            "in_flight": len(self._pending),
+            "workers": len(self._procs),
+            "workers_alive": sum(1 for p in self._procs if p.is_alive()),
+        }
+
+    async def _results(self, kind: str, kwargs: dict, streamed: bool) -> AsyncIterator[tuple[str, Any]]:
+        job_id = next(self._ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._pending[job_id] = queue
+        self._stats["submitted"] += 1
+        finished = timed_out = False
+        try:
+            # The session travels with the job so the worker's governor queues it fairly
+            self._requests.put((job_id, kind, kwargs, streamed, current_session()))
+            while True:
+                try:
+                    status, value = await asyncio.wait_for(queue.get(), self.timeout)
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    self._stats["timed_out"] += 1
+                    raise JobError(f"{kind} job timed out after {self.timeout}s")
+                if status == _ERROR:
+                    finished = True
+                    self._stats["failed"] += 1
+                    raise JobError(value)
+                if status == _DONE:
+                    finished = True
+                    self._stats["completed"] += 1
+                yield status, value
+                if status == _DONE:
+                    return
+        finally:
+            self._pending.pop(job_id, None)
+            if not finished:
+                if not timed_out:
+                    self._stats["cancelled"] += 1
+                self._cancel(job_id)
+
+    def _cancel(self, job_id: int):
+        """Tell the workers to drop a job nobody is waiting for, running or still queued."""
+        for control in self._controls:
+            try:
+                control.put_nowait(job_id)
+            except (ValueError, OSError):
+                pass  # shutting down
+
+    def _spawn(self, control):
+        proc = self._ctx.Process(
+            target=_worker_main, args=(self._requests, self._responses, control, self.concurrency),
+            name="job-worker", daemon=True,
+        )
+        proc.start()
+        return proc
+
+    def _read_responses(self):
+        while True:
+            message = self._responses.get()
+            if message is None:
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _dispatch(self, message: tuple):
+        job_id, status, value = message
+        queue = self._pending.get(job_id)
+        if queue is not None:
+            queue.put_nowait((status, value))
+
+    async def _watch_workers(self):
+        while True:
+            await asyncio.sleep(1.0)
+            for i, proc in enumerate(self._procs):
+                if not proc.is_alive():
+                    logger.error(f"Job worker {proc.pid} exited with {proc.exitcode}, restarting")
+                    self._controls[i] = self._ctx.Queue()
+                    self._procs[i] = self._spawn(self._controls[i])
+                    self._stats["restarts"] += 1
+
+
+# --- worker process ---
+
+def _worker_main(requests, responses, control, concurrency: int):
+    asyncio.run(_serve(requests, responses, control, concurrency))
+
+
+async def _serve(requests, responses, control, concurrency: int):
+    await init_clients()
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    running: set[asyncio.Task] = set()
+    by_id: dict[int, asyncio.Task] = {}
+    # Cancelled jobs no worker had taken yet; whichever worker takes one drops it
+    cancelled: set[int] = set()
+
+    def cancel(job_id: int):
+        task = by_id.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            cancelled.add(job_id)
+
+    def read_control():
+        while True:
+            try:
+                job_id = control.get()
+            except (EOFError, OSError):
+                return
+            loop.call_soon_threadsafe(cancel, job_id)
+
+    threading.Thread(target=read_control, name="job-control", daemon=True).start()
+    try:
+        while True:
+            await slots.acquire()
+            request = await loop.run_in_executor(None, requests.get)
+            if request is None:
+                break
+            job_id = request[0]
+            abandoned = job_id in cancelled
+            # Ids are queued in order, so every id up to this one has been taken by some worker
+            cancelled.difference_update([i for i in cancelled if i <= job_id])
+            if abandoned:
+                slots.release()
+                continue
+            task = asyncio.create_task(_run_job(request, responses, slots))
+            running.add(task)
+            by_id[job_id] = task
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda _, job_id=job_id: by_id.pop(job_id, None))
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    finally:
+        await close_clients()
+
+
+async def _run_job(request: tuple, responses, slots: asyncio.Semaphore):
+    job_id, kind, kwargs, streamed, session = request
+    set_session(session)
+    try:
+        if streamed:
+            async for item in STREAM_HANDLERS[kind](**kwargs):
+                responses.put((job_id, _DELTA, item))
+            responses.put((job_id, _DONE, None))
+        else:
+            responses.put((job_id, _DONE, await HANDLERS[kind](**kwargs)))
+    except Exception as e:
+        responses.put((job_id, _ERROR, f"{type(e).__name__}: {e}"))
+    finally:
+        slots.release()
+
+
+# --- broker lifecycle ---
+
+_broker: Broker | None = None
+
+
+def _build_broker() -> Broker:
+    name = settings.job_broker
+    if name == "inline":
+        return InlineBroker()
+    if name == "process":
+        return ProcessPoolBroker(settings.job_workers, settings.job_worker_concurrency, settings.job_timeout_seconds)
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown job broker: {name}")
+    broker_cls = getattr(importlib.import_module(module_name), class_name)
+    return broker_cls()
+
+
+async def init_jobs():
+    """Start the configured broker. Called from the app lifespan."""
+    global _broker
+    if _broker is None:
+        broker = _build_broker()
+        await broker.start()
+        _broker = broker
+
+
+async def close_jobs():
+    global _broker
+    broker, _broker = _broker, None
+    if broker is not None:
+        await broker.close()
+
+
+def _get_broker() -> Broker:
+    """The running broker; outside the lifespan (scripts) jobs run inline."""
+    global _broker
+    if _broker is None:
+        _broker = InlineBroker()
+    return _broker
+
+
+def job_stats() -> dict:
+    return _get_broker().stats()
+
+
+# --- front-end helpers (timed as turn stages, upstream failures counted) ---
+
+async def generate_turn(
+    curriculum: Curriculum, section_index: int, step_index: int, language: str,
+    conversation_history: list[dict], learner_response: str | None = None,
+) -> str:
+    try:
+        with timed("llm_total"):
+            return await _get_broker().submit(GENERATE_TURN, {
+                "curriculum": curriculum, "section_index": section_index, "step_index": step_index,
+                "language": language, "conversation_history": conversation_history,
+                "learner_response": learner_response,
+            })
+    except Exception:
+        upstream_errors.inc(provider="openrouter", operation="llm")
+        raise
+
+
+async def generate_turn_stream(
+    curriculum: Curriculum, section_index: int, step_index: int, language: str,
+    conversation_history: list[dict], learner_response: str | None = None,
+) -> AsyncIterator[str]:
+    started = time.monotonic()
+    first = True
+    try:
+        async for delta in _get_broker().stream(GENERATE_TURN, {
+            "curriculum": curriculum, "section_index": section_index, "step_index": step_index,
+            "language": language, "conversation_history": conversation_history,
+            "learner_response": learner_response,
+        }):
+            if first:
+                first = False
+                observe("llm_first_token", time.monotonic() - started)
+            yield delta
+    except Exception:
+        upstream_errors.inc(provider="openrouter", operation="llm")
+        raise
+    observe("llm_total", time.monotonic() - started)
+
+
+async def synthesize(text: str, language: str = "en", pace: float = 1.25) -> bytes:
+    try:
+        with timed("tts"):
+            return await _get_broker().submit(SYNTHESIZE, {"text": text, "language": language, "pace": pace})
+    except Exception:
+        upstream_errors.inc(provider="sarvam", operation="tts")
+        raise
+
+
+async def transcribe(audio_bytes: bytes, language: str = "en") -> str:
+    """Callers time this as the `stt` stage (it may be the fallback of a streamed upload)."""
+    try:
+        return await _get_broker().submit(TRANSCRIBE, {"audio_bytes": audio_bytes, "language": language})
+    except Exception:
+        upstream_errors.inc(provider="sarvam", operation="stt")
+        raise
+
+
+async def summarize(previous: str | None, messages: list[dict], max_tokens: int = 250) -> str:
+    try:
+        with timed("summarize"):
+            return await _get_broker().submit(SUMMARIZE, {
+                "previous": previous, "messages": messages, "max_tokens": max_tokens,
+            })
+    except Exception:
+        upstream_errors.inc(provider="openrouter", operation="summarize")
+        raise
@@ -0,0 +1,92 @@
+"""Chunked learner audio upload: a bounded spool plus incremental forwarding to STT."""
+
+import asyncio
+import logging
+import tempfile
+import time
+from typing import AsyncIterator
+
+from backend.config import settings
+from backend.services.jobs import transcribe
+from backend.services.metrics import upstream_errors
+from backend.services.sarvam_stt import speech_to_text_stream
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLarge(Exception):
+    """The recording exceeded the per-session buffered byte cap."""
+
+
+class LearnerAudioUpload:
+    """One learner answer, received as `audio_chunk` frames and finalized by `audio_end`.
+
+    Chunks are written to a spooled temp file (memory up to `stt_spool_memory_bytes`,
+    then disk) so a long answer never sits in memory twice, and are also forwarded to a
+    streamed STT request as they arrive. If that request fails, `finish` falls back to
+    one buffered upload of the spooled audio.
+    """
+
+    def __init__(self, language: str, forward: bool | None = None):
+        self.language = language
+        self.started = time.monotonic()
+        self.size = 0
+        self.chunks = 0
+        self._spool = tempfile.SpooledTemporaryFile(max_size=settings.stt_spool_memory_bytes)
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=settings.stt_forward_queue_chunks)
+        if forward is None:
+            forward = settings.stt_stream_upload
+        self._stream: asyncio.Task | None = None
+        if forward:
+            self._stream = asyncio.create_task(speech_to_text_stream(self._drain(), language))
+
+    async def add(self, chunk: bytes):
+        if self.size + len(chunk) > settings.stt_max_upload_bytes:
+            raise UploadTooLarge(f"Recording exceeds {settings.stt_max_upload_bytes} bytes")
+        self._spool.write(chunk)
+        self.size += len(chunk)
+        self.chunks += 1
+        await self._forward(chunk)
+
+    async def finish(self) -> str:
+        """Close the stream and return the transcript."""
+        try:
+            if self._stream is not None:
+                await self._forward(None)
+                try:
+                    return await self._stream
+                except Exception as e:
+                    upstream_errors.inc(provider="sarvam", operation="stt")
+                    logger.warning(f"Streamed STT upload failed, retrying buffered: {e}")
+            self._spool.seek(0)
+            return await transcribe(self._spool.read(), self.language)
+        finally:
+            self.abort()
+
+    def abort(self):
+        """Drop the recording and cancel any in-flight upstream request."""
+        if self._stream is not None:
+            if not self._stream.done():
+                self._stream.cancel()
+            elif not self._stream.cancelled():
+                self._stream.exception()  # mark retrieved; failures were handled in finish
+        self._spool.close()
+
+    async def _forward(self, chunk: bytes | None):
+        """Queue a chunk for the upstream request, waiting if it is behind (backpressure).
+
+        Stops forwarding once the request has ended; the spool still has everything.
+        """
+        if self._stream is None or self._stream.done():
+            return
+        put = asyncio.ensure_future(self._queue.put(chunk))
+        done, _ = await asyncio.wait({put, self._stream}, return_when=asyncio.FIRST_COMPLETED)
+        if put not in done:
+            put.cancel()
+
+    async def _drain(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
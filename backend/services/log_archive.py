@@ -0,0 +1,118 @@
+"""Compressed segment files holding the conversation logs of archived sessions.
+
+A segment is written once, by one archival run (services/archiver.py), and never
+modified. It is JSONL, one object per log row, with each session's rows compressed as an
+independent gzip member or zstd frame. Concatenated members are still one valid .gz/.zst
+file (`zcat segment.jsonl.gz` shows everything), yet one session can be read by seeking
+to its block. Next to each segment, an index (`<segment>.idx.json`) maps session ids to
+their blocks. The catalog the server reads from is the archived_sessions table.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx.json"
+EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def codec() -> str:
+    """The configured codec: zstd when requested (or "auto") and installed, gzip otherwise."""
+    wanted = settings.archive_compression
+    if wanted in ("zstd", "auto") and _zstd_available():
+        return "zstd"
+    if wanted == "zstd":
+        logger.warning("Archive compression 'zstd' requested but 'zstandard' is not installed; using gzip")
+    return "gzip"
+
+
+def _compress(data: bytes, codec_name: str) -> bytes:
+    if codec_name == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=settings.archive_compression_level or 3).compress(data)
+    return gzip.compress(data, compresslevel=settings.archive_compression_level or 6, mtime=0)
+
+
+def _decompress(data: bytes, codec_name: str) -> bytes:
+    if codec_name == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _codec_of(segment: str) -> str:
+    for name, extension in EXTENSIONS.items():
+        if segment.endswith(extension):
+            return name
+    raise ValueError(f"Unknown archive segment type: {segment}")
+
+
+def write_segment(directory: str, sessions: dict[str, list[dict]]) -> tuple[str, dict[str, tuple[int, int, int]]]:
+    """Write the rows of `sessions` as a new segment and its index.
+
+    Returns the segment name and, per session, (byte offset, byte length, row count).
+    Both files are synced and renamed into place before returning, so a segment is
+    complete by the time the catalog points at it.
+    """
+    os.makedirs(directory, exist_ok=True)
+    codec_name = codec()
+    segment = f"seg-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}{EXTENSIONS[codec_name]}"
+    blocks: dict[str, tuple[int, int, int]] = {}
+    path = os.path.join(directory, segment)
+    with open(path + ".tmp", "wb") as f:
+        offset = 0
+        for session_id, rows in sessions.items():
+            raw = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+            block = _compress(raw, codec_name)
+            f.write(block)
+            blocks[session_id] = (offset, len(block), len(rows))
+            offset += len(block)
+        f.flush()
+        os.fsync(f.fileno())
+    index = {"segment": segment, "codec": codec_name, "sessions": {sid: list(b) for sid, b in blocks.items()}}
+    with open(path + INDEX_SUFFIX + ".tmp", "w") as f:
+        json.dump(index, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+    os.replace(path + INDEX_SUFFIX + ".tmp", path + INDEX_SUFFIX)
+    return segment, blocks
+
+
+def read_block(directory: str, segment: str, offset: int, length: int) -> list[dict]:
+    """One session's rows from a segment (blocking; call through asyncio.to_thread)."""
+    with open(os.path.join(directory, segment), "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    if len(data) != length:
+        raise ValueError(f"Archive segment {segment} is truncated at {offset}+{length}")
+    return [json.loads(line) for line in _decompress(data, _codec_of(segment)).splitlines() if line]
+
+
+def read_index(directory: str, segment: str) -> dict:
+    with open(os.path.join(directory, segment + INDEX_SUFFIX)) as f:
+        return json.load(f)
+
+
+def list_segments(directory: str) -> list[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if any(name.endswith(ext) for ext in EXTENSIONS.values())
+    )
@@ -0,0 +1,312 @@
+"""Turn latency instrumentation: Prometheus-format metrics and one trace record per turn.
+
+Stages are timed with `timed(stage)`; the module/language/step-type labels come from the
+turn trace active in the current context, so code deep in a turn (jobs, DB writes) can
+be timed without passing the trace around. Tasks started from a turn inherit its trace.
+"""
+
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger("backend.turns")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_str(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_label_str(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[tuple(str(labels.get(n, "")) for n in self.labelnames)] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[key] = series
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _label_str(self.labelnames, key, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_label_str(self.labelnames, key)} {_number(total[0])}"
+            yield f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}"
+
+
+REGISTRY: list[Counter | Histogram] = []
+
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_LABELS = ("stage", "module", "language", "step_type")
+TURN_LABELS = ("module", "language", "step_type")
+
+stage_seconds = _register(Histogram(
+    "tutor_stage_duration_seconds", "Time spent in each stage of a tutor turn.", STAGE_LABELS,
+))
+turn_seconds = _register(Histogram(
+    "tutor_turn_duration_seconds", "End-to-end time of a tutor turn.", TURN_LABELS,
+))
+upstream_errors = _register(Counter(
+    "tutor_upstream_errors_total", "Failed upstream calls.", ("provider", "operation"),
+))
+upstream_queue_wait = _register(Histogram(
+    "tutor_upstream_queue_wait_seconds", "Time upstream calls waited for the governor (saturation, not provider latency).",
+    ("provider",),
+))
+upstream_in_flight = _register(Gauge(
+    "tutor_upstream_in_flight", "Upstream calls in flight.", ("provider",),
+))
+upstream_queued = _register(Gauge(
+    "tutor_upstream_queued", "Upstream calls waiting for a governor slot.", ("provider",),
+))
+upstream_retries = _register(Counter(
+    "tutor_upstream_retries_total", "Upstream calls retried after a 429/5xx or transport error.", ("provider",),
+))
+upstream_rejected = _register(Counter(
+    "tutor_upstream_rejected_total", "Upstream calls refused without being sent.", ("provider", "reason"),
+))
+upstream_circuit_state = _register(Gauge(
+    "tutor_upstream_circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open).", ("provider",),
+))
+turn_cancel_seconds = _register(Histogram(
+    "tutor_turn_cancel_seconds", "Time from interrupting a turn (barge-in, skip, pause) until its work had stopped.",
+    ("reason",), buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+))
+active_sessions = _register(Gauge(
+    "tutor_active_sessions", "Open lesson WebSocket connections.",
+))
+db_queue_depth = _register(Gauge(
+    "tutor_db_write_queue_depth", "Writes waiting for the next group commit.",
+))
+prompt_tokens = _register(Counter(
+    "tutor_prompt_history_tokens_total", "Estimated conversation-history tokens sent to the LLM.", ("language",),
+))
+prompt_tokens_saved = _register(Counter(
+    "tutor_prompt_history_tokens_saved_total",
+    "Estimated history tokens left out of prompts (summarized or dropped).", ("language",),
+))
+variant_pool_lookups = _register(Counter(
+    "tutor_variant_pool_lookups_total", "Learner-independent turns, by whether the pool served them.", ("result",),
+))
+upstream_calls_avoided = _register(Counter(
+    "tutor_upstream_calls_avoided_total", "Upstream calls not made because a turn was served ready-made.",
+    ("operation",),
+))
+llm_hedges = _register(Counter(
+    "tutor_llm_hedges_total", "Hedge-eligible LLM requests, by outcome.", ("kind", "result"),
+))
+llm_fallbacks = _register(Counter(
+    "tutor_llm_fallbacks_total", "LLM requests retried on the fallback model after failing.", ("kind",),
+))
+llm_hedge_deadline = _register(Gauge(
+    "tutor_llm_hedge_deadline_seconds", "Current wait for a first token before an LLM request is hedged.", ("kind",),
+))
+archived_rows = _register(Counter(
+    "tutor_archived_log_rows_total", "Conversation log rows moved from the hot table to the archive.",
+))
+context_summaries = _register(Counter(
+    "tutor_context_summaries_total", "Background section summaries, by outcome.", ("result",),
+))
+
+
+# --- per-turn trace ---
+
+class TurnTrace:
+    """Timings of one tutor turn, emitted as a single structured record when it finishes."""
+
+    def __init__(self, session_id: str, module: str, language: str, section: int, step: int, step_type: str):
+        self.turn_id = uuid.uuid4().hex[:8]
+        self.session_id = session_id
+        self.module = module
+        self.language = language
+        self.section = section
+        self.step = step
+        self.step_type = step_type
+        self.started = time.monotonic()
+        self.stages: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.fields: dict = {}
+        self.error: str | None = None
+
+    def labels(self) -> dict:
+        return {"module": self.module, "language": self.language, "step_type": self.step_type}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    def mark(self, stage: str):
+        """Record the time from the start of the turn to now, once (e.g. first audio sent)."""
+        if stage not in self.stages:
+            elapsed = time.monotonic() - self.started
+            self.add(stage, elapsed)
+            stage_seconds.observe(elapsed, stage=stage, **self.labels())
+
+    def record(self) -> dict:
+        return {
+            "turn_id": self.turn_id,
+            "session_id": self.session_id,
+            "module": self.module,
+            "language": self.language,
+            "section": self.section,
+            "step": self.step,
+            "step_type": self.step_type,
+            "total": round(time.monotonic() - self.started, 4),
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "calls": self.calls,
+            **self.fields,
+            "error": self.error,
+            "ts": time.time(),
+        }
+
+
+_current: ContextVar[TurnTrace | None] = ContextVar("turn_trace", default=None)
+
+
+def start_turn(session_id: str, module: str, language: str, section: int, step: int, step_type: str) -> TurnTrace:
+    """Begin a turn trace and make it current for this task (and tasks it starts)."""
+    trace = TurnTrace(session_id, module, language, section, step, step_type)
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> TurnTrace | None:
+    return _current.get()
+
+
+def detach_trace():
+    """Stop attributing work in this task to the current turn (e.g. a speculative task)."""
+    _current.set(None)
+
+
+def finish_turn(trace: TurnTrace, error: str | None = None):
+    """Observe the turn's total time and emit its trace record."""
+    if _current.get() is trace:
+        _current.set(None)
+    if error is not None:
+        trace.error = error
+    record = trace.record()
+    turn_seconds.observe(record["total"], **trace.labels())
+    level = logging.WARNING if record["total"] >= settings.turn_trace_slow_seconds else logging.INFO
+    trace_logger.log(level, json.dumps(record))
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a block as `stage`, labelled by (and added to) the current turn trace."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - started
+        trace = _current.get()
+        if trace is not None:
+            trace.add(stage, elapsed)
+            stage_seconds.observe(elapsed, stage=stage, **trace.labels())
+        else:
+            stage_seconds.observe(elapsed, stage=stage)
+
+
+def observe(stage: str, seconds: float):
+    """Record a stage duration measured by the caller."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+        stage_seconds.observe(seconds, stage=stage, **trace.labels())
+    else:
+        stage_seconds.observe(seconds, stage=stage)
+
+
+def init_turn_trace():
+    """Also write turn records to TURN_TRACE_FILE (JSON lines), if configured."""
+    if settings.turn_trace_file and not any(
+        isinstance(h, logging.FileHandler) for h in trace_logger.handlers
+    ):
+        handler = logging.FileHandler(settings.turn_trace_file)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_logger.addHandler(handler)
+        trace_logger.setLevel(logging.INFO)
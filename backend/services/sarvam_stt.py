@@ -1,5 +1,8 @@
-import httpx
+import uuid
+from typing import AsyncIterator
 from backend.config import settings
+from backend.services.governor import get_governor
+from backend.services.http_clients import SARVAM, get_client
 
 
 LANGUAGE_CODE_MAP = {
@@ -7,25 +10,77 @@ LANGUAGE_CODE_MAP = {
     "hi": "hi-IN",
 }
 
+STT_MODEL = "saarika:v2.5"
+
 
 async def speech_to_text(audio_bytes: bytes, language: str = "en") -> str:
     """Convert speech to text using Sarvam AI. Accepts raw audio bytes (WAV/WebM)."""
     language_code = LANGUAGE_CODE_MAP.get(language, "en-IN")
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
+    client = get_client(SARVAM)
+    response = await get_governor(SARVAM).request(lambda: client.post(
+        f"{settings.sarvam_base_url}/speech-to-text",
+        headers={
+            "api-subscription-key": settings.sarvam_api_key,
+        },
+        files={
+            "file": ("audio.webm", audio_bytes, "audio/webm"),
+        },
+        data={
+            "language_code": language_code,
+            "model": STT_MODEL,
+        },
+    ))
+    response.raise_for_status()
+    data = response.json()
+    return data["transcript"]
+
+
+async def speech_to_text_stream(chunks: AsyncIterator[bytes], language: str = "en") -> str:
+    """Transcribe audio that is still being recorded.
+
+    The request starts with the first chunk and the body is sent with chunked transfer
+    encoding as chunks arrive, so the upload overlaps the learner speaking. If
+    `stt_streaming_url` is configured the raw audio is posted there; otherwise it goes to
+    the regular endpoint as a streamed multipart form.
+    """
+    language_code = LANGUAGE_CODE_MAP.get(language, "en-IN")
+    headers = {"api-subscription-key": settings.sarvam_api_key}
+
+    client = get_client(SARVAM)
+    # The body is consumed as it is sent, so this request cannot be retried
+    governor = get_governor(SARVAM)
+    if settings.stt_streaming_url:
+        headers["Content-Type"] = "audio/webm"
+        response = await governor.request(lambda: client.post(
+            settings.stt_streaming_url,
+            headers=headers,
+            params={"language_code": language_code, "model": STT_MODEL},
+            content=chunks,
+        ), retries=0)
+    else:
+        boundary = uuid.uuid4().hex
+        headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+        response = await governor.request(lambda: client.post(
             f"{settings.sarvam_base_url}/speech-to-text",
-            headers={
-                "api-subscription-key": settings.sarvam_api_key,
-            },
-            files={
-                "file": ("audio.webm", audio_bytes, "audio/webm"),
-            },
-            data={
-                "language_code": language_code,
-                "model": "saarika:v2.5",
-            },
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data["transcript"]
+            headers=headers,
+            content=_multipart_body(boundary, {"language_code": language_code, "model": STT_MODEL}, chunks),
+        ), retries=0)
+    response.raise_for_status()
+    data = response.json()
+    return data["transcript"]
+
+
+async def _multipart_body(boundary: str, fields: dict[str, str], chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """The same form `speech_to_text` sends, with the file part's content streamed."""
+    head = []
+    for name, value in fields.items():
+        head.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n')
+    head.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="audio.webm"\r\n'
+        f"Content-Type: audio/webm\r\n\r\n"
+    )
+    yield "".join(head).encode("utf-8")
+    async for chunk in chunks:
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
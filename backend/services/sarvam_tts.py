@@ -1,5 +1,8 @@
-import httpx
+import base64
 from backend.config import settings
+from backend.services.governor import get_governor
+from backend.services.http_clients import SARVAM, get_client
+from backend.services.tts_cache import cache_key, tts_cache
 
 
 LANGUAGE_CONFIG = {
@@ -7,26 +10,37 @@ LANGUAGE_CONFIG = {
     "hi": {"language_code": "hi-IN"},
 }
 
+TTS_MODEL = "bulbul:v2"
+TTS_SPEAKER = "anushka"
 
-async def text_to_speech(text: str, language: str = "en", pace: float = 1.25) -> str:
-    """Convert text to speech using Sarvam AI. Returns base64 encoded audio."""
+
+async def text_to_speech(text: str, language: str = "en", pace: float = 1.25) -> bytes:
+    """Convert text to speech using Sarvam AI. Returns raw WAV audio bytes."""
     config = LANGUAGE_CONFIG.get(language, LANGUAGE_CONFIG["en"])
+    if not settings.tts_cache_enabled:
+        return await _synthesize(text, config["language_code"], pace)
+
+    key = cache_key(text, config["language_code"], TTS_MODEL, TTS_SPEAKER, pace)
+    return await tts_cache.get_or_create(key, lambda: _synthesize(text, config["language_code"], pace))
+
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            f"{settings.sarvam_base_url}/text-to-speech",
-            headers={
-                "api-subscription-key": settings.sarvam_api_key,
-                "Content-Type": "application/json",
-            },
-            json={
-                "text": text,
-                "target_language_code": config["language_code"],
-                "model": "bulbul:v2",
-                "speaker": "anushka",
-                "pace": pace,
-            },
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data["audios"][0]
+async def _synthesize(text: str, language_code: str, pace: float) -> bytes:
+    client = get_client(SARVAM)
+    response = await get_governor(SARVAM).request(lambda: client.post(
+        f"{settings.sarvam_base_url}/text-to-speech",
+        headers={
+            "api-subscription-key": settings.sarvam_api_key,
+            "Content-Type": "application/json",
+        },
+        json={
+            "text": text,
+            "target_language_code": language_code,
+            "model": TTS_MODEL,
+            "speaker": TTS_SPEAKER,
+            "pace": pace,
+        },
+    ))
+    response.raise_for_status()
+    data = response.json()
+    # Sarvam returns base64; decode once here so everything downstream handles raw bytes
+    return base64.b64decode(data["audios"][0])
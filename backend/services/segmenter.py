@@ -0,0 +1,50 @@
+"""Incremental sentence/clause segmenter that turns streamed LLM deltas into TTS-sized chunks."""
+
+import re
+
+# Sentence ends: Latin terminators and the Devanagari danda, followed by whitespace.
+_SENTENCE_END = re.compile(r"[.!?।]+[\"'”’)]*\s+")
+# Clause breaks, only used once a pending chunk has grown long enough to be worth speaking.
+_CLAUSE_END = re.compile(r"[,;:—–]\s+")
+
+
+class SentenceSegmenter:
+    """Buffers text deltas and emits complete sentences (or long clauses) as soon as they close."""
+
+    def __init__(self, min_chars: int = 12, clause_chars: int = 80):
+        self.min_chars = min_chars
+        self.clause_chars = clause_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> list[str]:
+        """Add a delta and return any segments that are now complete."""
+        self._buffer += delta
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> str | None:
+        """Return whatever is left once the stream has ended."""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        return segment or None
+
+    def _find_cut(self) -> int | None:
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if match.start() + 1 >= self.min_chars:
+                return match.end()
+        if len(self._buffer) >= self.clause_chars:
+            last = None
+            for match in _CLAUSE_END.finditer(self._buffer):
+                if match.start() + 1 >= self.min_chars:
+                    last = match
+            if last is not None:
+                return last.end()
+        return None
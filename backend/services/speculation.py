@@ -0,0 +1,133 @@
+"""Speculative pre-generation of the next tutor turn while the current one is still playing."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable
+
+from backend.services.jobs import synthesize
+from backend.services.segmenter import SentenceSegmenter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SpeculationCost:
+    """Upstream work done by one speculative turn, recorded as it happens."""
+    llm_calls: int = 0
+    tts_calls: int = 0
+    tts_chars: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class SpeculativeTurn:
+    text: str
+    audio: list[bytes | None]  # one entry per segment; None where synthesis failed
+
+
+def split_segments(text: str) -> list[str]:
+    """The sentence segments a turn's text is synthesized in, as when it streams."""
+    segmenter = SentenceSegmenter()
+    segments = segmenter.feed(text)
+    tail = segmenter.flush()
+    if tail:
+        segments.append(tail)
+    return segments
+
+
+async def synthesize_segments(segments: list[str], language: str, pace: float) -> list[bytes | None]:
+    """Synthesize segments concurrently; None where synthesis failed."""
+    results = await asyncio.gather(
+        *(synthesize(seg, language, pace=pace) for seg in segments), return_exceptions=True
+    )
+    audio = []
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error(f"TTS error: {result}")
+            audio.append(None)
+        else:
+            audio.append(result)
+    return audio
+
+
+_stats = {
+    "started": 0,
+    "hits": 0,
+    "misses": 0,
+    "failed": 0,
+    "discarded": 0,
+    "wasted_llm_calls": 0,
+    "wasted_tts_calls": 0,
+    "wasted_tts_chars": 0,
+    "wasted_seconds": 0.0,
+}
+
+
+def speculation_stats() -> dict:
+    handovers = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "wasted_seconds": round(_stats["wasted_seconds"], 3),
+        "hit_rate": round(_stats["hits"] / handovers, 4) if handovers else 0.0,
+    }
+
+
+class TurnSpeculator:
+    """Holds at most one in-flight speculative turn for a live session.
+
+    The turn is keyed by whatever determines its output (position, pace); `take` hands it
+    over only on an exact key match, and anything else is discarded and costed as waste.
+    """
+
+    def __init__(self):
+        self._key: Hashable | None = None
+        self._task: asyncio.Task | None = None
+        self._cost: SpeculationCost | None = None
+
+    def start(self, key: Hashable, produce: Callable[[SpeculationCost], Awaitable[SpeculativeTurn]]):
+        self.discard()
+        self._key = key
+        self._cost = SpeculationCost()
+        self._task = asyncio.create_task(produce(self._cost))
+        _stats["started"] += 1
+
+    async def take(self, key: Hashable) -> SpeculativeTurn | None:
+        """Return the speculated turn for `key` (waiting if still running), or None on a miss."""
+        if self._task is None:
+            return None
+        if self._key != key:
+            self.discard()
+            _stats["misses"] += 1
+            return None
+
+        task = self._task
+        self._task, self._key, self._cost = None, None, None
+        try:
+            turn = await task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+            _stats["misses"] += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Speculative turn failed, generating live: {e}")
+            _stats["failed"] += 1
+            _stats["misses"] += 1
+            return None
+        _stats["hits"] += 1
+        return turn
+
+    def discard(self):
+        """Cancel any in-flight speculation and account for the work it already did."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        cost = self._cost
+        _stats["discarded"] += 1
+        _stats["wasted_llm_calls"] += cost.llm_calls
+        _stats["wasted_tts_calls"] += cost.tts_calls
+        _stats["wasted_tts_chars"] += cost.tts_chars
+        _stats["wasted_seconds"] += time.monotonic() - cost.started_at
+        self._task, self._key, self._cost = None, None, None
@@ -0,0 +1,230 @@
+"""Content-addressed cache for synthesized tutor audio: in-memory LRU over a shared on-disk tier."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+LEGACY_SUFFIX = ".b64"  # disk entries written before audio was stored as raw bytes
+PRUNE_EVERY_WRITES = 100
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "cache", "tts")
+
+
+def cache_key(text: str, language_code: str, model: str, speaker: str, pace: float) -> str:
+    """Hash every input that changes the synthesized audio."""
+    raw = "\x1f".join([text, language_code, model, speaker, f"{pace:.2f}"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Byte-bounded LRU in memory, backed by one file per key on disk.
+
+    The disk tier is shared by every worker process on the host: files are written to a
+    temp name and renamed into place, so readers never see a partial entry.
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: str | None, disk_bytes: int, ttl_seconds: float):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._size = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        # The first disk write prunes, so a process also clears what earlier ones left behind
+        self._disk_writes_since_prune = PRUNE_EVERY_WRITES - 1
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Return the cached audio for `key`, synthesizing it once if absent.
+
+        Concurrent misses on the same key share one upstream call.
+        """
+        audio = await self.get(key)
+        if audio is not None:
+            return audio
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                # The session that started the synthesis went away; take over the work
+                return await self.get_or_create(key, create)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            audio = await create()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not log "exception never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(audio)
+            await self.put(key, audio)
+            return audio
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            audio, stored_at = entry
+            if time.time() - stored_at <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return audio
+            self._drop(key)
+
+        if self.disk_dir:
+            found = await asyncio.to_thread(self._read_disk, key)
+            if found is not None:
+                audio, stored_at = found
+                self.disk_hits += 1
+                self._remember(key, audio, stored_at)
+                return audio
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes):
+        self._remember(key, audio, time.time())
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, audio)
+            except OSError as e:
+                logger.warning(f"TTS cache disk write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.memory_bytes,
+        }
+
+    # --- memory tier ---
+
+    def _remember(self, key: str, audio: bytes, stored_at: float):
+        size = len(audio)
+        if size > self.memory_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (audio, stored_at)
+        self._size += size
+        while self._size > self.memory_bytes:
+            _, (old_audio, _) = self._entries.popitem(last=False)
+            self._size -= len(old_audio)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        audio, _ = self._entries.pop(key)
+        self._size -= len(audio)
+
+    # --- disk tier (runs in a worker thread) ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.audio")
+
+    def _read_disk(self, key: str) -> tuple[bytes, float] | None:
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if time.time() - stored_at > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return f.read(), stored_at
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            # An unreadable entry is a miss; synthesizing again beats failing the turn
+            logger.warning(f"TTS cache disk read failed: {e}")
+            return None
+
+    def _write_disk(self, key: str, audio: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+
+        self._disk_writes_since_prune += 1
+        if self._disk_writes_since_prune >= PRUNE_EVERY_WRITES:
+            self._disk_writes_since_prune = 0
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Drop expired files, then the oldest ones until the tier fits its size cap.
+
+        Entries in the older base64 format (*.b64) are no longer read, so they go too.
+        """
+        files = []
+        total = 0
+        now = time.time()
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.endswith(LEGACY_SUFFIX):
+                    self._remove(path)
+                    continue
+                if not name.endswith(".audio"):
+                    continue
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if now - st.st_mtime > self.ttl_seconds:
+                    self._remove(path)
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        files.sort()
+        for _, size, path in files:
+            if total <= self.disk_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+            self.disk_evictions += 1
+        except FileNotFoundError:
+            pass
+
+
+tts_cache = TTSCache(
+    memory_bytes=settings.tts_cache_memory_bytes,
+    disk_dir=(settings.tts_cache_dir or DEFAULT_CACHE_DIR) if settings.tts_cache_disk else None,
+    disk_bytes=settings.tts_cache_disk_bytes,
+    ttl_seconds=settings.tts_cache_ttl_seconds,
+)
@@ -1,106 +1,106 @@
 """Tutor engine: state machine that drives the conversation through curriculum steps."""
 
-import json
-from pathlib import Path
-from backend.services.gemini import generate_tutor_response
+from typing import AsyncIterator
+from backend.services.curriculum import Curriculum, Section, Step, load_curriculum, render_system_prompt
+from backend.services.gemini import generate_tutor_response, generate_tutor_response_stream
 
-CURRICULUM_DIR = Path(__file__).parent.parent / "curriculum"
 
-_curriculum_cache: dict = {}
+def get_step(curriculum: Curriculum, section_index: int, step_index: int) -> Step | None:
+    return curriculum.step(section_index, step_index)
 
 
-def load_curriculum(module_id: str) -> dict:
-    if module_id not in _curriculum_cache:
-        path = CURRICULUM_DIR / f"{module_id}.json"
-        _curriculum_cache[module_id] = json.loads(path.read_text())
-    return _curriculum_cache[module_id]
+def get_section(curriculum: Curriculum, section_index: int) -> Section | None:
+    return curriculum.section(section_index)
 
 
-def get_step(curriculum: dict, section_index: int, step_index: int) -> dict | None:
-    sections = curriculum["sections"]
-    if section_index >= len(sections):
-        return None
-    section = sections[section_index]
-    if step_index >= len(section["steps"]):
-        return None
-    return section["steps"][step_index]
-
-
-def get_section(curriculum: dict, section_index: int) -> dict | None:
-    sections = curriculum["sections"]
-    if section_index >= len(sections):
-        return None
-    return sections[section_index]
-
-
-def is_last_step(curriculum: dict, section_index: int, step_index: int) -> bool:
-    section = get_section(curriculum, section_index)
+def is_last_step(curriculum: Curriculum, section_index: int, step_index: int) -> bool:
+    section = curriculum.section(section_index)
     if section is None:
         return True
-    return step_index >= len(section["steps"]) - 1
+    return step_index >= len(section.steps) - 1
 
 
-def is_last_section(curriculum: dict, section_index: int) -> bool:
-    return section_index >= len(curriculum["sections"]) - 1
+def is_last_section(curriculum: Curriculum, section_index: int) -> bool:
+    return section_index >= len(curriculum.sections) - 1
 
 
-def next_position(curriculum: dict, section_index: int, step_index: int) -> tuple[int, int]:
+def next_position(curriculum: Curriculum, section_index: int, step_index: int) -> tuple[int, int]:
     """Return the next (section_index, step_index), or same position if at end."""
-    section = get_section(curriculum, section_index)
-    if section is None:
-        return section_index, step_index
-
-    if step_index < len(section["steps"]) - 1:
-        return section_index, step_index + 1
-    elif section_index < len(curriculum["sections"]) - 1:
-        return section_index + 1, 0
-    else:
-        return section_index, step_index  # at the very end
+    return curriculum.next_position(section_index, step_index)
 
 
-def step_expects_response(step: dict) -> bool:
+def step_expects_response(step: Step) -> bool:
     """Whether this step type requires learner input before advancing."""
-    return step["type"] in ("teach_and_ask", "reflect", "scenario")
+    return step.expects_response
 
 
-def build_system_prompt(curriculum: dict, language: str) -> str:
-    lang_name = "Hindi" if language == "hi" else "English"
-    return f"""You are a warm, direct leadership tutor in a voice conversation.
+def build_system_prompt(curriculum: Curriculum, language: str) -> str:
+    prompt = curriculum.system_prompts.get(language)
+    return prompt if prompt is not None else render_system_prompt(curriculum.title, language)
 
-Rules:
-- Speak in {lang_name}. Maximum 1-2 sentences per turn. Never more than 2.
-- This is spoken aloud — be crisp, not wordy.
-- No bullet points, lists, or markdown. No filler praise like "Great question!"
-- Be specific when affirming. Be genuinely curious when asking.
-- Module: {curriculum['title']}"""
 
+END_OF_SESSION_TEXT = "Thank you for completing this session. Great work today!"
 
-async def generate_tutor_turn(
-    curriculum: dict,
+
+def build_turn_messages(
+    curriculum: Curriculum,
     section_index: int,
     step_index: int,
     language: str,
     conversation_history: list[dict],
     learner_response: str | None = None,
-) -> str:
-    """Generate the tutor's next spoken turn based on current curriculum position."""
+) -> tuple[str, list[dict]] | None:
+    """Build (system_prompt, messages) for a tutor turn, or None past the end of the module."""
     step = get_step(curriculum, section_index, step_index)
     if step is None:
-        return "Thank you for completing this session. Great work today!"
+        return None
 
     system_prompt = build_system_prompt(curriculum, language)
 
     # Choose the right guidance based on language
-    guidance_key = "prompt_guidance_hi" if language == "hi" else "prompt_guidance"
-    guidance = step.get(guidance_key, step.get("prompt_guidance", ""))
+    guidance = step.guidance(language)
 
     # If this is a feedback turn (learner just responded to a teach_and_ask/reflect/scenario)
-    if learner_response and "feedback_guidance" in step:
-        feedback_key = "feedback_guidance"
-        instruction = f"The learner just said: \"{learner_response}\"\n\nYour guidance for responding: {step[feedback_key]}"
+    if learner_response and step.feedback_guidance is not None:
+        instruction = f"The learner just said: \"{learner_response}\"\n\nYour guidance for responding: {step.feedback_guidance}"
     else:
         instruction = f"Your guidance for this turn: {guidance}"
 
     messages = conversation_history + [{"role": "user", "content": f"[TUTOR INSTRUCTION — not visible to learner]: {instruction}"}]
+    return system_prompt, messages
+
 
+async def generate_tutor_turn(
+    curriculum: Curriculum,
+    section_index: int,
+    step_index: int,
+    language: str,
+    conversation_history: list[dict],
+    learner_response: str | None = None,
+) -> str:
+    """Generate the tutor's next spoken turn based on current curriculum position."""
+    built = build_turn_messages(curriculum, section_index, step_index, language, conversation_history, learner_response)
+    if built is None:
+        return END_OF_SESSION_TEXT
+
+    system_prompt, messages = built
     return await generate_tutor_response(system_prompt, messages)
+
+
+async def generate_tutor_turn_stream(
+    curriculum: Curriculum,
+    section_index: int,
+    step_index: int,
+    language: str,
+    conversation_history: list[dict],
+    learner_response: str | None = None,
+) -> AsyncIterator[str]:
+    """Streaming variant of generate_tutor_turn, yielding text deltas as the LLM produces them."""
+    built = build_turn_messages(curriculum, section_index, step_index, language, conversation_history, learner_response)
+    if built is None:
+        yield END_OF_SESSION_TEXT
+        return
+
+    system_prompt, messages = built
+    async for delta in generate_tutor_response_stream(system_prompt, messages):
+        yield delta
@@ -0,0 +1,165 @@
+"""Pre-generated variants of the tutor turns that do not depend on the learner.
+
+The opening turn of a section is prompted with the same system prompt, guidance and
+(empty) history for everyone speaking a language, so instead of calling the LLM live for
+each learner, a few variants per (module, section, step, language) are generated up front
+with their audio and handed out in rotation. A background refiller keeps the pool full,
+regenerates it when a curriculum changes on disk and swaps the oldest variant for a fresh
+one every VARIANT_POOL_REFRESH_SECONDS so returning learners do not always hear the same
+words. Turns that depend on the learner are always generated live.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from backend.config import settings
+from backend.services.assets import asset_bundle
+from backend.services.curriculum import LANGUAGES, Curriculum, load_curriculum
+from backend.services.jobs import generate_turn
+from backend.services.metrics import upstream_calls_avoided, variant_pool_lookups
+from backend.services.speculation import SpeculativeTurn, split_segments, synthesize_segments
+
+logger = logging.getLogger(__name__)
+
+# How often the refiller looks for changed curricula and variants due for refresh
+CHECK_INTERVAL_SECONDS = 60.0
+
+
+@dataclass
+class Variant(SpeculativeTurn):
+    pace: float = 1.25
+    curriculum_mtime: float = 0.0  # the curriculum version it was generated from
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class VariantPool:
+    def __init__(self, size: int, pace: float):
+        self.size = size
+        self.pace = pace
+        self._variants: dict[tuple, list[Variant]] = {}
+        self._rotation: dict[tuple, int] = {}
+        self._refiller: asyncio.Task | None = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "generated": 0,
+            "generation_failed": 0,
+            "llm_calls_avoided": 0,
+            "tts_calls_avoided": 0,
+        }
+
+    def take(self, curriculum: Curriculum, section_index: int, step_index: int, language: str, pace: float) -> Variant | None:
+        """The next variant for this turn, or None if it must be generated live."""
+        if not settings.variant_pool or not curriculum.is_learner_independent(section_index, step_index):
+            return None
+        key = (curriculum.id, section_index, step_index, language)
+        variants = [v for v in self._variants.get(key, ()) if v.curriculum_mtime == curriculum.mtime]
+        if not variants:
+            self._stats["misses"] += 1
+            variant_pool_lookups.inc(result="miss")
+            return None
+        turn = self._rotation.get(key, 0)
+        self._rotation[key] = turn + 1
+        variant = variants[turn % len(variants)]
+
+        self._stats["hits"] += 1
+        self._stats["llm_calls_avoided"] += 1
+        variant_pool_lookups.inc(result="hit")
+        upstream_calls_avoided.inc(operation="llm")
+        if variant.pace == pace:
+            self._stats["tts_calls_avoided"] += len(variant.audio)
+            upstream_calls_avoided.inc(len(variant.audio), operation="tts")
+        return variant
+
+    def covers(self, curriculum: Curriculum, section_index: int, step_index: int, language: str) -> bool:
+        """Whether take() would serve this turn (so there is no need to speculate on it)."""
+        if not settings.variant_pool or not curriculum.is_learner_independent(section_index, step_index):
+            return False
+        key = (curriculum.id, section_index, step_index, language)
+        return any(v.curriculum_mtime == curriculum.mtime for v in self._variants.get(key, ()))
+
+    async def fill(self, curriculum: Curriculum, slots: asyncio.Semaphore):
+        """Top up every learner-independent turn of `curriculum` to `size` current variants."""
+        now = time.monotonic()
+        jobs = []
+        for flat in sorted(curriculum.learner_independent):
+            step = curriculum.steps[flat]
+            for language in LANGUAGES:
+                if asset_bundle.covers(curriculum, step.section_index, step.index, language):
+                    continue  # pre-rendered in the asset bundle
+                key = (curriculum.id, step.section_index, step.index, language)
+                variants = [v for v in self._variants.get(key, ()) if v.curriculum_mtime == curriculum.mtime]
+                if (
+                    settings.variant_pool_refresh_seconds > 0 and len(variants) >= self.size
+                    and now - variants[0].created_at >= settings.variant_pool_refresh_seconds
+                ):
+                    variants.pop(0)  # retire the oldest; a fresh one replaces it below
+                self._variants[key] = variants
+                jobs.extend(
+                    self._add(key, curriculum, step.section_index, step.index, language, slots)
+                    for _ in range(self.size - len(variants))
+                )
+        await asyncio.gather(*jobs)
+
+    async def _add(self, key: tuple, curriculum: Curriculum, section_index: int, step_index: int, language: str, slots: asyncio.Semaphore):
+        async with slots:
+            try:
+                text = (await generate_turn(curriculum, section_index, step_index, language, [])).strip()
+                audio = await synthesize_segments(split_segments(text), language, self.pace)
+            except Exception as e:
+                self._stats["generation_failed"] += 1
+                logger.warning(f"Variant for {key} failed: {e}")
+                return
+        if not text or None in audio:
+            self._stats["generation_failed"] += 1
+            return
+        variants = self._variants.setdefault(key, [])
+        if len(variants) < self.size:
+            variants.append(Variant(text=text, audio=audio, pace=self.pace, curriculum_mtime=curriculum.mtime))
+            self._stats["generated"] += 1
+
+    def start(self, module_ids: list[str]):
+        if self._refiller is None:
+            self._refiller = asyncio.create_task(self._refill(module_ids))
+
+    async def stop(self):
+        if self._refiller is not None:
+            self._refiller.cancel()
+            try:
+                await self._refiller
+            except asyncio.CancelledError:
+                pass
+            self._refiller = None
+
+    async def _refill(self, module_ids: list[str]):
+        slots = asyncio.Semaphore(settings.variant_pool_concurrency)
+        while True:
+            for module_id in module_ids:
+                try:
+                    await self.fill(load_curriculum(module_id), slots)
+                except Exception as e:
+                    logger.error(f"Refilling variants for {module_id} failed: {e}")
+            await asyncio.sleep(CHECK_INTERVAL_SECONDS)
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "variants": sum(len(v) for v in self._variants.values()),
+        }
+
+
+variant_pool = VariantPool(settings.variant_pool_size, settings.variant_pool_pace)
+
+
+async def init_variant_pool(module_ids: list[str]):
+    """Start filling the pool in the background; turns are generated live until it is ready."""
+    if settings.variant_pool:
+        variant_pool.start(module_ids)
+
+
+async def close_variant_pool():
+    await variant_pool.stop()
@@ -1,11 +1,14 @@
 import { useRef, useState, useCallback } from 'react'
 
+const CHUNK_MS = 250
+
 export default function useVoice() {
   const mediaRecorderRef = useRef(null)
   const chunksRef = useRef([])
   const [isRecording, setIsRecording] = useState(false)
 
-  const startRecording = useCallback(async () => {
+  // Chunks are emitted every CHUNK_MS while recording, so they can be uploaded as the learner speaks
+  const startRecording = useCallback(async (onChunk) => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true })
       const mediaRecorder = new MediaRecorder(stream, {
@@ -19,10 +22,11 @@ export default function useVoice() {
       mediaRecorder.ondataavailable = (e) => {
         if (e.data.size > 0) {
           chunksRef.current.push(e.data)
+          if (onChunk) onChunk(e.data)
         }
       }
 
-      mediaRecorder.start()
+      mediaRecorder.start(onChunk ? CHUNK_MS : undefined)
       setIsRecording(true)
     } catch (err) {
       console.error('Microphone access denied:', err)
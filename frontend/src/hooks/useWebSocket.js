@@ -1,5 +1,13 @@
 import { useRef, useState, useCallback, useEffect } from 'react'
 
+// Binary audio frames: 12-byte header (type, codec, flags, version, seq u32, turn u32) + audio
+const FRAME_HEADER_BYTES = 12
+const FRAME_TUTOR_AUDIO = 1
+const FRAME_LEARNER_AUDIO = 2
+const CODEC_WEBM_OPUS = 2
+const FRAME_VERSION = 1
+const FLAG_LAST = 0x01
+
 export default function useWebSocket(sessionId) {
   const wsRef = useRef(null)
   const [status, setStatus] = useState('connecting') // connecting, connected, listening, thinking, synthesizing, transcribing, disconnected
@@ -11,7 +19,9 @@ export default function useWebSocket(sessionId) {
   const [curriculumInfo, setCurriculumInfo] = useState(null)
   const [sectionProgress, setSectionProgress] = useState({})
   const audioQueueRef = useRef([])
+  const uploadRef = useRef({ chain: Promise.resolve(), seq: 0 })
   const isPlayingRef = useRef(false)
+  const currentAudioRef = useRef(null)
 
   const playNextAudio = useCallback(() => {
     if (audioQueueRef.current.length === 0) {
@@ -19,15 +29,37 @@ export default function useWebSocket(sessionId) {
       return
     }
     isPlayingRef.current = true
-    const audioB64 = audioQueueRef.current.shift()
-    const audio = new Audio(`data:audio/wav;base64,${audioB64}`)
-    audio.onended = () => playNextAudio()
-    audio.onerror = () => playNextAudio()
-    audio.play().catch(() => playNextAudio())
+    const src = audioQueueRef.current.shift()
+    const audio = new Audio(src)
+    currentAudioRef.current = audio
+    const next = () => {
+      if (src.startsWith('blob:')) URL.revokeObjectURL(src)
+      playNextAudio()
+    }
+    audio.onended = next
+    audio.onerror = next
+    audio.play().catch(next)
+  }, [])
+
+  // Drop everything queued or playing, e.g. when the learner interrupts the tutor
+  const stopAudio = useCallback(() => {
+    for (const src of audioQueueRef.current) {
+      if (src.startsWith('blob:')) URL.revokeObjectURL(src)
+    }
+    audioQueueRef.current = []
+    const audio = currentAudioRef.current
+    currentAudioRef.current = null
+    if (audio) {
+      audio.onended = null
+      audio.onerror = null
+      audio.pause()
+      if (audio.src.startsWith('blob:')) URL.revokeObjectURL(audio.src)
+    }
+    isPlayingRef.current = false
   }, [])
 
-  const queueAudio = useCallback((audioB64) => {
-    audioQueueRef.current.push(audioB64)
+  const queueAudio = useCallback((src) => {
+    audioQueueRef.current.push(src)
     if (!isPlayingRef.current) {
       playNextAudio()
     }
@@ -39,25 +71,53 @@ export default function useWebSocket(sessionId) {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
     const wsUrl = `${protocol}//${window.location.host}/ws/conversation/${sessionId}`
     const ws = new WebSocket(wsUrl)
+    ws.binaryType = 'arraybuffer'
     wsRef.current = ws
 
     ws.onopen = () => {
       setStatus('connected')
       // Send start message
-      ws.send(JSON.stringify({ type: 'start' }))
+      ws.send(JSON.stringify({ type: 'start', data: { stream_text: true, binary_audio: true, stream_audio: true, asset_audio: true } }))
       ws.send(JSON.stringify({ type: 'set_pace', data: { pace: initialPace } }))
     }
 
     ws.onmessage = (event) => {
+      if (event.data instanceof ArrayBuffer) {
+        const header = new DataView(event.data, 0, FRAME_HEADER_BYTES)
+        if (header.getUint8(0) === FRAME_TUTOR_AUDIO) {
+          const blob = new Blob([event.data.slice(FRAME_HEADER_BYTES)], { type: 'audio/wav' })
+          queueAudio(URL.createObjectURL(blob))
+        }
+        return
+      }
       const msg = JSON.parse(event.data)
       const { type, data } = msg
 
       switch (type) {
         case 'tutor_text':
-          setMessages(prev => [...prev, { role: 'tutor', text: data.text }])
+          setMessages(prev => {
+            // Streamed turns arrive as deltas, then a final message with the full text
+            const last = prev[prev.length - 1]
+            const sameTurn = data.turn_id && last && last.turnId === data.turn_id
+            if (data.delta !== undefined) {
+              if (sameTurn) {
+                return [...prev.slice(0, -1), { ...last, text: last.text + data.delta }]
+              }
+              return [...prev, { role: 'tutor', text: data.delta, turnId: data.turn_id }]
+            }
+            if (sameTurn) {
+              return [...prev.slice(0, -1), { ...last, text: data.text }]
+            }
+            return [...prev, { role: 'tutor', text: data.text, turnId: data.turn_id }]
+          })
           break
         case 'tutor_audio':
-          queueAudio(data.audio)
+          // Pre-rendered audio arrives as an immutable asset URL (browser-cached); the rest inline
+          queueAudio(data.url ? data.url : `data:audio/wav;base64,${data.audio}`)
+          break
+        case 'interrupted':
+          // The server cancelled the tutor's turn (learner spoke or skipped)
+          stopAudio()
           break
         case 'learner_text':
           setMessages(prev => [...prev, { role: 'learner', text: data.text }])
@@ -101,17 +161,47 @@ export default function useWebSocket(sessionId) {
       setError('Connection error')
       setStatus('disconnected')
     }
-  }, [sessionId, queueAudio])
+  }, [sessionId, queueAudio, stopAudio])
 
-  const sendAudio = useCallback((audioBlob) => {
+  // Learner audio goes up as framed chunks while recording; blob reads are chained to keep order
+  const sendFrame = useCallback((audioBlob, flags = 0) => {
     const ws = wsRef.current
     if (!ws || ws.readyState !== WebSocket.OPEN) return
-    // Send raw binary audio
-    audioBlob.arrayBuffer().then(buffer => {
-      ws.send(buffer)
+    const upload = uploadRef.current
+    const seq = upload.seq++
+    upload.chain = upload.chain.then(() => audioBlob.arrayBuffer()).then(buffer => {
+      if (ws.readyState !== WebSocket.OPEN) return
+      const frame = new Uint8Array(FRAME_HEADER_BYTES + buffer.byteLength)
+      const header = new DataView(frame.buffer, 0, FRAME_HEADER_BYTES)
+      header.setUint8(0, FRAME_LEARNER_AUDIO)
+      header.setUint8(1, CODEC_WEBM_OPUS)
+      header.setUint8(2, flags)
+      header.setUint8(3, FRAME_VERSION)
+      header.setUint32(4, seq)
+      frame.set(new Uint8Array(buffer), FRAME_HEADER_BYTES)
+      ws.send(frame)
+    })
+  }, [])
+
+  const sendAudioChunk = useCallback((audioBlob) => {
+    sendFrame(audioBlob)
+  }, [sendFrame])
+
+  const sendAudioEnd = useCallback(() => {
+    const ws = wsRef.current
+    const upload = uploadRef.current
+    upload.chain = upload.chain.then(() => {
+      if (ws && ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({ type: 'audio_end' }))
     })
+    upload.seq = 0
   }, [])
 
+  // Whole recording in one go (e.g. when chunked capture is unavailable)
+  const sendAudio = useCallback((audioBlob) => {
+    sendFrame(audioBlob, FLAG_LAST)
+    uploadRef.current.seq = 0
+  }, [sendFrame])
+
   const sendSkip = useCallback(() => {
     const ws = wsRef.current
     if (!ws || ws.readyState !== WebSocket.OPEN) return
@@ -145,6 +235,8 @@ export default function useWebSocket(sessionId) {
     connect,
     disconnect,
     sendAudio,
+    sendAudioChunk,
+    sendAudioEnd,
     sendSkip,
     sendPace,
     sendPause,
@@ -19,7 +19,7 @@ export default function Lesson() {
   const toast = useToast()
 
   const {
-    connect, disconnect, sendAudio, sendSkip, sendPace, sendPause,
+    connect, disconnect, sendAudioChunk, sendAudioEnd, sendSkip, sendPace, sendPause,
     status, messages, progress, error, moduleComplete, sectionComplete,
     curriculumInfo, sectionProgress,
   } = useWebSocket(sessionId)
@@ -57,18 +57,19 @@ export default function Lesson() {
 
   const handleMicStart = useCallback(async () => {
     try {
-      await startRecording()
+      await startRecording(sendAudioChunk)
     } catch {
       toast({ title: 'Microphone access denied', status: 'error' })
     }
-  }, [startRecording, toast])
+  }, [startRecording, sendAudioChunk, toast])
 
   const handleMicStop = useCallback(async () => {
+    // The final chunk is delivered by ondataavailable before onstop resolves
     const blob = await stopRecording()
     if (blob && blob.size > 0) {
-      sendAudio(blob)
+      sendAudioEnd()
     }
-  }, [stopRecording, sendAudio])
+  }, [stopRecording, sendAudioEnd])
 
   const isTutorBusy = ['thinking', 'synthesizing', 'transcribing'].includes(status)
   const canRecord = status === 'listening' && !isRecording
@@ -0,0 +1,68 @@
+"""Archive the conversation logs of finished sessions now, instead of waiting for the server.
+
+Runs the same job the server runs every ARCHIVE_INTERVAL_SECONDS (services/archiver.py)
+over every shard until nothing is due. Safe to run next to a live server.
+
+    python scripts/archive_logs.py
+    python scripts/archive_logs.py --idle-days 7 --grace-hours 1
+
+Databases created before incremental auto-vacuum was enabled keep their freed pages for
+reuse rather than shrinking; --enable-incremental-vacuum converts them. That rewrites
+each file with VACUUM, so run it with the server stopped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import settings  # noqa: E402
+from backend.database import close_pool, init_db, shard_paths  # noqa: E402
+from backend.services.archiver import archive_all, archiver_stats  # noqa: E402
+
+
+def enable_incremental_vacuum(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            print(f"{os.path.basename(path)}: already incremental")
+            return
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        print(f"{os.path.basename(path)}: converted to incremental auto-vacuum")
+    finally:
+        conn.close()
+
+
+async def run() -> dict:
+    await init_db()
+    try:
+        await archive_all()
+    finally:
+        await close_pool()
+    return archiver_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle-days", type=float, default=settings.archive_idle_days)
+    parser.add_argument("--grace-hours", type=float, default=settings.archive_completed_grace_hours)
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="convert existing database files first (server stopped)")
+    args = parser.parse_args()
+    settings.archive_idle_days = args.idle_days
+    settings.archive_completed_grace_hours = args.grace_hours
+
+    if args.enable_incremental_vacuum:
+        for path in shard_paths():
+            if os.path.exists(path):
+                enable_incremental_vacuum(path)
+    stats = asyncio.run(run())
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
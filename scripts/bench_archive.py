@@ -0,0 +1,154 @@
+"""Benchmark the hot conversation log as total history grows, with and without archival.
+
+Each round adds --sessions sessions of --rows log rows. Most of them completed days ago
+and the rest (--live-fraction) are still active. After every round the archive mode
+runs the archiver (services/archiver.py). The baseline leaves everything in the hot
+table. Both then record the hot row count, the live size of the database file, the size
+of the archive, and get_conversation_history latency for live sessions and, in the
+archive mode, for archived ones read back from segments.
+
+    python scripts/bench_archive.py --rounds 5 --sessions 4000 --dir /tmp/bench-archive
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import database  # noqa: E402
+from backend.config import settings  # noqa: E402
+from backend.database import close_pool, get_conversation_history, init_db, read_db  # noqa: E402
+from backend.services.archiver import archive_all  # noqa: E402
+
+SECTIONS = 5
+
+
+def populate(path: str, round_no: int, sessions: int, rows: int, live_fraction: float) -> list[str]:
+    """Add one round of sessions; returns the ids of the live ones."""
+    conn = sqlite3.connect(path)
+    ids = [f"r{round_no:02d}s{i:07d}" for i in range(sessions)]
+    live = set(random.sample(ids, max(1, int(sessions * live_fraction))))
+    conn.executemany(
+        "INSERT INTO sessions (id, module_id, language, status, updated_at) "
+        "VALUES (?, 'foundations-of-leadership', 'en', ?, datetime('now', ?))",
+        ((sid, "active" if sid in live else "completed", "-1 minutes" if sid in live else "-3 days") for sid in ids),
+    )
+
+    def log_rows():
+        # Interleaved across sessions, the way concurrent learners write them
+        for turn in range(rows):
+            section = turn * SECTIONS // rows
+            for sid in ids:
+                yield (sid, section, turn % 10, "tutor" if turn % 2 == 0 else "learner",
+                       "Leadership is about influence, not position. " * 2, "en")
+
+    conn.executemany(
+        "INSERT INTO conversation_log (session_id, section_index, step_index, role, text, language) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        log_rows(),
+    )
+    conn.commit()
+    conn.close()
+    return sorted(live)
+
+
+def sizes(path: str, archive: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        hot_rows = conn.execute("SELECT COUNT(*) FROM conversation_log").fetchone()[0]
+        total_sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    finally:
+        conn.close()
+    archive_bytes = sum(
+        os.path.getsize(os.path.join(archive, name)) for name in os.listdir(archive)
+    ) if os.path.isdir(archive) else 0
+    return {
+        "sessions": total_sessions,
+        "hot_rows": hot_rows,
+        "db_live_mib": round((pages - free) * page_size / 2**20, 2),
+        "db_file_mib": round(pages * page_size / 2**20, 2),
+        "archive_mib": round(archive_bytes / 2**20, 2),
+    }
+
+
+async def latency(session_ids: list[str], samples: int) -> dict:
+    timings = []
+    for _ in range(samples):
+        sid = random.choice(session_ids)
+        started = time.perf_counter()
+        async with read_db(sid) as db:
+            await get_conversation_history(db, sid, random.randrange(SECTIONS))
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+async def run_mode(directory: str, archive: bool, args) -> list[dict]:
+    path = os.path.join(directory, f"{'archive' if archive else 'baseline'}.db")
+    database.DB_PATH = path
+    settings.archive_dir = os.path.join(directory, f"{'archive' if archive else 'baseline'}-segments")
+    settings.archive_completed_grace_hours = 24
+    random.seed(args.seed)
+    await init_db()
+    results = []
+    archived_ids: list[str] = []
+    try:
+        for round_no in range(args.rounds):
+            live = populate(path, round_no, args.sessions, args.rows, args.live_fraction)
+            archive_seconds = None
+            if archive:
+                started = time.perf_counter()
+                await archive_all()
+                archive_seconds = round(time.perf_counter() - started, 2)
+                archived_ids = [f"r{round_no:02d}s{i:07d}" for i in range(args.sessions) if f"r{round_no:02d}s{i:07d}" not in live]
+            result = {
+                "round": round_no + 1,
+                **sizes(path, settings.archive_dir),
+                "live_history": await latency(live, args.samples),
+            }
+            if archive:
+                result["archive_seconds"] = archive_seconds
+                result["archived_history"] = await latency(archived_ids, args.samples)
+            results.append(result)
+            print(json.dumps({"mode": "archive" if archive else "baseline", **result}), file=sys.stderr)
+    finally:
+        await close_pool()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=4000, help="sessions added per round")
+    parser.add_argument("--rows", type=int, default=50, help="log rows per session")
+    parser.add_argument("--live-fraction", type=float, default=0.05)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dir", default="bench_archive")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.dir, ignore_errors=True)
+    os.makedirs(args.dir)
+    report = {
+        "config": vars(args),
+        "baseline": asyncio.run(run_mode(args.dir, False, args)),
+        "archive": asyncio.run(run_mode(args.dir, True, args)),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark the hot conversation/session queries before and after the index migrations.
+
+Builds a synthetic database (10M conversation_log rows by default), measures the
+queries behind get_conversation_history and list_sessions with only the initial
+schema, then applies the remaining migrations and measures again.
+
+    python scripts/bench_history_query.py --rows 10000000 --db /tmp/bench.db
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import list_migrations
+
+ROWS_PER_SECTION = 10
+SECTIONS = 5
+HISTORY_SQL = "SELECT role, text FROM conversation_log WHERE session_id = ? AND section_index = ? ORDER BY id"
+LIST_SQL = "SELECT * FROM sessions WHERE status IN ('active', 'paused') ORDER BY updated_at DESC"
+STATUS_PAGE_SQL = "SELECT * FROM sessions WHERE status = ? ORDER BY updated_at DESC LIMIT 50"
+
+
+def apply_migrations(conn: sqlite3.Connection, up_to: int | None = None, after: int = 0):
+    for version, _, path in list_migrations():
+        if version <= after or (up_to is not None and version > up_to):
+            continue
+        conn.executescript(path.read_text())
+    conn.commit()
+
+
+def populate(conn: sqlite3.Connection, rows: int) -> int:
+    sessions = max(1, rows // (ROWS_PER_SECTION * SECTIONS))
+    statuses = ["completed"] * 8 + ["active", "paused"]
+    conn.executemany(
+        "INSERT INTO sessions (id, module_id, language, status, updated_at) "
+        "VALUES (?, 'foundations-of-leadership', 'en', ?, datetime('now', ?))",
+        ((f"s{i:09d}", random.choice(statuses), f"-{random.randint(0, 10_000_000)} seconds") for i in range(sessions)),
+    )
+
+    def log_rows():
+        # Interleave sessions the way concurrent learners do, so one session's rows are scattered
+        written = 0
+        while written < rows:
+            for turn in range(ROWS_PER_SECTION * SECTIONS):
+                for s in range(sessions):
+                    if written >= rows:
+                        return
+                    section = turn // ROWS_PER_SECTION
+                    role = "tutor" if turn % 2 == 0 else "learner"
+                    yield (f"s{s:09d}", section, turn % ROWS_PER_SECTION, role,
+                           "Leadership is about influence, not position. " * 2, "en")
+                    written += 1
+
+    conn.executemany(
+        "INSERT INTO conversation_log (session_id, section_index, step_index, role, text, language) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        log_rows(),
+    )
+    conn.commit()
+    return sessions
+
+
+def measure(conn: sqlite3.Connection, sessions: int, samples: int) -> dict:
+    results = {}
+    for name, sql, params in (
+        ("history", HISTORY_SQL, lambda: (f"s{random.randrange(sessions):09d}", random.randrange(SECTIONS))),
+        ("list_sessions", LIST_SQL, lambda: ()),
+        ("list_sessions_by_status", STATUS_PAGE_SQL, lambda: (random.choice(["active", "paused"]),)),
+    ):
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            conn.execute(sql, params()).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[name] = {
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+            "max_ms": round(timings[-1], 3),
+            "plan": [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params())],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--db", default="bench_history.db")
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    apply_migrations(conn, up_to=1)
+
+    started = time.perf_counter()
+    sessions = populate(conn, args.rows)
+    print(f"Populated {args.rows} log rows / {sessions} sessions in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    before = measure(conn, sessions, args.samples)
+    started = time.perf_counter()
+    apply_migrations(conn, after=1)
+    index_seconds = time.perf_counter() - started
+    conn.execute("ANALYZE")
+    after = measure(conn, sessions, args.samples)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "sessions": sessions,
+        "index_build_seconds": round(index_seconds, 2),
+        "before": before,
+        "after": after,
+    }, indent=2))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
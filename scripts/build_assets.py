@@ -0,0 +1,114 @@
+"""Build the curriculum asset bundle: pre-rendered text and audio for learner-independent turns.
+
+Walks every curriculum in backend/curriculum/ and, for each section-opening turn x
+language x supported pace, renders the tutor text (LLM) and its audio (TTS) into the
+content-hashed bundle the server serves from /api/assets. Rebuilds are incremental: a
+turn is re-rendered only when its guidance (or the system prompt) changed, and audio
+only for paces it does not have yet. Running servers pick up a rebuilt bundle within
+half a minute.
+
+    python scripts/build_assets.py
+    python scripts/build_assets.py --paces 1.0 1.25 --force
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import settings  # noqa: E402
+from backend.services.assets import (  # noqa: E402
+    AssetBundle, asset_dir, asset_hash, guidance_hash, pace_key, read_manifest, turn_key, write_bundle,
+)
+from backend.services.curriculum import CURRICULUM_DIR, LANGUAGES, load_curriculum  # noqa: E402
+from backend.services.http_clients import close_clients  # noqa: E402
+from backend.services.sarvam_tts import text_to_speech  # noqa: E402
+from backend.services.speculation import split_segments  # noqa: E402
+from backend.services.tutor_engine import generate_tutor_turn  # noqa: E402
+
+
+async def build(directory: str, paces: list[float], force: bool, concurrency: int) -> dict:
+    previous = (read_manifest(directory) or {}).get("turns", {}) if not force else {}
+    old_bundle = AssetBundle(directory)
+    old_bundle.load()
+    slots = asyncio.Semaphore(concurrency)
+    turns: dict[str, dict] = {}
+    blobs: dict[str, bytes] = {}
+    counts = {"turns": 0, "rendered": 0, "reused": 0, "audio_rendered": 0, "audio_reused": 0}
+
+    async def synthesize(text: str, language: str, pace: float) -> list[str]:
+        hashes = []
+        for segment in split_segments(text):
+            async with slots:
+                audio = await text_to_speech(segment, language, pace=pace)
+            digest = asset_hash(audio)
+            blobs[digest] = audio
+            hashes.append(digest)
+        return hashes
+
+    async def render(curriculum, step, language: str):
+        key = turn_key(curriculum.id, step.section_index, step.index, language)
+        digest = guidance_hash(curriculum, step, language)
+        entry = previous.get(key)
+        if entry is not None and entry["guidance_hash"] == digest:
+            counts["reused"] += 1
+            text, audio = entry["text"], {}
+            for pace in paces:
+                old = entry["audio"].get(pace_key(pace))
+                data = [old_bundle.blob(h) for h in old] if old is not None else None
+                if data is not None and None not in data:
+                    blobs.update(zip(old, data))
+                    audio[pace_key(pace)] = old
+                    counts["audio_reused"] += 1
+        else:
+            async with slots:
+                text = (await generate_tutor_turn(curriculum, step.section_index, step.index, language, [])).strip()
+            counts["rendered"] += 1
+            audio = {}
+        for pace in paces:
+            if pace_key(pace) not in audio:
+                audio[pace_key(pace)] = await synthesize(text, language, pace)
+                counts["audio_rendered"] += 1
+        turns[key] = {"guidance_hash": digest, "text": text, "audio": audio}
+        counts["turns"] += 1
+        print(f"  {key}: {text[:60]!r}")
+
+    jobs = []
+    for path in sorted(CURRICULUM_DIR.glob("*.json")):
+        curriculum = load_curriculum(path.stem)
+        for flat in sorted(curriculum.learner_independent):
+            for language in LANGUAGES:
+                jobs.append(render(curriculum, curriculum.steps[flat], language))
+    try:
+        await asyncio.gather(*jobs)
+    finally:
+        old_bundle.close()
+        await close_clients()
+
+    blob_file = write_bundle(directory, turns, blobs)
+    counts["blobs"] = len(blobs)
+    counts["bytes"] = sum(len(b) for b in blobs.values())
+    counts["blob_file"] = blob_file
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=asset_dir(), help="bundle directory (default: ASSET_BUNDLE_DIR)")
+    parser.add_argument("--paces", type=float, nargs="+", default=settings.asset_paces)
+    parser.add_argument("--force", action="store_true", help="re-render every turn")
+    parser.add_argument("--concurrency", type=int, default=4, help="upstream calls in flight")
+    args = parser.parse_args()
+
+    print(f"Building asset bundle in {args.out}")
+    counts = asyncio.run(build(args.out, args.paces, args.force, args.concurrency))
+    print(
+        f"{counts['turns']} turns ({counts['rendered']} rendered, {counts['reused']} unchanged), "
+        f"audio for {counts['audio_rendered']} turn-paces rendered and {counts['audio_reused']} reused, "
+        f"{counts['blobs']} blobs / {counts['bytes'] / 1024:.0f} KiB in {counts['blob_file']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Local stand-in for the Sarvam speech-to-text API, for testing chunked learner uploads.
+
+Serves the regular multipart endpoint and a raw streaming endpoint, reads each request
+body incrementally and logs when the first and last bytes arrived, so you can see that
+audio is forwarded while the learner is still speaking.
+
+    python scripts/fake_stt_server.py --port 8765 --delay 0.3
+    SARVAM_BASE_URL=http://127.0.0.1:8765 uvicorn backend.main:app
+    # or, for the raw streaming endpoint:
+    STT_STREAMING_URL=http://127.0.0.1:8765/speech-to-text/stream uvicorn backend.main:app
+
+Only speech-to-text is served; point TTS elsewhere or expect those calls to fail.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+
+logger = logging.getLogger("fake_stt")
+app = FastAPI()
+options = argparse.Namespace(delay=0.3, transcript="", fail=False)
+
+
+async def _read_body(request: Request) -> tuple[int, int, float, float]:
+    """Consume the body as it arrives; return (bytes, chunks, secs to first byte, secs to last)."""
+    started = time.monotonic()
+    first = last = 0.0
+    size = chunks = 0
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        now = time.monotonic() - started
+        if chunks == 0:
+            first = now
+        last = now
+        size += len(chunk)
+        chunks += 1
+    return size, chunks, first, last
+
+
+async def _respond(request: Request, kind: str) -> dict:
+    size, chunks, first, last = await _read_body(request)
+    logger.info(
+        f"{kind}: {size} bytes in {chunks} chunks, first byte +{first * 1000:.0f}ms, "
+        f"last byte +{last * 1000:.0f}ms, transfer-encoding={request.headers.get('transfer-encoding', '-')}"
+    )
+    await asyncio.sleep(options.delay)
+    if options.fail:
+        raise HTTPException(status_code=503, detail="fake outage")
+    return {"transcript": options.transcript or f"I heard {size} bytes of audio.", "request_id": None}
+
+
+@app.post("/speech-to-text")
+async def speech_to_text(request: Request):
+    return await _respond(request, "multipart")
+
+
+@app.post("/speech-to-text/stream")
+async def speech_to_text_stream(request: Request):
+    return await _respond(request, "stream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.3, help="seconds to 'transcribe' after the body ends")
+    parser.add_argument("--transcript", default="", help="fixed transcript to return")
+    parser.add_argument("--fail", action="store_true", help="answer every request with 503")
+    args = parser.parse_args()
+    options.delay, options.transcript, options.fail = args.delay, args.transcript, args.fail
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
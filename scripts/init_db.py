@@ -9,7 +9,9 @@ from backend.database import init_db
 
 
 async def main():
-    await init_db()
+    applied = await init_db()
+    for name in applied:
+        print(f"Applied migration {name}")
     print("Database initialized successfully.")
 
 
@@ -0,0 +1,395 @@
+"""Simulated voice learners for load testing a running backend.
+
+Each learner creates a session with POST /api/sessions, connects to
+/ws/conversation/{session_id}, sends `start`, and then for every turn either answers
+(audio streamed in real time as `audio_chunk` frames, or as one message), skips, or
+finally pauses. Latency is measured from the learner's action (start, end of answer,
+skip) to the first tutor audio and to the next `listening` status.
+
+    python scripts/loadtest/driver.py --base-url http://127.0.0.1:9000 --learners 200 \\
+        --server-pid 12345 --out report.json
+
+Use run.py to start the fake upstreams and the backend as well.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+import httpx
+from websockets.asyncio.client import connect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.audio_frames import pack_frame, LEARNER_AUDIO, CODEC_WEBM_OPUS  # noqa: E402
+
+REPORT_SCHEMA = 1
+
+
+@dataclass
+class LearnerConfig:
+    module_id: str = "foundations-of-leadership"
+    language: str = "en"
+    turns: int = 6                 # learner actions before pausing
+    skip_rate: float = 0.1
+    think_seconds: float = 1.0     # pause after `listening` before speaking
+    speak_seconds: float = 4.0
+    audio_bytes_per_second: int = 4000  # ~32 kbps opus
+    chunk_ms: int = 250
+    stream_audio: bool = True
+    binary_audio: bool = True
+    turn_timeout: float = 60.0
+
+
+class Recorder:
+    def __init__(self):
+        self.turns: dict[str, list[tuple[float | None, float]]] = {"open": [], "answer": [], "skip": []}
+        self.errors: Counter = Counter()
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def connected(self):
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def disconnected(self):
+        self.active -= 1
+
+
+class Turn:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.monotonic()
+        self.first_audio: float | None = None
+
+    def audio(self):
+        if self.first_audio is None:
+            self.first_audio = time.monotonic() - self.started
+
+    def finish(self, recorder: Recorder):
+        recorder.turns[self.kind].append((self.first_audio, time.monotonic() - self.started))
+
+
+async def _speak(ws, config: LearnerConfig):
+    """Send one answer, pacing chunks like a live recording."""
+    total = int(config.speak_seconds * config.audio_bytes_per_second)
+    if not config.stream_audio:
+        await asyncio.sleep(config.speak_seconds)
+        audio = random.randbytes(total)
+        if config.binary_audio:
+            await ws.send(pack_frame(LEARNER_AUDIO, CODEC_WEBM_OPUS, audio))
+        else:
+            await ws.send(json.dumps({"type": "audio", "data": {"audio": base64.b64encode(audio).decode()}}))
+        return
+    chunk_size = max(1, config.audio_bytes_per_second * config.chunk_ms // 1000)
+    seq = 0
+    for offset in range(0, total, chunk_size):
+        await asyncio.sleep(config.chunk_ms / 1000)
+        chunk = random.randbytes(min(chunk_size, total - offset))
+        await ws.send(pack_frame(LEARNER_AUDIO, CODEC_WEBM_OPUS, chunk, seq=seq))
+        seq += 1
+    await ws.send(json.dumps({"type": "audio_end"}))
+
+
+async def run_learner(http: httpx.AsyncClient, ws_base: str, config: LearnerConfig, recorder: Recorder):
+    recorder.started += 1
+    try:
+        response = await http.post("/api/sessions", json={"module_id": config.module_id, "language": config.language})
+        response.raise_for_status()
+        session_id = response.json()["id"]
+        async with connect(f"{ws_base}/ws/conversation/{session_id}", max_size=None, open_timeout=30) as ws:
+            recorder.connected()
+            try:
+                await _converse(ws, config, recorder)
+            finally:
+                recorder.disconnected()
+        recorder.completed += 1
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        recorder.failed += 1
+        recorder.errors[f"learner: {type(e).__name__}"] += 1
+
+
+async def _converse(ws, config: LearnerConfig, recorder: Recorder):
+    await ws.send(json.dumps({"type": "start", "data": {
+        "stream_text": False, "binary_audio": config.binary_audio, "stream_audio": config.stream_audio,
+    }}))
+    turn = Turn("open")
+    actions = 0
+    while True:
+        message = await asyncio.wait_for(ws.recv(), config.turn_timeout)
+        if isinstance(message, bytes):
+            turn.audio()
+            continue
+        msg = json.loads(message)
+        msg_type, data = msg.get("type"), msg.get("data") or {}
+        if msg_type == "tutor_audio":
+            turn.audio()
+        elif msg_type == "error":
+            recorder.errors[f"server: {data.get('message', '')[:60]}"] += 1
+        elif msg_type == "module_complete":
+            turn.finish(recorder)
+            return
+        elif msg_type == "status" and data.get("state") == "listening":
+            turn.finish(recorder)
+            if actions >= config.turns:
+                await ws.send(json.dumps({"type": "pause"}))
+                return
+            actions += 1
+            await asyncio.sleep(random.uniform(0.5, 1.5) * config.think_seconds)
+            if random.random() < config.skip_rate:
+                turn = Turn("skip")
+                await ws.send(json.dumps({"type": "skip"}))
+            else:
+                await _speak(ws, config)
+                turn = Turn("answer")
+
+
+# --- server resource sampling (Linux /proc) ---
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _process_tree(pid: int) -> list[int]:
+    """pid plus its descendants (job workers), from /proc."""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        tree.append(p)
+        stack.extend(children.get(p, []))
+    return tree
+
+
+def sample_process(pid: int) -> tuple[float, int]:
+    """(cpu seconds, RSS bytes) summed over the process tree."""
+    cpu = 0.0
+    rss = 0
+    for p in _process_tree(pid):
+        try:
+            with open(f"/proc/{p}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1]) * 1024
+                        break
+        except (OSError, IndexError, ValueError):
+            continue
+    return cpu, rss
+
+
+async def _scrape(http: httpx.AsyncClient) -> dict:
+    """Counters from the backend's own endpoints."""
+    stats = (await http.get("/api/stats")).json()
+    metrics = (await http.get("/api/metrics")).text
+    db_writes = sum(
+        float(value)
+        for value in re.findall(r'^tutor_stage_duration_seconds_count\{stage="db_write"[^}]*\} (\S+)$', metrics, re.M)
+    )
+    return {"db_writes": db_writes, "db_statements": stats.get("db_writes", {}).get("statements", 0)}
+
+
+# --- report ---
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        k = (len(ordered) - 1) * p
+        lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+    return {
+        "count": len(ordered),
+        "p50": round(pct(0.50), 4),
+        "p95": round(pct(0.95), 4),
+        "p99": round(pct(0.99), 4),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(
+    base_url: str, learners: int, spawn_rate: float, duration: float, config: LearnerConfig,
+    server_pid: int | None = None, upstream_profile: dict | None = None,
+) -> dict:
+    """Run the simulated learners and return the JSON report."""
+    ws_base = base_url.replace("http://", "ws://").replace("https://", "wss://")
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        before = await _scrape(http)
+        cpu_start, rss_start = sample_process(server_pid) if server_pid else (0.0, 0)
+        rss_peak = rss_start
+        rss_at_peak_sessions = rss_start
+
+        started = time.monotonic()
+        tasks = []
+
+        async def spawn():
+            for _ in range(learners):
+                tasks.append(asyncio.create_task(run_learner(http, ws_base, config, recorder)))
+                await asyncio.sleep(1 / spawn_rate)
+
+        spawner = asyncio.create_task(spawn())
+        while time.monotonic() - started < duration:
+            await asyncio.sleep(1.0)
+            if server_pid:
+                _, rss = sample_process(server_pid)
+                rss_peak = max(rss_peak, rss)
+                if recorder.active >= recorder.peak_active:
+                    rss_at_peak_sessions = rss
+            if spawner.done() and all(t.done() for t in tasks):
+                break
+        spawner.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.monotonic() - started
+
+        after = await _scrape(http)
+        cpu_end = sample_process(server_pid)[0] if server_pid else 0.0
+
+    turns = {}
+    for kind, samples in recorder.turns.items():
+        turns[kind] = {
+            "first_audio": percentiles([a for a, _ in samples if a is not None]),
+            "complete": percentiles([c for _, c in samples]),
+        }
+    all_turns = sum(len(s) for s in recorder.turns.values())
+    cores_used = (cpu_end - cpu_start) / elapsed if server_pid else None
+    db_writes = after["db_writes"] - before["db_writes"]
+    return {
+        "schema": REPORT_SCHEMA,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "host": platform.node(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "config": {
+            "learners": learners, "spawn_rate": spawn_rate, "duration": duration,
+            "learner": asdict(config), "upstream": upstream_profile or {},
+        },
+        "sessions": {
+            "started": recorder.started,
+            "completed": recorder.completed,
+            "failed": recorder.failed,
+            "peak_concurrent": recorder.peak_active,
+        },
+        "turns": turns,
+        "throughput": {
+            "elapsed_s": round(elapsed, 2),
+            "turns": all_turns,
+            "turns_per_second": round(all_turns / elapsed, 3) if elapsed else 0.0,
+        },
+        "server": {
+            "cpu_seconds": round(cpu_end - cpu_start, 2) if server_pid else None,
+            "cores_used": round(cores_used, 3) if cores_used is not None else None,
+            "sessions_per_core": (
+                round(recorder.peak_active / cores_used, 1) if cores_used else None
+            ),
+            "rss_start_mb": round(rss_start / 2**20, 1) if server_pid else None,
+            "rss_peak_mb": round(rss_peak / 2**20, 1) if server_pid else None,
+            "memory_per_session_kb": (
+                round((rss_at_peak_sessions - rss_start) / 1024 / recorder.peak_active, 1)
+                if server_pid and recorder.peak_active else None
+            ),
+            "db_writes": int(db_writes),
+            "db_writes_per_second": round(db_writes / elapsed, 2) if elapsed else 0.0,
+            "db_statements": after["db_statements"] - before["db_statements"],
+        },
+        "errors": dict(recorder.errors.most_common()),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    defaults = LearnerConfig()
+    parser.add_argument("--learners", type=int, default=100)
+    parser.add_argument("--spawn-rate", type=float, default=20.0, help="learners started per second")
+    parser.add_argument("--duration", type=float, default=300.0, help="stop after this many seconds")
+    parser.add_argument("--module-id", default=defaults.module_id)
+    parser.add_argument("--language", default=defaults.language)
+    parser.add_argument("--turns", type=int, default=defaults.turns)
+    parser.add_argument("--skip-rate", type=float, default=defaults.skip_rate)
+    parser.add_argument("--think-seconds", type=float, default=defaults.think_seconds)
+    parser.add_argument("--speak-seconds", type=float, default=defaults.speak_seconds)
+    parser.add_argument("--audio-bytes-per-second", type=int, default=defaults.audio_bytes_per_second)
+    parser.add_argument("--chunk-ms", type=int, default=defaults.chunk_ms)
+    parser.add_argument("--one-shot-audio", action="store_true", help="send each answer as one message")
+    parser.add_argument("--json-audio", action="store_true", help="base64 JSON instead of binary frames")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+
+
+def learner_config(args: argparse.Namespace) -> LearnerConfig:
+    return LearnerConfig(
+        module_id=args.module_id, language=args.language, turns=args.turns, skip_rate=args.skip_rate,
+        think_seconds=args.think_seconds, speak_seconds=args.speak_seconds,
+        audio_bytes_per_second=args.audio_bytes_per_second, chunk_ms=args.chunk_ms,
+        stream_audio=not args.one_shot_audio and not args.json_audio, binary_audio=not args.json_audio,
+    )
+
+
+def write_report(report: dict, out: str | None):
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if out:
+        with open(out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:9000")
+    parser.add_argument("--server-pid", type=int, help="backend PID, for CPU and memory figures")
+    parser.add_argument("--seed", type=int, default=None)
+    add_arguments(parser)
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    report = asyncio.run(run(
+        args.base_url, args.learners, args.spawn_rate, args.duration, learner_config(args), args.server_pid,
+    ))
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
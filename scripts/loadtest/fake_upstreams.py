@@ -0,0 +1,203 @@
+"""Local stand-ins for OpenRouter and Sarvam, for load testing without network access.
+
+One server answers every upstream endpoint the backend calls:
+
+    POST /chat/completions        (JSON, or SSE when "stream": true)
+    POST /text-to-speech
+    POST /speech-to-text          (multipart, buffered or chunked)
+    POST /speech-to-text/stream   (raw chunked audio)
+    GET  /_stats                  (request and error counts)
+
+Latencies are drawn from distributions given as `fixed:S`, `uniform:LO:HI` or
+`lognormal:MEDIAN:P95` (seconds). `--llm-spike-rate` adds a `--llm-spike` delay before
+the first token of that share of LLM requests, to exercise request hedging
+(`--llm-spike-model` limits the spikes to one model). Point the backend at it with
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:9100 SARVAM_BASE_URL=http://127.0.0.1:9100
+
+    python scripts/loadtest/fake_upstreams.py --port 9100 --llm-ttft lognormal:0.4:1.2
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "leader team trust listen feedback growth clarity purpose decision example moment people "
+    "goal change honest support challenge reflect practice habit courage respect vision action"
+).split()
+
+
+class Distribution:
+    """A latency distribution parsed from `fixed:S`, `uniform:LO:HI` or `lognormal:MEDIAN:P95`."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, *params = spec.split(":")
+        values = [float(p) for p in params]
+        if kind == "fixed" and len(values) == 1:
+            self._sample = lambda: values[0]
+        elif kind == "uniform" and len(values) == 2:
+            self._sample = lambda: random.uniform(values[0], values[1])
+        elif kind == "lognormal" and len(values) == 2:
+            median, p95 = values
+            mu = math.log(median)
+            sigma = max((math.log(p95) - mu) / 1.645, 1e-9)
+            self._sample = lambda: random.lognormvariate(mu, sigma)
+        else:
+            raise argparse.ArgumentTypeError(f"Bad distribution '{spec}'")
+
+    def sample(self) -> float:
+        return max(0.0, self._sample())
+
+
+app = FastAPI()
+options = argparse.Namespace()
+stats = {"llm": 0, "llm_stream": 0, "tts": 0, "tts_chars": 0, "stt": 0, "stt_bytes": 0, "errors": 0,
+         "llm_spikes": 0, "llm_by_model": {}}
+
+
+def _fail(service: str) -> JSONResponse | None:
+    if random.random() < getattr(options, f"{service}_error_rate"):
+        stats["errors"] += 1
+        return JSONResponse({"error": f"injected {service} failure"}, status_code=503)
+    return None
+
+
+def _turn_text() -> str:
+    """A reply of `llm_words` words in sentences of ~`sentence_words`; varied so TTS cache misses."""
+    words = [random.choice(WORDS) for _ in range(options.llm_words)]
+    sentences = []
+    for i in range(0, len(words), options.sentence_words):
+        chunk = words[i:i + options.sentence_words]
+        sentences.append(" ".join(chunk).capitalize() + ".")
+    return " ".join(sentences)
+
+
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "")
+    stats["llm_by_model"][model] = stats["llm_by_model"].get(model, 0) + 1
+    delay = options.llm_ttft.sample()
+    if random.random() < options.llm_spike_rate and options.llm_spike_model in ("", model):
+        stats["llm_spikes"] += 1
+        delay += options.llm_spike.sample()
+    await asyncio.sleep(delay)
+    failure = _fail("llm")
+    if failure is not None:
+        return failure
+    text = _turn_text()
+    if not body.get("stream"):
+        stats["llm"] += 1
+        await asyncio.sleep(sum(options.llm_token_interval.sample() for _ in range(options.llm_words)))
+        return {"choices": [{"message": {"content": text}}]}
+
+    stats["llm_stream"] += 1
+
+    async def events():
+        yield ": OPENROUTER PROCESSING\n\n"
+        for i, word in enumerate(text.split(" ")):
+            if i:
+                await asyncio.sleep(options.llm_token_interval.sample())
+            delta = word if i == 0 else " " + word
+            yield "data: " + json.dumps({"choices": [{"delta": {"content": delta}}]}) + "\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/text-to-speech")
+async def text_to_speech(request: Request):
+    body = await request.json()
+    await asyncio.sleep(options.tts_latency.sample())
+    failure = _fail("tts")
+    if failure is not None:
+        return failure
+    text = body.get("text", "")
+    stats["tts"] += 1
+    stats["tts_chars"] += len(text)
+    size = max(44, len(text) * options.tts_bytes_per_char)
+    audio = b"RIFF" + random.randbytes(size - 4)
+    return {"request_id": None, "audios": [base64.b64encode(audio).decode("ascii")]}
+
+
+async def _speech_to_text(request: Request):
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+    await asyncio.sleep(options.stt_latency.sample())
+    failure = _fail("stt")
+    if failure is not None:
+        return failure
+    stats["stt"] += 1
+    stats["stt_bytes"] += size
+    return {"request_id": None, "transcript": " ".join(random.choice(WORDS) for _ in range(12))}
+
+
+@app.post("/speech-to-text")
+async def speech_to_text(request: Request):
+    return await _speech_to_text(request)
+
+
+@app.post("/speech-to-text/stream")
+async def speech_to_text_stream(request: Request):
+    return await _speech_to_text(request)
+
+
+@app.get("/_stats")
+async def get_stats():
+    return {**stats, "uptime": round(time.monotonic() - options.started, 1)}
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--llm-ttft", type=Distribution, default=Distribution("lognormal:0.35:0.9"),
+                        help="time to first token")
+    parser.add_argument("--llm-token-interval", type=Distribution, default=Distribution("uniform:0.01:0.03"),
+                        help="gap between streamed words")
+    parser.add_argument("--llm-spike-rate", type=float, default=0.0,
+                        help="share of LLM requests delayed by --llm-spike before the first token")
+    parser.add_argument("--llm-spike", type=Distribution, default=Distribution("uniform:3:6"))
+    parser.add_argument("--llm-spike-model", default="", help="only spike requests for this model")
+    parser.add_argument("--llm-words", type=int, default=30, help="words per tutor turn")
+    parser.add_argument("--sentence-words", type=int, default=12)
+    parser.add_argument("--tts-latency", type=Distribution, default=Distribution("lognormal:0.25:0.6"))
+    parser.add_argument("--tts-bytes-per-char", type=int, default=2000, help="~16kHz 16-bit WAV at speaking pace")
+    parser.add_argument("--stt-latency", type=Distribution, default=Distribution("lognormal:0.3:0.8"))
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    parser.add_argument("--stt-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def describe(args: argparse.Namespace) -> dict:
+    """The upstream profile, for the run report."""
+    return {
+        key: value.spec if isinstance(value, Distribution) else value
+        for key, value in vars(args).items()
+        if key.startswith(("llm_", "tts_", "stt_", "sentence_")) or key == "seed"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    vars(options).update(vars(args))
+    options.started = time.monotonic()
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", backlog=4096)
+
+
+if __name__ == "__main__":
+    main()
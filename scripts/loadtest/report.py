@@ -0,0 +1,99 @@
+"""Summarize or compare load-test reports written by run.py / driver.py.
+
+    python scripts/loadtest/report.py show reports/baseline.json
+    python scripts/loadtest/report.py compare reports/baseline.json reports/candidate.json
+"""
+import argparse
+import json
+import sys
+
+# (label, path into the report, lower is better)
+KEY_FIGURES = [
+    ("open first audio p50", ("turns", "open", "first_audio", "p50"), True),
+    ("open first audio p95", ("turns", "open", "first_audio", "p95"), True),
+    ("answer first audio p50", ("turns", "answer", "first_audio", "p50"), True),
+    ("answer first audio p95", ("turns", "answer", "first_audio", "p95"), True),
+    ("answer first audio p99", ("turns", "answer", "first_audio", "p99"), True),
+    ("answer complete p95", ("turns", "answer", "complete", "p95"), True),
+    ("skip first audio p95", ("turns", "skip", "first_audio", "p95"), True),
+    ("turns/s", ("throughput", "turns_per_second"), False),
+    ("peak sessions", ("sessions", "peak_concurrent"), False),
+    ("failed sessions", ("sessions", "failed"), True),
+    ("cores used", ("server", "cores_used"), True),
+    ("sessions/core", ("server", "sessions_per_core"), False),
+    ("KB/session", ("server", "memory_per_session_kb"), True),
+    ("RSS peak MB", ("server", "rss_peak_mb"), True),
+    ("DB writes/s", ("server", "db_writes_per_second"), False),
+]
+
+
+def _get(report: dict, path: tuple[str, ...]):
+    value = report
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("schema") != 1:
+        sys.exit(f"{path}: unsupported report schema {report.get('schema')}")
+    return report
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}" if abs(value) < 100 else f"{value:.1f}"
+    return str(value)
+
+
+def show(path: str):
+    report = _load(path)
+    meta = report["meta"]
+    print(f"{path}: {meta['timestamp']} commit {meta.get('commit')} on {meta['host']} ({meta['cpu_count']} CPUs)")
+    print(f"  {report['config']['learners']} learners, {report['throughput']['elapsed_s']}s")
+    for label, key_path, _ in KEY_FIGURES:
+        print(f"  {label:<26} {_fmt(_get(report, key_path)):>12}")
+    if report.get("errors"):
+        print("  errors:")
+        for message, count in report["errors"].items():
+            print(f"    {count:>6}  {message}")
+
+
+def compare(base_path: str, new_path: str):
+    base, new = _load(base_path), _load(new_path)
+    print(f"{'':<26} {'base':>12} {'new':>12} {'change':>9}")
+    for label, key_path, lower_is_better in KEY_FIGURES:
+        a, b = _get(base, key_path), _get(new, key_path)
+        change = ""
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)) and a:
+            pct = (b - a) / abs(a) * 100
+            better = (pct < 0) == lower_is_better
+            change = f"{pct:+.1f}%{'' if abs(pct) < 1 else (' +' if better else ' -')}"
+        print(f"{label:<26} {_fmt(a):>12} {_fmt(b):>12} {change:>9}")
+    if base["config"] != new["config"]:
+        print("\nNote: the runs used different configurations; compare with care.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    show_parser = sub.add_parser("show")
+    show_parser.add_argument("report")
+    compare_parser = sub.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    args = parser.parse_args()
+    if args.command == "show":
+        show(args.report)
+    else:
+        compare(args.base, args.new)
+
+
+if __name__ == "__main__":
+    main()
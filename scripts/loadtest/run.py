@@ -0,0 +1,123 @@
+"""One-shot offline load test: fake upstreams + backend + simulated learners -> JSON report.
+
+    python scripts/loadtest/run.py --learners 500 --spawn-rate 25 --duration 180 \\
+        --out reports/baseline.json
+    python scripts/loadtest/report.py compare reports/baseline.json reports/candidate.json
+
+The backend runs in its own process with a scratch database and TTS cache, and talks to
+the fake upstreams over loopback. Backend settings can be varied through the usual
+environment variables (e.g. JOB_BROKER=process, DB_WRITE_MODE=group). Thousands of
+learners need a raised open-file limit (`ulimit -n 65536`).
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import driver  # noqa: E402
+import fake_upstreams  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} exited with {proc.returncode} during startup")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready in {timeout}s")
+
+
+def _upstream_args(args: argparse.Namespace) -> list[str]:
+    argv = []
+    for key, value in fake_upstreams.describe(args).items():
+        if value is None:
+            continue
+        argv += [f"--{key.replace('_', '-')}", str(value)]
+    return argv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    driver.add_arguments(parser)
+    fake_upstreams.add_arguments(parser)
+    parser.add_argument("--keep-data", action="store_true", help="keep the scratch DB and cache")
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    data_dir = tempfile.mkdtemp(prefix="loadtest-")
+    upstream_port, backend_port = _free_port(), _free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}"
+    backend_url = f"http://127.0.0.1:{backend_port}"
+    env = {
+        **os.environ,
+        "OPENROUTER_BASE_URL": upstream_url,
+        "SARVAM_BASE_URL": upstream_url,
+        "OPENROUTER_API_KEY": "loadtest",
+        "SARVAM_API_KEY": "loadtest",
+        "OPENROUTER_HTTP2": "false",
+    }
+
+    procs = []
+    try:
+        upstream = subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "fake_upstreams.py"), "--port", str(upstream_port)]
+            + _upstream_args(args),
+        )
+        procs.append(upstream)
+        _wait_ready(f"{upstream_url}/_stats", upstream)
+
+        backend = subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "serve.py"), "--port", str(backend_port), "--data-dir", data_dir],
+            env=env,
+        )
+        procs.append(backend)
+        _wait_ready(f"{backend_url}/api/health", backend)
+
+        report = asyncio.run(driver.run(
+            backend_url, args.learners, args.spawn_rate, args.duration, driver.learner_config(args),
+            server_pid=backend.pid, upstream_profile=fake_upstreams.describe(args),
+        ))
+        report["upstream_counts"] = httpx.get(f"{upstream_url}/_stats").json()
+        report["config"]["backend_env"] = {
+            k: v for k, v in os.environ.items()
+            if k.startswith(("JOB_", "DB_", "TTS_", "LLM_", "STT_", "SPECULATIVE_", "OPENROUTER_MAX", "SARVAM_MAX"))
+        }
+        driver.write_report(report, args.out)
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if not args.keep_data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+        else:
+            print(f"Scratch data kept in {data_dir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
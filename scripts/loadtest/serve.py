@@ -0,0 +1,33 @@
+"""Run the backend for a load test, with its database and TTS cache in a scratch directory.
+
+    python scripts/loadtest/serve.py --port 9000 --data-dir /tmp/loadtest
+
+Upstream URLs and other settings come from the environment as usual (see run.py).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--data-dir", required=True)
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    os.environ.setdefault("TTS_CACHE_DIR", os.path.join(args.data_dir, "tts"))
+
+    import uvicorn
+    import backend.database as database
+    database.DB_PATH = os.path.join(args.data_dir, "tutor.db")
+    from backend.main import app
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", backlog=4096, ws_max_size=16 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    main()
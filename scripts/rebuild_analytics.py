@@ -0,0 +1,37 @@
+"""Rebuild the analytics rollup tables from history.
+
+The server keeps the rollups current as sessions advance (services/analytics.py); this
+recomputes them from sessions, section_progress and the whole conversation log,
+archived segments included. Run it once on a database that has history from before the
+rollups existed, or to repair them. Counts added by live lessons while it reads a shard
+are overwritten, so stop the server first for exact figures.
+
+    python scripts/rebuild_analytics.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import close_pool, init_db  # noqa: E402
+from backend.services.analytics import rebuild_all  # noqa: E402
+
+
+async def run() -> list[dict]:
+    await init_db()
+    try:
+        return await rebuild_all()
+    finally:
+        await close_pool()
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Split the database into shards, or rebalance existing shards to a new count.
+
+Run with the server stopped. Reads the current layout (--from-shards, default 1 = the
+single tutor.db), writes a fresh set of --shards files next to it with every session,
+its progress rows and its conversation log routed by shard_index(session_id), checks the
+row counts, and leaves the source files untouched. Then start the server with
+DB_SHARDS=<shards>.
+
+    python scripts/split_db.py --shards 4
+    python scripts/split_db.py --from-shards 4 --shards 8
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import get_db, run_migrations, shard_index, shard_paths  # noqa: E402
+
+# Tables whose rows belong to a session, and the column holding its id
+SESSION_TABLES = [
+    ("sessions", "id"),
+    ("section_progress", "session_id"),
+    ("conversation_log", "session_id"),
+    ("section_summaries", "session_id"),
+    ("archived_sessions", "session_id"),  # the segments themselves are shared by all shards
+]
+
+
+async def _migrate(path: str):
+    db = await get_db(path)
+    try:
+        await run_migrations(db)
+    finally:
+        await db.close()
+
+
+def _copy_columns(conn: sqlite3.Connection, table: str, key: str) -> list[str]:
+    """Every column except a child table's own integer id, which the target reassigns."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA src.table_info({table})")]
+    if key != "id" and "id" in columns:
+        columns.remove("id")
+    return columns
+
+
+def _count(path: str, table: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def split(sources: list[str], targets: list[str]) -> dict[str, int]:
+    """Copy every source's rows into the target shard that owns each session."""
+    count = len(targets)
+    copied = {table: 0 for table, _ in SESSION_TABLES}
+    for index, target in enumerate(targets):
+        conn = sqlite3.connect(target)
+        conn.create_function("shard_of", 1, lambda sid: shard_index(sid, count), deterministic=True)
+        try:
+            for source in sources:
+                conn.execute("ATTACH DATABASE ? AS src", (source,))
+                with conn:
+                    for table, key in SESSION_TABLES:
+                        columns = ", ".join(_copy_columns(conn, table, key))
+                        # Ordered by source rowid so the log keeps its order under new ids
+                        cursor = conn.execute(
+                            f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM src.{table} "
+                            f"WHERE shard_of({key}) = ? ORDER BY rowid",
+                            (index,),
+                        )
+                        copied[table] += cursor.rowcount
+                conn.execute("DETACH DATABASE src")
+        finally:
+            conn.close()
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, required=True, help="target shard count")
+    parser.add_argument("--from-shards", type=int, default=1, help="current shard count")
+    parser.add_argument("--force", action="store_true", help="overwrite existing target files")
+    args = parser.parse_args()
+    if args.shards == args.from_shards:
+        sys.exit("Source and target shard counts are the same; nothing to do.")
+
+    sources = shard_paths(args.from_shards)
+    targets = shard_paths(args.shards)
+    missing = [p for p in sources if not os.path.exists(p)]
+    if missing:
+        sys.exit(f"Source database not found: {', '.join(missing)}")
+    existing = [p for p in targets if os.path.exists(p)]
+    if existing and not args.force:
+        sys.exit(f"Target files already exist (use --force to replace): {', '.join(existing)}")
+    for path in existing:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    for path in targets:
+        asyncio.run(_migrate(path))
+    copied = split(sources, targets)
+
+    # Every source row must have landed in exactly one target
+    ok = True
+    for table, _ in SESSION_TABLES:
+        expected = sum(_count(source, table) for source in sources)
+        print(f"{table}: {copied[table]} of {expected} rows copied")
+        ok = ok and copied[table] == expected
+    for path in targets:
+        print(f"  {os.path.basename(path)}: {_count(path, 'sessions')} sessions")
+    if not ok:
+        sys.exit("Row counts do not match; the source files were left as they were.")
+    print(f"Done. Start the server with DB_SHARDS={args.shards}; the source files were not modified.")
+    # Rollups aggregate many sessions, so they cannot be routed; recompute them per shard
+    print(f"Then rebuild the analytics rollups: DB_SHARDS={args.shards} python scripts/rebuild_analytics.py")
+
+
+if __name__ == "__main__":
+    main()
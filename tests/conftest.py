@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from backend import database
+from backend.config import settings
+
+
+@pytest.fixture
+def tutor_db(tmp_path, monkeypatch):
+    """A fresh single-shard database and archive under tmp_path, written directly."""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "tutor.db"))
+    monkeypatch.setattr(settings, "db_shards", 1)
+    monkeypatch.setattr(settings, "db_write_mode", "direct")
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+    asyncio.run(database.init_db())
+    return tmp_path
+
+
+def run(coro):
+    """Run a test coroutine, closing the shard pools it opened on the same loop."""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await database.close_pool()
+
+    return asyncio.run(main())
@@ -0,0 +1,44 @@
+import asyncio
+import queue
+
+import pytest
+
+from backend.services import jobs
+
+
+def test_worker_drops_a_job_cancelled_while_still_queued(monkeypatch):
+    started = []
+
+    async def handler(name: str, seconds: float = 0.0):
+        started.append(name)
+        await asyncio.sleep(seconds)
+        return name
+
+    monkeypatch.setitem(jobs.HANDLERS, "test", handler)
+    requests, responses, control = queue.Queue(), queue.Queue(), queue.Queue()
+    # One slot: job 2 waits in the queue behind job 1 while its cancel arrives
+    requests.put((1, "test", {"name": "first", "seconds": 0.2}, False, None))
+    requests.put((2, "test", {"name": "abandoned"}, False, None))
+    requests.put((3, "test", {"name": "third"}, False, None))
+    requests.put(None)
+    control.put(2)
+
+    asyncio.run(jobs._serve(requests, responses, control, concurrency=1))
+
+    assert started == ["first", "third"]
+    assert [responses.get_nowait() for _ in range(responses.qsize())] == [
+        (1, jobs._DONE, "first"), (3, jobs._DONE, "third"),
+    ]
+
+
+def test_timed_out_job_is_not_also_counted_as_cancelled():
+    broker = jobs.ProcessPoolBroker(workers=1, concurrency=1, timeout=0.05)
+    broker._requests = queue.Queue()  # no worker ever answers
+    broker._controls = [queue.Queue()]
+
+    with pytest.raises(jobs.JobError):
+        asyncio.run(broker.submit("test", {}))
+
+    assert broker._stats["timed_out"] == 1
+    assert broker._stats["cancelled"] == 0
+    assert broker._controls[0].get_nowait() == 1  # the worker is still told to drop it
@@ -0,0 +1,62 @@
+import json
+import sqlite3
+import uuid
+
+from backend import database
+from backend.config import settings
+from backend.routers.sessions import _transcript_lines
+from backend.services.archiver import archive_batch
+from scripts.split_db import _migrate, split
+from tests.conftest import run
+
+
+async def _log(session_id: str, texts: list[str]):
+    async with database.write_db(session_id) as db:
+        for text in texts:
+            await database.log_conversation(db, session_id, 0, 0, "tutor", text)
+
+
+async def _export(session_id: str) -> list[str]:
+    lines = [line async for chunk in _transcript_lines(session_id) for line in chunk.splitlines()]
+    return [json.loads(line)["text"] for line in lines]
+
+
+def test_export_after_split_keeps_hot_rows_numbered_below_archived_ones(tutor_db, monkeypatch):
+    session_id = str(uuid.uuid4())
+    # Sessions that will land on the other shard, logged first so ours gets large ids
+    others = [
+        sid for sid in (str(uuid.uuid4()) for _ in range(40))
+        if database.shard_index(sid, 2) != database.shard_index(session_id, 2)
+    ]
+
+    async def before_split():
+        async with database.write_db(session_id) as db:
+            await database.create_session(db, session_id, "foundations-of-leadership", "en")
+        for other in others:
+            async with database.write_db(other) as db:
+                await database.create_session(db, other, "foundations-of-leadership", "en")
+            await _log(other, ["filler"] * 5)
+        await _log(session_id, ["old0", "old1", "old2"])
+        async with database.write_db(session_id) as db:
+            await db.execute(
+                "UPDATE sessions SET status = 'completed', updated_at = datetime('now', '-3 days') WHERE id = ?",
+                (session_id,),
+            )
+            await db.commit()
+        assert await archive_batch(0) == 1
+        await _log(session_id, ["new0", "new1"])
+
+    run(before_split())
+    targets = database.shard_paths(2)
+    for path in targets:
+        run(_migrate(path))
+    split(database.shard_paths(1), targets)
+
+    target = targets[database.shard_index(session_id, 2)]
+    conn = sqlite3.connect(target)
+    hot_ids = [row[0] for row in conn.execute("SELECT id FROM conversation_log WHERE session_id = ?", (session_id,))]
+    conn.close()
+    assert max(hot_ids) < len(others) * 5  # renumbered below the archived ids
+
+    monkeypatch.setattr(settings, "db_shards", 2)
+    assert run(_export(session_id)) == ["old0", "old1", "old2", "new0", "new1"]